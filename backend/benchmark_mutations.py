@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""Compare the old SELECT-then-write inventory mutations with the RETURNING ones.
+
+Seeds a throwaway SQLite database (or the DATABASE_URL you pass) and runs
+each variant of update and mark-used (the delete path) many times, counting round trips
+and timing each call. --rtt-ms adds a simulated network round trip per
+statement and per commit so the numbers approximate a remote database:
+
+    python benchmark_mutations.py --iterations 300 --rtt-ms 1.5
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+def legacy_update(db, item_id: str):
+    from models import InventoryItem as InventoryItemModel
+    from inventory_sync import next_change_seq, inventory_counter
+    db_item = db.query(InventoryItemModel).filter(InventoryItemModel.id == item_id).first()
+    db_item.quantity = db_item.quantity % 5 + 1
+    db_item.change_seq = next_change_seq(db, inventory_counter())
+    db.commit()
+    db.refresh(db_item)
+    return db_item
+
+def returning_update(db, item_id: str):
+    from inventory_sync import update_item
+    db_item = update_item(db, item_id, {"quantity": 3})
+    db.expunge(db_item)
+    db.commit()
+    return db_item
+
+def legacy_mark_used(db, item_id: str):
+    from models import InventoryItem as InventoryItemModel, InventoryTombstone
+    from inventory_sync import next_change_seq, inventory_counter
+    from inventory_events import record_inventory_event, OUTCOME_USED
+    from datetime import datetime
+    db_item = db.query(InventoryItemModel).filter(InventoryItemModel.id == item_id).first()
+    record_inventory_event(db, db_item, OUTCOME_USED)
+    db.delete(db_item)
+    db.merge(InventoryTombstone(item_id=item_id, change_seq=next_change_seq(db, inventory_counter()), deleted_at=datetime.utcnow()))
+    db.commit()
+
+def returning_mark_used(db, item_id: str):
+    from inventory_sync import delete_item
+    from inventory_events import record_inventory_event, OUTCOME_USED
+    row = delete_item(db, item_id)
+    record_inventory_event(db, row, OUTCOME_USED)
+    db.commit()
+
+def install_latency(engine, rtt_ms: float):
+    """Sleep once per statement and per commit to mimic a remote server"""
+    from sqlalchemy import event
+    delay = rtt_ms / 1000.0
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _statement_latency(conn, cursor, statement, parameters, context, executemany):
+        time.sleep(delay)
+
+    @event.listens_for(engine, "commit")
+    def _commit_latency(conn):
+        time.sleep(delay)
+
+def create_items(session_factory, count: int) -> List[str]:
+    from models import InventoryItem as InventoryItemModel
+    from shelf_life import fill_expiration_dates
+    db = session_factory()
+    try:
+        items = [InventoryItemModel(**fill_expiration_dates({"name": "Milk", "category": "dairy", "quantity": 1})) for _ in range(count)]
+        db.add_all(items)
+        db.commit()
+        return [item.id for item in items]
+    finally:
+        db.close()
+
+def run_variant(session_factory, operation: Callable, item_ids: List[str]) -> Dict:
+    from query_accounting import count_queries
+    timings = []
+    with count_queries() as stats:
+        for item_id in item_ids:
+            db = session_factory()
+            try:
+                started = time.perf_counter()
+                operation(db, item_id)
+                timings.append((time.perf_counter() - started) * 1000.0)
+            finally:
+                db.close()
+    timings.sort()
+    return {
+        "statements_per_call": stats.count / len(item_ids),
+        "mean_ms": sum(timings) / len(timings),
+        "p50_ms": timings[len(timings) // 2],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--rtt-ms", type=float, default=1.0, help="simulated latency per round trip")
+    parser.add_argument("--database-url", help="DB to seed and use (default: a temporary SQLite file)")
+    args = parser.parse_args()
+
+    scratch = None
+    database_url = args.database_url
+    if database_url is None:
+        scratch = tempfile.TemporaryDirectory()
+        database_url = f"sqlite:///{os.path.join(scratch.name, 'benchmark.db')}"
+    os.environ["DATABASE_URL"] = database_url
+
+    from load_test import seed_database
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    seed_database(database_url, 0)
+    engine = create_engine(database_url)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    install_latency(engine, args.rtt_ms)
+
+    try:
+        update_ids = create_items(session_factory, args.iterations)
+        legacy_ids = create_items(session_factory, args.iterations)
+        returning_ids = create_items(session_factory, args.iterations)
+        results = {
+            "update (legacy)": run_variant(session_factory, legacy_update, update_ids),
+            "update (returning)": run_variant(session_factory, returning_update, update_ids),
+            "mark-used (legacy)": run_variant(session_factory, legacy_mark_used, legacy_ids),
+            "mark-used (returning)": run_variant(session_factory, returning_mark_used, returning_ids),
+        }
+    finally:
+        engine.dispose()
+        if scratch is not None:
+            scratch.cleanup()
+
+    print(f"\n{args.iterations} calls per variant, {args.rtt_ms}ms simulated round trip")
+    print(f"{'variant':24} {'stmts/call':>10} {'mean':>9} {'p50':>9}")
+    for name, stats in results.items():
+        print(f"{name:24} {stats['statements_per_call']:10.1f} {stats['mean_ms']:8.2f}ms {stats['p50_ms']:8.2f}ms")
+    for operation in ("update", "mark-used"):
+        saved = results[f"{operation} (legacy)"]["mean_ms"] - results[f"{operation} (returning)"]["mean_ms"]
+        print(f"{operation}: {saved:.2f}ms saved per call")
+
+if __name__ == "__main__":
+    main()
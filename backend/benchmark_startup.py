@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Measure API cold start: import time, warm-up and first-request latency.
+
+Seeds a throwaway SQLite database (or the DATABASE_URL you pass), optionally
+padded with synthetic recipes so the catalog is production-sized, then starts
+fresh interpreters that import `main`, run the app's startup and time the
+first requests, once with the startup warm-up and once without:
+
+    python benchmark_startup.py --runs 5 --recipes 20000
+
+For a per-module breakdown of the import, use
+`python -X importtime -c "import main"`.
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from typing import Dict, List
+
+FIRST_REQUESTS = [
+    ("suggestions", "/api/recipes/suggestions/"),
+    ("search", "/api/recipes/search/?q=chicken"),
+    ("inventory", "/api/inventory/"),
+]
+
+def add_synthetic_recipes(database_url: str, count: int):
+    """Recipes recombining the bundled ingredient names, enough to make cold costs visible"""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from models import Recipe as RecipeModel
+    from ingredient_vocabulary import sync_ingredient_vocabulary
+
+    engine = create_engine(database_url)
+    db = sessionmaker(bind=engine)()
+    try:
+        names = sorted({name for recipe in db.query(RecipeModel) for name in recipe.uses_ingredients or []})
+        rng = random.Random(7)
+        for i in range(count):
+            ingredients = rng.sample(names, rng.randint(3, 8))
+            db.add(RecipeModel(
+                id=str(uuid.uuid4()), name=f"Synthetic recipe {i}", ingredients=ingredients, uses_ingredients=ingredients,
+                parsed_ingredients=[], instructions=["Combine."], prep_time=rng.choice([10, 20, 30, 45, 60]),
+                cuisine_type=rng.choice(["Italian", "Mexican", "Indian", "American"]), dietary_tags=[],
+            ))
+        sync_ingredient_vocabulary(db)
+        db.commit()
+    finally:
+        db.close()
+        engine.dispose()
+
+def child(warmup: bool):
+    """Runs in the fresh interpreter; prints one JSON line of timings"""
+    started = time.perf_counter()
+    import main
+    import_ms = (time.perf_counter() - started) * 1000
+    from fastapi.testclient import TestClient
+
+    result: Dict = {"import_ms": import_ms}
+    with TestClient(main.app) as client:
+        startup_done = time.perf_counter()
+        while client.get("/api/ready/").status_code != 200:
+            time.sleep(0.005)
+        result["ready_ms"] = (time.perf_counter() - startup_done) * 1000
+        for name, path in FIRST_REQUESTS:
+            request_started = time.perf_counter()
+            response = client.get(path)
+            response.raise_for_status()
+            result[f"first_{name}_ms"] = (time.perf_counter() - request_started) * 1000
+        request_started = time.perf_counter()
+        client.get(FIRST_REQUESTS[0][1])
+        result["second_suggestions_ms"] = (time.perf_counter() - request_started) * 1000
+    print(json.dumps(result))
+
+def run_child(database_url: str, warmup: bool) -> Dict:
+    env = dict(os.environ, DATABASE_URL=database_url, WARMUP_ON_STARTUP="1" if warmup else "0")
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", "warm" if warmup else "cold"],
+        cwd=os.path.dirname(os.path.abspath(__file__)), env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh processes per mode")
+    parser.add_argument("--recipes", type=int, default=0, help="synthetic recipes added to the bundled ones")
+    parser.add_argument("--database-url", help="DB to seed and use (default: a temporary SQLite file)")
+    parser.add_argument("--child", choices=["warm", "cold"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child == "warm")
+        return
+
+    scratch = None
+    database_url = args.database_url
+    if database_url is None:
+        scratch = tempfile.TemporaryDirectory()
+        database_url = f"sqlite:///{os.path.join(scratch.name, 'benchmark.db')}"
+
+    try:
+        from load_test import seed_database
+        seed_database(database_url, 0)
+        if args.recipes:
+            add_synthetic_recipes(database_url, args.recipes)
+        results: Dict[str, List[Dict]] = {"cold": [], "warm": []}
+        for _ in range(args.runs):
+            results["cold"].append(run_child(database_url, warmup=False))
+            results["warm"].append(run_child(database_url, warmup=True))
+    finally:
+        if scratch is not None:
+            scratch.cleanup()
+
+    metrics = list(results["cold"][0])
+    print(f"\nmedian of {args.runs} fresh processes, {args.recipes} synthetic recipes")
+    print(f"{'metric':24} {'no warm-up':>11} {'warm-up':>11}")
+    for metric in metrics:
+        cold = statistics.median(run[metric] for run in results["cold"])
+        warm = statistics.median(run[metric] for run in results["warm"])
+        print(f"{metric:24} {cold:9.1f}ms {warm:9.1f}ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+from sqlalchemy.orm import Session
+from models import Recipe as RecipeModel
+from inventory_sync import current_change_seq
+from ingredient_vocabulary import reload_vocabulary
+from typing import Any, Callable, Dict, List, Optional
+import os
+import threading
+import time
+
+# Bumped in the same transaction as every recipe write, bulk or through the API
+CATALOG_COUNTER = "catalog"
+CATALOG_CHECK_INTERVAL = float(os.getenv("CATALOG_CHECK_INTERVAL", "5"))
+
+# name -> (build(recipes) -> index, add(index, recipe) or None)
+_INDEX_BUILDERS: Dict[str, tuple] = {}
+
+def register_index(name: str, build: Callable[[List[RecipeModel]], Any], add: Optional[Callable[[Any, RecipeModel], None]] = None):
+    """Register an in-memory index derived from the recipe catalog.
+
+    The index is built lazily the first time a snapshot is asked for it. When
+    a recipe is written through the API, `add` updates the index in place;
+    indexes without an `add` hook are dropped and rebuilt on next use.
+    """
+    _INDEX_BUILDERS[name] = (build, add)
+
+class CatalogSnapshot:
+    """The recipe catalog held in process memory, plus indexes built from it"""
+
+    def __init__(self, version: int, recipes: List[RecipeModel], source_seq: int = 0):
+        self.version = version
+        self.source_seq = source_seq
+        self.checked_at = time.monotonic()
+        self.recipes = list(recipes)
+        self.by_id = {recipe.id: recipe for recipe in self.recipes}
+        self._indexes: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+
+    def index(self, name: str) -> Any:
+        index = self._indexes.get(name)
+        if index is not None:
+            return index
+        with self._lock:
+            if name not in self._indexes:
+                build, _ = _INDEX_BUILDERS[name]
+                self._indexes[name] = build(self.recipes)
+            return self._indexes[name]
+
+    def build_indexes(self):
+        """Build every registered index now instead of on first use"""
+        for name in _INDEX_BUILDERS:
+            self.index(name)
+
+    def add_recipe(self, recipe: RecipeModel, source_seq: Optional[int] = None):
+        """Insert or replace one recipe and keep the built indexes current.
+
+        `source_seq` is the catalog counter value the write committed with; when
+        it directly follows this snapshot's, nothing else changed in between
+        and the snapshot stays current instead of reloading.
+        """
+        with self._lock:
+            if source_seq is not None and source_seq == self.source_seq + 1:
+                self.source_seq = source_seq
+            if recipe.id in self.by_id:
+                self.recipes = [recipe if r.id == recipe.id else r for r in self.recipes]
+            else:
+                self.recipes.append(recipe)
+            self.by_id[recipe.id] = recipe
+            self.version += 1
+            for name in list(self._indexes):
+                _, add = _INDEX_BUILDERS[name]
+                if add is None:
+                    del self._indexes[name]
+                else:
+                    add(self._indexes[name], recipe)
+
+_catalog: Optional[CatalogSnapshot] = None
+_catalog_lock = threading.Lock()
+_reload_lock = threading.Lock()
+
+def load_catalog(db: Session, version: int = 1) -> CatalogSnapshot:
+    """Read every recipe through a private session so the rows stay detached"""
+    session = Session(bind=db.get_bind())
+    try:
+        source_seq = current_change_seq(session, CATALOG_COUNTER)
+        recipes = session.query(RecipeModel).all()
+    finally:
+        session.close()
+    return CatalogSnapshot(version, recipes, source_seq)
+
+def _reload(bind) -> bool:
+    """Build a complete new snapshot off to the side, then swap it in"""
+    global _catalog
+    if not _reload_lock.acquire(blocking=False):
+        return False
+    try:
+        session = Session(bind=bind)
+        try:
+            snapshot = load_catalog(session, (_catalog.version + 1) if _catalog is not None else 1)
+            snapshot.build_indexes()
+            reload_vocabulary(session)
+        finally:
+            session.close()
+        with _catalog_lock:
+            _catalog = snapshot
+        return True
+    finally:
+        _reload_lock.release()
+
+def reload_catalog(db: Session) -> bool:
+    """Replace the loaded catalog with a fresh one; False if a reload was already running.
+
+    Requests keep using the old snapshot, indexes included, until the new one
+    is fully built, so nobody ever sees a partially loaded catalog.
+    """
+    return _reload(db.get_bind())
+
+def get_catalog(db: Session) -> CatalogSnapshot:
+    """Return the process-wide catalog, loading it on first use.
+
+    Recipes written through the API are applied in place. A bulk ingest in any
+    process bumps the catalog counter; every CATALOG_CHECK_INTERVAL seconds the
+    counter is compared and a stale catalog is rebuilt in a background thread
+    while the current one keeps serving.
+    """
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = load_catalog(db)
+    elif time.monotonic() - _catalog.checked_at > CATALOG_CHECK_INTERVAL:
+        _catalog.checked_at = time.monotonic()
+        if current_change_seq(db, CATALOG_COUNTER) != _catalog.source_seq:
+            threading.Thread(target=_reload, args=(db.get_bind(),), daemon=True).start()
+    return _catalog
+
+def add_recipe_to_catalog(recipe: RecipeModel, source_seq: Optional[int] = None):
+    """Apply an API recipe write to the loaded catalog, if there is one.
+
+    Other processes pick the recipe up from the catalog counter bump the
+    write committed with.
+    """
+    if _catalog is not None:
+        _catalog.add_recipe(recipe, source_seq)
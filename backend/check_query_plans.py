@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""Check with EXPLAIN that every filtered query the API runs is served by an index.
+
+Migrates and seeds a throwaway SQLite database (or the DATABASE_URL you pass,
+e.g. a scratch Postgres), calls each endpoint below through TestClient while
+capturing its statements, and EXPLAINs every statement with a WHERE clause.
+A table scan in any of those plans is a failure. Statements without a WHERE
+(the catalog and vocabulary loads) read whole tables on purpose and are only
+counted. On Postgres, sequential scans are disabled for the EXPLAIN session so
+the planner picks any usable index however small the seeded tables are.
+
+    python check_query_plans.py
+    python check_query_plans.py --database-url postgresql://localhost/ecoeats_scratch
+
+Exits with status 1 when a query scans.
+"""
+
+import argparse
+import json
+import os
+import re
+import tempfile
+import threading
+from typing import Callable, Dict, List, Tuple
+
+ADMIN_TOKEN = "query-plan-check"
+_WHERE_PATTERN = re.compile(r"\bWHERE\b", re.IGNORECASE)
+_SKIPPED_PREFIXES = ("EXPLAIN", "PRAGMA", "SAVEPOINT", "RELEASE", "ROLLBACK", "BEGIN", "SET", "SELECT 1")
+
+class StatementCapture:
+    """Collects (statement, parameters) run on any engine while active"""
+
+    def __init__(self):
+        self.statements: List[Tuple[str, object]] = []
+        self.active = False
+        self._lock = threading.Lock()
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if not self.active or statement.lstrip().upper().startswith(_SKIPPED_PREFIXES):
+            return
+        if executemany and parameters:
+            parameters = parameters[0]
+        with self._lock:
+            self.statements.append((statement, parameters))
+
+    def take(self) -> List[Tuple[str, object]]:
+        with self._lock:
+            statements, self.statements = self.statements, []
+        return statements
+
+def _sqlite_scans(connection, statement: str, parameters) -> List[str]:
+    rows = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+    # "SEARCH t USING INDEX ..." seeks; "SCAN t" reads the table, "SCAN t USING ... INDEX" the whole index
+    return [row[-1] for row in rows if row[-1].startswith("SCAN ") and "CONSTANT ROW" not in row[-1]]
+
+def _postgres_scans(connection, statement: str, parameters) -> List[str]:
+    plan = connection.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    scans = []
+    nodes = [plan[0]["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        if node["Node Type"] == "Seq Scan":
+            scans.append(f"Seq Scan on {node.get('Relation Name')}")
+        nodes.extend(node.get("Plans", []))
+    return scans
+
+def explain_scans(engine, statements: List[Tuple[str, object]]) -> Tuple[int, int, List[Tuple[str, List[str]]]]:
+    """(statements checked, full reads skipped, [(statement, scans)] for those that scan)"""
+    checked, skipped, failures = 0, 0, []
+    with engine.connect() as connection:
+        postgres = connection.dialect.name == "postgresql"
+        if postgres:
+            connection.exec_driver_sql("SET enable_seqscan = off")
+        for statement, parameters in statements:
+            if not _WHERE_PATTERN.search(statement):
+                skipped += 1
+                continue
+            checked += 1
+            scans = (_postgres_scans if postgres else _sqlite_scans)(connection, statement, parameters)
+            if scans:
+                failures.append((statement, scans))
+        connection.rollback()
+    return checked, skipped, failures
+
+def endpoint_calls() -> List[Tuple[str, Callable]]:
+    """(label, call(client, state)) in an order where later calls can use earlier results"""
+    admin = {"X-Admin-Token": ADMIN_TOKEN}
+    item = {"name": "Milk", "category": "dairy", "quantity": 2}
+
+    def create_item(client, state):
+        state["item"] = client.post("/api/inventory/", json=item).json()
+        return client.post("/api/inventory/", json={**item, "name": "Spinach", "category": "vegetables"})
+
+    def create_leftover(client, state):
+        state["leftover"] = client.post("/api/leftovers/", json={"name": "Rice", "category": "grains"}).json()
+        state["trashed"] = client.post("/api/leftovers/", json={"name": "Soup"}).json()
+        client.post(f"/api/leftovers/{state['trashed']['id']}/mark-trashed/")
+        return client.post(f"/api/leftovers/{state['leftover']['id']}/mark-used/")
+
+    def history_second_page(client, state):
+        cursor = client.get("/api/leftovers/history/?limit=1").json()["next_cursor"]
+        return client.get(f"/api/leftovers/history/?limit=1&cursor={cursor}")
+
+    return [
+        ("POST /api/inventory/", create_item),
+        ("POST /api/inventory/batch/", lambda client, state: client.post("/api/inventory/batch/", json=[item, item])),
+        ("GET /api/inventory/", lambda client, state: client.get("/api/inventory/")),
+        ("GET /api/inventory/?name=", lambda client, state: client.get("/api/inventory/?name=milk")),
+        ("GET /api/inventory/changes/", lambda client, state: client.get("/api/inventory/changes/?since=1")),
+        ("GET /api/inventory/alerts/", lambda client, state: client.get("/api/inventory/alerts/")),
+        ("GET /api/inventory/{id}/", lambda client, state: client.get(f"/api/inventory/{state['item']['id']}/")),
+        ("PUT /api/inventory/{id}/", lambda client, state: client.put(
+            f"/api/inventory/{state['item']['id']}/", json={"quantity": 1}, headers={"If-Match": str(state["item"]["change_seq"])})),
+        ("POST /api/inventory/{id}/mark-used/", lambda client, state: client.post(f"/api/inventory/{state['item']['id']}/mark-used/")),
+        ("POST /api/leftovers/ + mark-used/", create_leftover),
+        ("GET /api/leftovers/", lambda client, state: client.get("/api/leftovers/?due_within_days=3")),
+        ("GET /api/leftovers/history/", lambda client, state: client.get("/api/leftovers/history/?limit=1")),
+        ("GET /api/leftovers/history/?cursor=", history_second_page),
+        ("GET /api/leftovers/{id}/", lambda client, state: client.get(f"/api/leftovers/{state['leftover']['id']}/")),
+        ("PUT /api/leftovers/{id}/", lambda client, state: client.put(f"/api/leftovers/{state['leftover']['id']}/", json={"status": "active"})),
+        ("DELETE /api/leftovers/{id}/", lambda client, state: client.delete(f"/api/leftovers/{state['leftover']['id']}/")),
+        ("GET /api/recipes/suggestions/", lambda client, state: client.get("/api/recipes/suggestions/")),
+        ("GET /api/recipes/near-misses/", lambda client, state: client.get("/api/recipes/near-misses/")),
+        ("GET /api/recipes/{id}/", lambda client, state: client.get("/api/recipes/1/")),
+        ("GET /api/stats/waste/", lambda client, state: client.get("/api/stats/waste/")),
+        ("GET /api/admin/jobs/", lambda client, state: client.get("/api/admin/jobs/", headers=admin)),
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="DB to migrate, seed and check (default: a temporary SQLite file)")
+    args = parser.parse_args()
+
+    scratch = None
+    database_url = args.database_url
+    if database_url is None:
+        scratch = tempfile.TemporaryDirectory()
+        database_url = f"sqlite:///{os.path.join(scratch.name, 'plans.db')}"
+    os.environ["DATABASE_URL"] = database_url
+    os.environ["ADMIN_TOKEN"] = ADMIN_TOKEN
+    os.environ["WARMUP_ON_STARTUP"] = "0"
+
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+    from load_test import seed_database
+
+    failed = 0
+    try:
+        seed_database(database_url, 20)
+        from fastapi.testclient import TestClient
+        from database import get_engine
+        import main as app_module
+
+        capture = StatementCapture()
+        event.listen(Engine, "before_cursor_execute", capture)
+        client = TestClient(app_module.app)
+        state: Dict = {}
+        print(f"{'endpoint':40} {'checked':>7} {'full reads':>10}  result")
+        for label, call in endpoint_calls():
+            capture.active = True
+            response = call(client, state)
+            capture.active = False
+            if response.status_code >= 400:
+                raise SystemExit(f"{label} returned {response.status_code}: {response.text}")
+            checked, skipped, failures = explain_scans(get_engine(), capture.take())
+            print(f"{label:40} {checked:7} {skipped:10}  {'SCAN' if failures else 'ok'}")
+            for statement, scans in failures:
+                failed += 1
+                print(f"    {' '.join(statement.split())}")
+                for scan in scans:
+                    print(f"      -> {scan}")
+        event.remove(Engine, "before_cursor_execute", capture)
+        get_engine().dispose()
+    finally:
+        if scratch is not None:
+            scratch.cleanup()
+
+    if failed:
+        raise SystemExit(f"\n{failed} filtered queries are not served by an index")
+    print("\nEvery filtered query uses an index")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""Compact columnar JSON for list endpoints.
+
+With ?format=columnar a list of N objects is sent as
+{"count": N, "columns": {"name": [...], "prep_time": [...], ...}}, so every key
+appears once and similar values sit next to each other, which compresses
+well. lib/api.ts turns it back into objects.
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, List, Literal
+
+from pydantic import TypeAdapter
+
+FORMAT_ROWS = "rows"
+FORMAT_COLUMNAR = "columnar"
+ResponseFormat = Literal["rows", "columnar"]
+
+@lru_cache(maxsize=None)
+def _list_adapter(model) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+def dump_rows(model, rows: List[Any]) -> List[Dict]:
+    """Rows as JSON-ready dicts, exactly as response_model=List[model] renders them"""
+    return _list_adapter(model).dump_python(rows, mode="json")
+
+def dump_rows_json(model, rows: List[Any]) -> bytes:
+    return _list_adapter(model).dump_json(rows)
+
+def to_columnar(rows: List[Dict]) -> Dict:
+    keys = list(rows[0]) if rows else []
+    return {"count": len(rows), "columns": {key: [row[key] for row in rows] for key in keys}}
@@ -0,0 +1,145 @@
+"""Negotiated gzip/brotli response compression and a cache of pre-compressed bodies.
+
+CompressionMiddleware compresses JSON and text responses of at least
+COMPRESSION_MIN_SIZE bytes with the best encoding the client accepts:
+brotli when the optional `brotli` package is installed (the `compression`
+extra, which the Docker image installs), gzip otherwise.
+Responses that already carry a Content-Encoding (the cached catalog bodies)
+and event streams pass through untouched.
+"""
+
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional
+import gzip
+import os
+import threading
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+
+try:
+    import brotli
+except ImportError:  # optional; clients then get gzip
+    brotli = None
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+# Cached bodies are compressed once, so they can afford the slowest settings
+CACHED_GZIP_LEVEL = 9
+CACHED_BROTLI_QUALITY = 11
+CACHED_BODIES = 32
+
+def _supported_encodings():
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick br or gzip from an Accept-Encoding header by q-value, preferring br on ties"""
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip().lower()] = weight
+    best, best_weight = None, 0.0
+    for encoding in _supported_encodings():
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+def compress(body: bytes, encoding: str, cached: bool = False) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=CACHED_BROTLI_QUALITY if cached else BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=CACHED_GZIP_LEVEL if cached else GZIP_LEVEL, mtime=0)
+
+def _compressible(content_type: str) -> bool:
+    return content_type.startswith(("application/json", "text/")) and not content_type.startswith("text/event-stream")
+
+class CompressionMiddleware:
+    """ASGI middleware that buffers a response body and compresses it once complete"""
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        passthrough = False
+        chunks = []
+
+        async def compressing_send(message):
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if "content-encoding" in headers or not _compressible(headers.get("content-type", "")):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start = message
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            body = b"".join(chunks)
+            headers = MutableHeaders(raw=start["headers"])
+            headers.add_vary_header("Accept-Encoding")
+            if len(body) >= self.minimum_size:
+                body = compress(body, encoding)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, compressing_send)
+
+class PrecompressedCache:
+    """JSON bodies compressed once per encoding, LRU over a handful of keys.
+
+    Keys must change whenever the content does (e.g. include the catalog
+    version); stale keys simply age out.
+    """
+
+    def __init__(self, max_entries: int = CACHED_BODIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Dict[str, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def response(self, key: Hashable, encoding: Optional[str], build: Callable[[], bytes]) -> Response:
+        """A ready response for `key`, calling build() for the JSON only on a miss"""
+        with self._lock:
+            bodies = self._entries.get(key)
+            if bodies is not None:
+                self._entries.move_to_end(key)
+        if bodies is None:
+            bodies = {"identity": build()}
+        body = bodies.get(encoding or "identity")
+        if body is None:
+            body = bodies[encoding] = compress(bodies["identity"], encoding, cached=True)
+        with self._lock:
+            self._entries[key] = bodies
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        headers = {"Vary": "Accept-Encoding"}
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+        return Response(content=body, media_type="application/json", headers=headers)
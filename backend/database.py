@@ -1,21 +1,186 @@
-from sqlalchemy import create_engine
+from sqlalchemy import and_, create_engine, text
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from fastapi import Request, Response
+from typing import Dict, List, Optional, Sequence, Union
+import itertools
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+# Comma-separated read replicas; reads use the primary when empty. Locally,
+# two SQLite files work: cp primary.db replica.db and point this at the copy
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+REPLICA_HEALTH_INTERVAL = float(os.getenv("REPLICA_HEALTH_INTERVAL", "5"))
+# How long a client reads from the primary after its last write, to cover replication lag
+REPLICA_STICKY_SECONDS = float(os.getenv("REPLICA_STICKY_SECONDS", "10"))
+PRIMARY_UNTIL_HEADER = "X-Primary-Until"
+ROUTE_HEADER = "X-DB-Route"
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+_engine = None
+_engine_lock = threading.Lock()
+_session_factory = sessionmaker(autocommit=False, autoflush=False)
 
 Base = declarative_base()
 
-def get_db():
+def upgrade_database(database_url: Optional[str] = None, revision: str = "head"):
+    """Run the Alembic migrations, creating the schema on an empty database"""
+    from alembic import command
+    from alembic.config import Config
+    config = Config(os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini"))
+    config.attributes["database_url"] = database_url or DATABASE_URL
+    config.attributes["configure_logger"] = False
+    command.upgrade(config, revision)
+
+def upsert(db: Session, model, rows: Union[Dict, List[Dict]], index_elements: Sequence,
+           update_columns: Sequence[str] = (), set_: Optional[Dict] = None,
+           only_if_unchanged: Sequence[str] = ()) -> bool:
+    """INSERT ... ON CONFLICT DO UPDATE on PostgreSQL and SQLite.
+
+    Conflicting rows take the inserted value of each of `update_columns`,
+    plus any explicit `set_` expressions; with `only_if_unchanged`, only
+    those whose listed columns still hold the inserted values are updated.
+    Returns False without touching the database on other dialects, where the
+    caller falls back to its own read-modify-write.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return False
+    stmt = insert(model).values(rows)
+    assignments = {column: stmt.excluded[column] for column in update_columns}
+    assignments.update(set_ or {})
+    where = and_(*(getattr(model, column).is_not_distinct_from(stmt.excluded[column]) for column in only_if_unchanged))
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=list(index_elements), set_=assignments, where=where if only_if_unchanged else None,
+    ))
+    return True
+
+def get_engine():
+    """The primary engine, created on first use so importing the app loads no DB driver"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = create_engine(DATABASE_URL)
+    return _engine
+
+def dispose_engine(close: bool = True):
+    """Drop pooled connections, e.g. in a forked worker; a no-op before first use"""
+    if _engine is not None:
+        _engine.dispose(close=close)
+
+def SessionLocal(**kwargs) -> Session:
+    """A session on the primary, or on the engine passed as bind="""
+    if "bind" not in kwargs:
+        kwargs["bind"] = get_engine()
+    return _session_factory(**kwargs)
+
+def __getattr__(name: str):
+    # Keeps `from database import engine` working without creating it at import
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+class Replica:
+    """A read replica engine plus its last known health"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self._engine = None
+        self.healthy = True
+        self.checked_at = 0.0
+        self._lock = threading.Lock()
+        self._engine_lock = threading.Lock()
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            with self._engine_lock:
+                if self._engine is None:
+                    self._engine = create_engine(self.url, pool_pre_ping=True)
+        return self._engine
+
+    def usable(self) -> bool:
+        """Re-check health at most every REPLICA_HEALTH_INTERVAL seconds"""
+        if time.monotonic() - self.checked_at >= REPLICA_HEALTH_INTERVAL and self._lock.acquire(blocking=False):
+            try:
+                with self.engine.connect() as connection:
+                    connection.execute(text("SELECT 1"))
+                self.healthy = True
+            except Exception:
+                self.healthy = False
+            finally:
+                self.checked_at = time.monotonic()
+                self._lock.release()
+        return self.healthy
+
+    def mark_unhealthy(self):
+        self.healthy = False
+        self.checked_at = time.monotonic()
+
+class ReadRouter:
+    """Round-robins read sessions over healthy replicas, falling back to the primary"""
+
+    def __init__(self, replica_urls: List[str]):
+        self.replicas = [Replica(url) for url in replica_urls]
+        self._next = itertools.count()
+
+    def pick(self) -> Optional[Replica]:
+        if not self.replicas:
+            return None
+        start = next(self._next)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            if replica.usable():
+                return replica
+        return None
+
+read_router = ReadRouter(DATABASE_REPLICA_URLS)
+
+def _reads_primary(request: Request) -> bool:
+    """True while the client is inside the stickiness window of its last write.
+
+    Clients echo the X-Primary-Until header from their last write response;
+    values further out than the window are ignored so a client cannot pin
+    itself to the primary.
+    """
+    value = request.headers.get(PRIMARY_UNTIL_HEADER)
+    try:
+        until = float(value) if value else 0.0
+    except ValueError:
+        return False
+    now = time.time()
+    return now < until <= now + REPLICA_STICKY_SECONDS
+
+def get_db(request: Request, response: Response):
+    """Session on the primary, for handlers that write"""
+    if request.method not in ("GET", "HEAD", "OPTIONS"):
+        response.headers[PRIMARY_UNTIL_HEADER] = f"{time.time() + REPLICA_STICKY_SECONDS:.3f}"
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+def get_read_db(request: Request, response: Response):
+    """Session for read-only handlers: a healthy replica unless the client just wrote"""
+    replica = None if _reads_primary(request) else read_router.pick()
+    db = SessionLocal(bind=replica.engine) if replica is not None else SessionLocal()
+    response.headers[ROUTE_HEADER] = "replica" if replica is not None else "primary"
+    try:
+        yield db
+    except OperationalError:
+        if replica is not None:
+            replica.mark_unhealthy()
+        raise
+    finally:
+        db.close()
@@ -1,41 +1,54 @@
-import requests
 import json
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from models import Base, Recipe as RecipeModel
-from database import engine
+from database import get_engine
+from ingredient_parser import parse_recipe_ingredients
+from ingredient_vocabulary import sync_ingredient_vocabulary
+from inventory_sync import next_change_seq
+from catalog import CATALOG_COUNTER, reload_catalog
+from jobs import JobContext, register_job
+from typing import Callable, Dict, Optional
 import os
-from dotenv import load_dotenv
 import time
 
-load_dotenv()
+CATALOG_INGEST_JOB = "catalog_ingest"
+WRITE_BATCH_SIZE = 100
+HTTP_TIMEOUT_SECONDS = 30
+# An ingest that would leave fewer than this share of the current recipes is
+# treated as a failed fetch rather than a smaller catalog
+MIN_CATALOG_RATIO = float(os.getenv("INGEST_MIN_CATALOG_RATIO", "0.5"))
+
+class IngestError(Exception):
+    """TheMealDB answered badly or the fetched catalog is not safe to swap in"""
+
+def _http_get(url: str):
+    # requests (and certifi) cost ~50ms to import; only ingestion needs them
+    import requests
+    return requests.get(url, timeout=HTTP_TIMEOUT_SECONDS)
+
+def _fetch_meals(url: str):
+    """The meals list of a TheMealDB response; [] for "meals": null (no matches)"""
+    response = _http_get(url)
+    if response.status_code != 200:
+        raise IngestError(f"TheMealDB returned {response.status_code} for {url}")
+    try:
+        data = response.json()
+    except ValueError:
+        raise IngestError(f"TheMealDB returned a non-JSON body for {url}")
+    return data.get("meals") or []
 
 def fetch_recipe_by_id(meal_id):
     """Fetch a single recipe by ID from TheMealDB"""
-    url = f"https://www.themealdb.com/api/json/v1/1/lookup.php?i={meal_id}"
-    response = requests.get(url)
-    if response.status_code == 200:
-        data = response.json()
-        return data.get('meals', [])
-    return []
+    return _fetch_meals(f"https://www.themealdb.com/api/json/v1/1/lookup.php?i={meal_id}")
 
 def fetch_recipes_by_letter(letter):
     """Fetch all recipes starting with a specific letter"""
-    url = f"https://www.themealdb.com/api/json/v1/1/search.php?f={letter}"
-    response = requests.get(url)
-    if response.status_code == 200:
-        data = response.json()
-        return data.get('meals', [])
-    return []
+    return _fetch_meals(f"https://www.themealdb.com/api/json/v1/1/search.php?f={letter}")
 
 def fetch_random_recipe():
     """Fetch a random recipe"""
-    url = "https://www.themealdb.com/api/json/v1/1/random.php"
-    response = requests.get(url)
-    if response.status_code == 200:
-        data = response.json()
-        return data.get('meals', [])
-    return []
+    return _fetch_meals("https://www.themealdb.com/api/json/v1/1/random.php")
 
 def convert_themealdb_to_our_format(meal_data):
     """Convert TheMealDB format to our Recipe model format"""
@@ -95,51 +108,94 @@ def convert_themealdb_to_our_format(meal_data):
         "uses_ingredients": uses_ingredients,
         "instructions": instructions,
         "dietary_tags": dietary_tags,
-        "ingredients": ingredients
+        "ingredients": ingredients,
+        "parsed_ingredients": parse_recipe_ingredients(ingredients, uses_ingredients)
     }
 
+def check_replacement_size(current: int, converted: int, allow_shrink: bool = False):
+    """Refuse to swap in an empty catalog, or one much smaller than the current one"""
+    if converted == 0:
+        raise IngestError("TheMealDB returned no recipes; keeping the current catalog")
+    if not allow_shrink and converted < current * MIN_CATALOG_RATIO:
+        raise IngestError(
+            f"Only {converted} recipes fetched for a catalog of {current}; keeping the current catalog "
+            f"(pass allow_shrink to replace it anyway)"
+        )
+
+def ingest_themealdb_recipes(db, report: Optional[Callable[..., None]] = None,
+                             check_cancelled: Optional[Callable[[], None]] = None, allow_shrink: bool = False) -> Dict:
+    """Replace the recipe catalog with TheMealDB's in a single transaction.
+
+    Readers keep seeing the old recipes until the final commit, which also
+    bumps the catalog counter so every API process reloads its catalog. Any
+    failed request, an empty result or a much smaller catalog raises
+    IngestError before the old recipes are touched.
+    """
+    report = report or (lambda **progress: None)
+    check_cancelled = check_cancelled or (lambda: None)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+
+    all_recipes = []
+    for done, letter in enumerate(letters, 1):
+        check_cancelled()
+        all_recipes.extend(fetch_recipes_by_letter(letter) or [])
+        report(phase="fetching", letters_done=done, letters_total=len(letters), fetched=len(all_recipes))
+        time.sleep(0.1)
+
+    converted = []
+    for meal_data in all_recipes:
+        recipe_data = convert_themealdb_to_our_format([meal_data])
+        if recipe_data:
+            converted.append(recipe_data)
+    report(phase="converting", converted=len(converted))
+    check_cancelled()
+    check_replacement_size(db.query(RecipeModel).count(), len(converted), allow_shrink)
+
+    db.query(RecipeModel).delete()
+    written = 0
+    for start in range(0, len(converted), WRITE_BATCH_SIZE):
+        check_cancelled()
+        db.add_all(RecipeModel(**recipe_data) for recipe_data in converted[start:start + WRITE_BATCH_SIZE])
+        db.flush()
+        written = min(start + WRITE_BATCH_SIZE, len(converted))
+        report(phase="writing", written=written)
+
+    check_cancelled()
+    next_change_seq(db, CATALOG_COUNTER)
+    new_ingredients = sync_ingredient_vocabulary(db)
+    # The one commit: recipes, counter bump and vocabulary land together
+    db.commit()
+    report(phase="committed", written=written, new_ingredients=new_ingredients)
+    return {"fetched": len(all_recipes), "converted": len(converted), "written": written, "new_ingredients": new_ingredients}
+
+def run_catalog_ingest_job(context: JobContext, db, allow_shrink: bool = False) -> Dict:
+    result = ingest_themealdb_recipes(db, context.report, context.check_cancelled, allow_shrink)
+    context.report(phase="swapping")
+    reload_catalog(db)
+    context.report(force=True, phase="done")
+    return result
+
+register_job(CATALOG_INGEST_JOB, run_catalog_ingest_job)
+
 def populate_themealdb_recipes():
     """Populate database with recipes from TheMealDB"""
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=get_engine())
     db = SessionLocal()
-    
+
+    def print_progress(phase, **progress):
+        if phase == "fetching":
+            print(f"Fetched {progress['letters_done']}/{progress['letters_total']} letters ({progress['fetched']} recipes)")
+        elif phase == "converting":
+            print(f"Converted {progress['converted']} recipes")
+        elif phase == "committed":
+            print(f"Added {progress['new_ingredients']} ingredients to the vocabulary")
+
     try:
-        print("Clearing existing recipes...")
-        db.query(RecipeModel).delete()
-        db.commit()
-        
-        all_recipes = []
-        
         print("Fetching recipes from TheMealDB...")
-        for letter in "abcdefghijklmnopqrstuvwxyz":
-            print(f"Fetching recipes starting with '{letter}'...")
-            recipes = fetch_recipes_by_letter(letter)
-            if recipes:
-                all_recipes.extend(recipes)
-            time.sleep(0.1)
-        
-        print(f"Found {len(all_recipes)} recipes from TheMealDB")
-        
-        added_count = 0
-        for meal_data in all_recipes:
-            recipe_data = convert_themealdb_to_our_format([meal_data])
-            if recipe_data:
-                try:
-                    recipe = RecipeModel(**recipe_data)
-                    db.add(recipe)
-                    added_count += 1
-                except Exception as e:
-                    print(f"Error adding recipe {recipe_data.get('name', 'Unknown')}: {e}")
-                    continue
-        
-        db.commit()
-        print(f"Successfully added {added_count} recipes from TheMealDB to database")
-        
-        total_count = db.query(RecipeModel).count()
-        print(f"Total recipes in database: {total_count}")
-        
-        return added_count
-        
+        result = ingest_themealdb_recipes(db, print_progress)
+        print(f"Successfully added {result['written']} recipes from TheMealDB to database")
+        return result["written"]
+
     except Exception as e:
         print(f"Error populating recipes: {e}")
         db.rollback()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""Precomputed per-household recipe suggestions and expiry alerts.
+
+Run nightly (e.g. from cron) against DATABASE_URL:
+
+    python household_suggestions.py --workers 8 --chunk-size 256
+
+Households are split into chunks and spread over a process pool. Each
+worker loads the catalog once, reads a whole chunk's inventory and leftovers
+with two indexed IN queries, scores every household of the chunk in one
+catalog pass (what_if.score_baskets), and writes the chunk back with one
+bulk upsert.
+
+Every inventory or leftover write marks its household's row invalidated;
+the API serves a row only while it is younger than SUGGESTIONS_MAX_AGE_HOURS
+and was computed after the last write, and computes live otherwise.
+"""
+
+from sqlalchemy.orm import Session
+from database import upsert
+from models import HouseholdSuggestions, InventoryItem as InventoryItemModel, Leftover as LeftoverModel
+from leftovers import leftovers_as_inventory, STATUS_ACTIVE
+from shelf_life import as_utc
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta
+import argparse
+import math
+import os
+import time
+
+SUGGESTIONS_PRECOMPUTE_LIMIT = 100
+SUGGESTIONS_MAX_AGE_HOURS = float(os.getenv("SUGGESTIONS_MAX_AGE_HOURS", "36"))
+EXPIRY_ALERT_DAYS = 2
+# Precomputed alerts look further ahead so they stay complete as the row ages
+ALERT_LOOKAHEAD_DAYS = EXPIRY_ALERT_DAYS + math.ceil(SUGGESTIONS_MAX_AGE_HOURS / 24)
+BATCH_CHUNK_SIZE = 256
+
+def _days_left(expiration_date: datetime, now: datetime) -> int:
+    return math.ceil((as_utc(expiration_date) - as_utc(now)).total_seconds() / 86400)
+
+def expiry_alerts(items: List[InventoryItemModel], leftovers: List[LeftoverModel], now: datetime,
+                  within_days: int = EXPIRY_ALERT_DAYS) -> List[Dict]:
+    """Inventory items and active leftovers expiring within the window, soonest first"""
+    alerts = []
+    for source, rows in (("inventory", items), ("leftover", leftovers)):
+        for row in rows:
+            days = _days_left(row.expiration_date, now)
+            if days <= within_days:
+                alerts.append({
+                    "item_id": row.id,
+                    "name": row.name,
+                    "source": source,
+                    "expiration_date": row.expiration_date.isoformat(),
+                    "days_until_expiration": max(0, days),
+                })
+    alerts.sort(key=lambda alert: (alert["expiration_date"], alert["name"]))
+    return alerts
+
+def current_alerts(stored: List[Dict], now: datetime) -> List[Dict]:
+    """Re-date precomputed alerts for the time they are served"""
+    alerts = []
+    for alert in stored:
+        days = _days_left(datetime.fromisoformat(alert["expiration_date"]), now)
+        if days <= EXPIRY_ALERT_DAYS:
+            alerts.append({**alert, "days_until_expiration": max(0, days)})
+    return alerts
+
+def load_households(db: Session, household_ids: List[str]) -> Dict[str, Tuple[List[InventoryItemModel], List[LeftoverModel]]]:
+    """Inventory and active leftovers of many households, two queries in total"""
+    loaded = {household_id: ([], []) for household_id in household_ids}
+    for item in db.query(InventoryItemModel).filter(InventoryItemModel.household_id.in_(household_ids)):
+        loaded[item.household_id][0].append(item)
+    active = db.query(LeftoverModel).filter(LeftoverModel.household_id.in_(household_ids), LeftoverModel.status == STATUS_ACTIVE)
+    for leftover in active.order_by(LeftoverModel.expiration_date):
+        loaded[leftover.household_id][1].append(leftover)
+    return loaded
+
+def scoring_inventory(items: List[InventoryItemModel], leftovers: List[LeftoverModel], now: datetime) -> List[InventoryItemModel]:
+    """What the suggestion engine sees: the inventory plus leftovers that have not expired"""
+    return items + leftovers_as_inventory([leftover for leftover in leftovers if leftover.expiration_date >= now], now)
+
+def compute_household_suggestions(db: Session, catalog, household_ids: List[str], now: datetime) -> List[Dict]:
+    from what_if import score_baskets
+    loaded = load_households(db, household_ids)
+    baskets = [scoring_inventory(items, leftovers, now) for items, leftovers in loaded.values()]
+    results = score_baskets(db, catalog, baskets, limit=SUGGESTIONS_PRECOMPUTE_LIMIT)
+    return [
+        {
+            "household_id": household_id,
+            "recipe_ids": [recipe.id for recipe in recipes],
+            "alerts": expiry_alerts(items, leftovers, now, ALERT_LOOKAHEAD_DAYS),
+            "computed_at": now,
+        }
+        for (household_id, (items, leftovers)), (total, recipes) in zip(loaded.items(), results)
+    ]
+
+def write_household_suggestions(db: Session, rows: List[Dict]):
+    """Bulk upsert computed rows carrying the invalidated_at their inputs were read under.
+
+    A row is only replaced while the stored invalidated_at still matches, so
+    a write that landed since keeps the household stale.
+    """
+    if not rows:
+        return
+    update_columns = ["recipe_ids", "alerts", "computed_at"]
+    if upsert(db, HouseholdSuggestions, rows, [HouseholdSuggestions.household_id], update_columns,
+              only_if_unchanged=["invalidated_at"]):
+        return
+    for row in rows:
+        existing = db.get(HouseholdSuggestions, row["household_id"])
+        if existing is None:
+            db.add(HouseholdSuggestions(**row))
+        elif existing.invalidated_at == row["invalidated_at"]:
+            for column in update_columns:
+                setattr(existing, column, row[column])
+
+def invalidation_marks(db: Session, household_ids: List[str]) -> Dict[str, Optional[datetime]]:
+    """Each household's last invalidated_at, None if it has no row or was never written to"""
+    rows = db.query(HouseholdSuggestions.household_id, HouseholdSuggestions.invalidated_at).filter(
+        HouseholdSuggestions.household_id.in_(household_ids)
+    )
+    marks = {household_id: None for household_id in household_ids}
+    marks.update({household_id: invalidated_at for household_id, invalidated_at in rows})
+    return marks
+
+def refresh_household_suggestions(db: Session, catalog, household_ids: List[str]) -> int:
+    """Compute and store a chunk of households; returns how many were computed.
+
+    A write stamps invalidated_at before it commits, so a stamp older than
+    the inventory read does not prove the read saw the write. The marks are
+    therefore read first, computed_at is the snapshot start right after
+    them, and write_household_suggestions skips every household whose mark
+    moved in the meantime.
+    """
+    marks = invalidation_marks(db, household_ids)
+    snapshot_started = datetime.utcnow()
+    rows = compute_household_suggestions(db, catalog, household_ids, snapshot_started)
+    for row in rows:
+        row["invalidated_at"] = marks[row["household_id"]]
+    write_household_suggestions(db, rows)
+    return len(rows)
+
+def invalidate_household(db: Session, household_id: str):
+    """Mark a household's precomputed row stale; call in the same transaction as the write"""
+    row = {"household_id": household_id, "recipe_ids": [], "alerts": [], "computed_at": None, "invalidated_at": datetime.utcnow()}
+    if not upsert(db, HouseholdSuggestions, row, [HouseholdSuggestions.household_id], ["invalidated_at"]):
+        existing = db.get(HouseholdSuggestions, household_id)
+        if existing is None:
+            db.add(HouseholdSuggestions(**row))
+        else:
+            existing.invalidated_at = row["invalidated_at"]
+
+def get_fresh_suggestions(db: Session, household_id: str, now: Optional[datetime] = None) -> Optional[HouseholdSuggestions]:
+    """The household's precomputed row, or None if missing, too old or written to since"""
+    now = now or datetime.utcnow()
+    row = db.get(HouseholdSuggestions, household_id)
+    if row is None or row.computed_at is None:
+        return None
+    if row.invalidated_at is not None and row.invalidated_at >= row.computed_at:
+        return None
+    if now - row.computed_at > timedelta(hours=SUGGESTIONS_MAX_AGE_HOURS):
+        return None
+    return row
+
+def household_ids(db: Session) -> List[str]:
+    ids = {household_id for (household_id,) in db.query(InventoryItemModel.household_id).distinct()}
+    ids.update(household_id for (household_id,) in db.query(LeftoverModel.household_id).filter(LeftoverModel.status == STATUS_ACTIVE).distinct())
+    return sorted(ids)
+
+def _init_worker():
+    # Connections inherited from the parent process must not be shared
+    from database import dispose_engine
+    dispose_engine(close=False)
+
+def _process_chunk(chunk: List[str]) -> int:
+    from database import SessionLocal
+    from catalog import get_catalog
+    db = SessionLocal()
+    try:
+        count = refresh_household_suggestions(db, get_catalog(db), chunk)
+        db.commit()
+        return count
+    finally:
+        db.close()
+
+def run_batch(workers: int, chunk_size: int = BATCH_CHUNK_SIZE) -> Dict:
+    from concurrent.futures import ProcessPoolExecutor
+    from database import SessionLocal
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        ids = household_ids(db)
+    finally:
+        db.close()
+    chunks = [ids[i:i + chunk_size] for i in range(0, len(ids), chunk_size)]
+    done = 0
+    if workers <= 1 or len(chunks) <= 1:
+        for chunk in chunks:
+            done += _process_chunk(chunk)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            for count in pool.map(_process_chunk, chunks):
+                done += count
+                print(f"  {done}/{len(ids)} households")
+    return {"households": done, "chunks": len(chunks), "seconds": time.perf_counter() - started}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=BATCH_CHUNK_SIZE)
+    args = parser.parse_args()
+    result = run_batch(args.workers, max(args.chunk_size, 1))
+    print(f"Precomputed {result['households']} households in {result['chunks']} chunks, {result['seconds']:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+from typing import Dict, List, Optional, Tuple
+import re
+
+# Canonical unit -> (dimension, factor to the dimension's base unit).
+# Mass is measured in grams, volume in millilitres and plain counts in items.
+# Piece-like units (cans, cloves, slices...) are their own dimension because
+# they cannot be compared with a bare item count.
+UNIT_CONVERSIONS: Dict[str, Tuple[str, float]] = {
+    "mg": ("mass", 0.001),
+    "g": ("mass", 1.0),
+    "kg": ("mass", 1000.0),
+    "oz": ("mass", 28.3495),
+    "lb": ("mass", 453.592),
+    "ml": ("volume", 1.0),
+    "cl": ("volume", 10.0),
+    "dl": ("volume", 100.0),
+    "l": ("volume", 1000.0),
+    "tsp": ("volume", 4.92892),
+    "tbsp": ("volume", 14.7868),
+    "fl oz": ("volume", 29.5735),
+    "cup": ("volume", 236.588),
+    "pint": ("volume", 473.176),
+    "quart": ("volume", 946.353),
+    "gallon": ("volume", 3785.41),
+    "count": ("count", 1.0),
+    "can": ("can", 1.0),
+    "clove": ("clove", 1.0),
+    "slice": ("slice", 1.0),
+    "strip": ("strip", 1.0),
+    "stalk": ("stalk", 1.0),
+    "leaf": ("leaf", 1.0),
+    "bunch": ("bunch", 1.0),
+    "pinch": ("pinch", 1.0),
+}
+
+UNIT_ALIASES: Dict[str, str] = {
+    "milligram": "mg", "milligrams": "mg", "mg": "mg",
+    "g": "g", "gr": "g", "gram": "g", "grams": "g", "gramme": "g", "grammes": "g",
+    "kg": "kg", "kgs": "kg", "kilo": "kg", "kilos": "kg", "kilogram": "kg", "kilograms": "kg",
+    "oz": "oz", "ounce": "oz", "ounces": "oz",
+    "lb": "lb", "lbs": "lb", "pound": "lb", "pounds": "lb",
+    "ml": "ml", "millilitre": "ml", "millilitres": "ml", "milliliter": "ml", "milliliters": "ml",
+    "cl": "cl", "dl": "dl",
+    "l": "l", "litre": "l", "litres": "l", "liter": "l", "liters": "l",
+    "tsp": "tsp", "tsps": "tsp", "teaspoon": "tsp", "teaspoons": "tsp",
+    "tbsp": "tbsp", "tbsps": "tbsp", "tbs": "tbsp", "tblsp": "tbsp", "tablespoon": "tbsp", "tablespoons": "tbsp",
+    "fl oz": "fl oz", "floz": "fl oz",
+    "cup": "cup", "cups": "cup",
+    "pint": "pint", "pints": "pint",
+    "quart": "quart", "quarts": "quart",
+    "gallon": "gallon", "gallons": "gallon",
+    "can": "can", "cans": "can", "tin": "can", "tins": "can",
+    "clove": "clove", "cloves": "clove",
+    "slice": "slice", "slices": "slice",
+    "strip": "strip", "strips": "strip", "rasher": "strip", "rashers": "strip",
+    "stalk": "stalk", "stalks": "stalk",
+    "leaf": "leaf", "leaves": "leaf",
+    "bunch": "bunch", "bunches": "bunch",
+    "pinch": "pinch", "pinches": "pinch",
+}
+
+UNICODE_FRACTIONS = {"½": 0.5, "¼": 0.25, "¾": 0.75, "⅓": 1 / 3, "⅔": 2 / 3, "⅛": 0.125}
+
+_NUMBER = r"(?:\d+\s+\d+/\d+|\d+/\d+|\d+(?:\.\d+)?\s*[½¼¾⅓⅔⅛]?|[½¼¾⅓⅔⅛])"
+_UNIT = "|".join(sorted((re.escape(alias) for alias in UNIT_ALIASES), key=len, reverse=True))
+
+MEASUREMENT_PATTERN = re.compile(
+    rf"^\s*(?P<quantity>{_NUMBER})(?:\s*(?:-|to)\s*{_NUMBER})?"
+    rf"(?:\s*(?P<unit>{_UNIT})\b\.?)?(?:\s*/\s*{_NUMBER}\s*(?:{_UNIT})\b\.?)?"
+    rf"\s*(?:of\s+)?(?P<rest>.*)$",
+    re.IGNORECASE,
+)
+UNIT_ONLY_PATTERN = re.compile(rf"^\s*(?P<unit>{_UNIT})\b\.?\s*(?:of\s+)?(?P<rest>.*)$", re.IGNORECASE)
+PARENTHETICAL_PATTERN = re.compile(r"\([^)]*\)")
+STRIP_UNITS_PATTERN = re.compile(r'\d+\s*(cups?|tbsp|tsp|oz|lbs?|grams?|kg|ml|l)\s*')
+STOPWORDS_PATTERN = re.compile(r'\b(a|an|the|of|in|with|and|or)\b')
+
+def normalize_ingredient_name(ingredient: str) -> str:
+    """Normalize ingredient names for better matching"""
+    ingredient = ingredient.lower().strip()
+    ingredient = STRIP_UNITS_PATTERN.sub('', ingredient)
+    ingredient = STOPWORDS_PATTERN.sub('', ingredient)
+    ingredient = ' '.join(ingredient.split())
+    return ingredient
+
+def singularize(word: str) -> str:
+    """Fold simple English plurals: tomatoes -> tomato, berries -> berry, eggs -> egg"""
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 4 and word.endswith(("oes", "ches", "shes", "sses", "xes")):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+def canonical_ingredient_key(ingredient: str) -> str:
+    """Normalize a name and fold plurals so 'Chicken breasts' == 'chicken breast'"""
+    return " ".join(singularize(word) for word in normalize_ingredient_name(ingredient).split())
+
+def parse_quantity(text: str) -> float:
+    """Convert '1 1/2', '3/4', '2.5' or '1½' into a float"""
+    text = text.strip()
+    total = 0.0
+    for char, value in UNICODE_FRACTIONS.items():
+        if char in text:
+            total += value
+            text = text.replace(char, "").strip()
+    for part in text.split():
+        if "/" in part:
+            numerator, denominator = part.split("/", 1)
+            if float(denominator):
+                total += float(numerator) / float(denominator)
+        else:
+            total += float(part)
+    return total
+
+def to_base_quantity(quantity: float, unit: Optional[str]) -> Tuple[str, float]:
+    """Return (dimension, amount in base units) for a quantity and canonical unit"""
+    dimension, factor = UNIT_CONVERSIONS.get(unit or "count", UNIT_CONVERSIONS["count"])
+    return dimension, quantity * factor
+
+def canonical_unit(unit: Optional[str]) -> Optional[str]:
+    """Map a unit spelling such as 'Tablespoons' or 'lbs' onto its canonical key"""
+    if not unit:
+        return None
+    return UNIT_ALIASES.get(unit.strip().lower().rstrip("."))
+
+def parse_ingredient_line(line: str) -> Dict:
+    """Split '1 1/2 cups broccoli florets, chopped' into quantity, unit and name"""
+    text = PARENTHETICAL_PATTERN.sub(" ", line)
+    quantity = None
+    unit = None
+
+    match = MEASUREMENT_PATTERN.match(text)
+    if match:
+        quantity = parse_quantity(match.group("quantity"))
+        unit = canonical_unit(match.group("unit"))
+        text = match.group("rest")
+    else:
+        match = UNIT_ONLY_PATTERN.match(text)
+        if match:
+            unit = canonical_unit(match.group("unit"))
+            quantity = 1.0
+            text = match.group("rest")
+
+    name = text.split(",", 1)[0]
+    name = " ".join(name.lower().split())
+    return {"quantity": quantity, "unit": unit, "name": name}
+
+def _tokens(text: str) -> List[str]:
+    return [token[:-1] if len(token) > 3 and token.endswith("s") else token for token in re.findall(r"[a-z]+", text.lower())]
+
+def _match_canonical(name: str, candidates: List[str]) -> Optional[str]:
+    """Pick the uses_ingredients entry whose words all appear in the parsed name"""
+    name_tokens = set(_tokens(name))
+    best = None
+    best_size = 0
+    for candidate in candidates:
+        candidate_tokens = _tokens(candidate)
+        if candidate_tokens and set(candidate_tokens) <= name_tokens and len(candidate_tokens) > best_size:
+            best = candidate
+            best_size = len(candidate_tokens)
+    return best
+
+def parse_recipe_ingredients(ingredients: List[str], uses_ingredients: List[str]) -> List[Dict]:
+    """Parse a recipe's ingredient lines into structured requirements.
+
+    Runs once at ingest. Each requirement is keyed by the normalized
+    uses_ingredients entry it belongs to and carries its amount in base units,
+    so the recommendation path only compares numbers.
+    """
+    aligned = len(ingredients) == len(uses_ingredients)
+    requirements: Dict[Tuple[str, str], Dict] = {}
+
+    for position, line in enumerate(ingredients):
+        parsed = parse_ingredient_line(line)
+        if aligned and _match_canonical(parsed["name"], [uses_ingredients[position]]):
+            canonical = uses_ingredients[position]
+        else:
+            canonical = _match_canonical(parsed["name"], uses_ingredients)
+        if canonical is None or parsed["quantity"] is None:
+            continue
+
+        dimension, amount = to_base_quantity(parsed["quantity"], parsed["unit"])
+        key = (normalize_ingredient_name(canonical), dimension)
+        if key in requirements:
+            requirements[key]["amount"] += amount
+            continue
+        requirements[key] = {
+            "ingredient": key[0],
+            "quantity": parsed["quantity"],
+            "unit": parsed["unit"] or "count",
+            "dimension": dimension,
+            "amount": amount,
+        }
+
+    return list(requirements.values())
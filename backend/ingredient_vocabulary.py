@@ -0,0 +1,234 @@
+from sqlalchemy.orm import Session
+from models import Ingredient as IngredientModel, Recipe as RecipeModel
+from ingredient_parser import canonical_ingredient_key
+from typing import Dict, List, Optional, Tuple
+import bisect
+import threading
+
+SHORT_PREFIX_LENGTH = 2
+SUGGESTION_LIMIT = 10
+FUZZY_MIN_SIMILARITY = 0.35
+CANONICAL_MIN_SIMILARITY = 0.7
+
+def _trigrams(text: str) -> frozenset:
+    padded = f"  {text} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+class IngredientVocabulary:
+    """Prefix and fuzzy lookup over the canonical ingredient names.
+
+    Prefix lookups bisect a sorted array of every word-start suffix
+    ("chicken breast", "breast"), with one- and two-letter prefixes
+    precomputed. Misspellings fall back to a trigram index.
+    """
+
+    def __init__(self, rows: List[Tuple[int, str, int]]):
+        self.ids: List[int] = []
+        self.names: List[str] = []
+        self.counts: List[int] = []
+        self.by_name: Dict[str, int] = {}
+        self.position_by_id: Dict[int, int] = {}
+        self._recipe_ids: Dict[str, Tuple[Optional[int], ...]] = {}
+        for ingredient_id, name, count in rows:
+            self._append(ingredient_id, name, count)
+        self._build()
+
+    def _append(self, ingredient_id: int, name: str, count: int):
+        self.position_by_id[ingredient_id] = len(self.ids)
+        self.by_name[name] = ingredient_id
+        self.ids.append(ingredient_id)
+        self.names.append(name)
+        self.counts.append(count)
+
+    def _build(self):
+        keys = []
+        for position, name in enumerate(self.names):
+            words = name.split()
+            for start in range(len(words)):
+                keys.append((" ".join(words[start:]), position))
+        keys.sort()
+        self.prefix_keys = [key for key, position in keys]
+        self.prefix_positions = [position for key, position in keys]
+
+        self.short_prefixes: Dict[str, List[int]] = {}
+        for key, position in keys:
+            for length in range(1, SHORT_PREFIX_LENGTH + 1):
+                if len(key) >= length:
+                    self.short_prefixes.setdefault(key[:length], []).append(position)
+        for prefix, positions in self.short_prefixes.items():
+            self.short_prefixes[prefix] = self._rank(positions)[:SUGGESTION_LIMIT]
+
+        self.trigrams: Dict[str, List[int]] = {}
+        self.trigram_sets: List[frozenset] = []
+        for position, name in enumerate(self.names):
+            grams = _trigrams(name)
+            self.trigram_sets.append(grams)
+            for gram in grams:
+                self.trigrams.setdefault(gram, []).append(position)
+
+    def _rank(self, positions) -> List[int]:
+        return sorted(set(positions), key=lambda position: (-self.counts[position], self.names[position]))
+
+    def add(self, ingredient_id: int, name: str, count: int):
+        """Add or recount one name; call rebuild() once a batch of adds is done"""
+        if name in self.by_name:
+            self.counts[self.position_by_id[self.by_name[name]]] = count
+        else:
+            self._append(ingredient_id, name, count)
+
+    def rebuild(self):
+        self._recipe_ids.clear()
+        self._build()
+
+    def _prefix_matches(self, prefix: str, limit: int) -> List[int]:
+        if len(prefix) <= SHORT_PREFIX_LENGTH and limit <= SUGGESTION_LIMIT:
+            return self.short_prefixes.get(prefix, [])
+        start = bisect.bisect_left(self.prefix_keys, prefix)
+        end = bisect.bisect_left(self.prefix_keys, prefix + "\uffff", start)
+        return self._rank(self.prefix_positions[start:end])
+
+    def suggest(self, text: str, limit: int = SUGGESTION_LIMIT) -> List[Tuple[int, str, int]]:
+        """Autocomplete a partially typed name, most used ingredients first"""
+        prefix = " ".join(text.lower().split())
+        if not prefix:
+            return []
+        positions = self._prefix_matches(prefix, limit)
+        if not positions:
+            key = canonical_ingredient_key(prefix)
+            if key and key != prefix:
+                positions = self._prefix_matches(key, limit)
+        if not positions:
+            positions = [position for position, similarity in self.fuzzy(prefix, limit)]
+        return [(self.ids[p], self.names[p], self.counts[p]) for p in positions[:limit]]
+
+    def fuzzy(self, text: str, limit: int = SUGGESTION_LIMIT, min_similarity: float = FUZZY_MIN_SIMILARITY) -> List[Tuple[int, float]]:
+        """Return (position, Dice similarity) of names sharing enough trigrams"""
+        grams = _trigrams(text)
+        shared: Dict[int, int] = {}
+        for gram in grams:
+            for position in self.trigrams.get(gram, ()):
+                shared[position] = shared.get(position, 0) + 1
+        scored = []
+        for position, overlap in shared.items():
+            similarity = 2.0 * overlap / (len(grams) + len(self.trigram_sets[position]))
+            if similarity >= min_similarity:
+                scored.append((position, similarity))
+        scored.sort(key=lambda entry: (-entry[1], -self.counts[entry[0]]))
+        return scored[:limit]
+
+    def canonicalize(self, name: str) -> Optional[Tuple[int, str, float]]:
+        """Map a free-form name to (id, canonical name, confidence), or None"""
+        key = canonical_ingredient_key(name)
+        if not key:
+            return None
+        if key in self.by_name:
+            return self.by_name[key], key, 1.0
+        matches = self.fuzzy(key, 1, CANONICAL_MIN_SIMILARITY)
+        if not matches:
+            return None
+        position, similarity = matches[0]
+        return self.ids[position], self.names[position], similarity
+
+    def recipe_ingredient_ids(self, recipe: RecipeModel) -> Tuple[Optional[int], ...]:
+        """Canonical ids of a recipe's uses_ingredients, None where a name is unknown"""
+        cached = self._recipe_ids.get(recipe.id)
+        if cached is None:
+            cached = tuple(self.by_name.get(canonical_ingredient_key(name)) for name in recipe.uses_ingredients or [])
+            self._recipe_ids[recipe.id] = cached
+        return cached
+
+_vocabulary: Optional[IngredientVocabulary] = None
+_vocabulary_lock = threading.Lock()
+
+def _count_recipe_ingredients(recipes: List[RecipeModel]) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    for recipe in recipes:
+        for key in set(canonical_ingredient_key(name) for name in recipe.uses_ingredients or []):
+            if key:
+                counts[key] = counts.get(key, 0) + 1
+    return counts
+
+def sync_ingredient_vocabulary(db: Session) -> int:
+    """Make sure every recipe ingredient has a persistent id and current count.
+
+    Ids are never reassigned, so ingredient_id values stored on inventory
+    items stay valid across catalog reloads. Writes in the caller's
+    transaction and returns the number of new names.
+    """
+    counts = _count_recipe_ingredients(db.query(RecipeModel).all())
+    existing = {row.name: row for row in db.query(IngredientModel).all()}
+    added = 0
+    for name, count in counts.items():
+        row = existing.get(name)
+        if row is None:
+            db.add(IngredientModel(name=name, recipe_count=count))
+            added += 1
+        elif row.recipe_count != count:
+            row.recipe_count = count
+    db.flush()
+    return added
+
+def _load_vocabulary(db: Session) -> IngredientVocabulary:
+    session = Session(bind=db.get_bind())
+    try:
+        if session.query(IngredientModel.id).first() is None:
+            sync_ingredient_vocabulary(session)
+            session.commit()
+        rows = session.query(IngredientModel.id, IngredientModel.name, IngredientModel.recipe_count).all()
+    finally:
+        session.close()
+    return IngredientVocabulary([tuple(row) for row in rows])
+
+def get_vocabulary(db: Session) -> IngredientVocabulary:
+    """Return the process-wide vocabulary, building ids from recipes if none exist yet"""
+    global _vocabulary
+    if _vocabulary is None:
+        with _vocabulary_lock:
+            if _vocabulary is None:
+                _vocabulary = _load_vocabulary(db)
+    return _vocabulary
+
+def reload_vocabulary(db: Session) -> IngredientVocabulary:
+    """Swap in a vocabulary freshly read from the ingredients table"""
+    global _vocabulary
+    vocabulary = _load_vocabulary(db)
+    with _vocabulary_lock:
+        _vocabulary = vocabulary
+    return vocabulary
+
+def register_recipe_ingredients(db: Session, recipe: RecipeModel) -> List[Tuple[int, str, int]]:
+    """Give a new recipe's ingredients ids in the caller's transaction.
+
+    Returns the (id, name, recipe_count) rows to hand to
+    add_to_loaded_vocabulary once the caller has committed.
+    """
+    rows = []
+    for key in set(canonical_ingredient_key(name) for name in recipe.uses_ingredients or []):
+        if not key:
+            continue
+        row = db.query(IngredientModel).filter(IngredientModel.name == key).first()
+        if row is None:
+            row = IngredientModel(name=key, recipe_count=0)
+            db.add(row)
+        row.recipe_count += 1
+        db.flush()
+        rows.append((row.id, row.name, row.recipe_count))
+    return rows
+
+def add_to_loaded_vocabulary(rows: List[Tuple[int, str, int]]):
+    """Apply committed ingredient rows to the loaded vocabulary, if there is one"""
+    vocabulary = _vocabulary
+    if vocabulary is None or not rows:
+        return
+    for ingredient_id, name, count in rows:
+        vocabulary.add(ingredient_id, name, count)
+    vocabulary.rebuild()
+
+def canonical_ingredient_id(db: Session, name: str) -> Optional[int]:
+    """Resolve a free-form inventory name to its canonical ingredient id on an exact key match.
+
+    Matchers treat a stored id as an exact ingredient match, so fuzzy hits
+    ("tomato paste" -> tomato) are left to the autocomplete and canonicalize
+    endpoints and never stored.
+    """
+    return get_vocabulary(db).by_name.get(canonical_ingredient_key(name))
@@ -1,6 +1,9 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from models import Base, Recipe as RecipeModel, InventoryItem as InventoryItemModel
+from database import upgrade_database
+from models import Recipe as RecipeModel, InventoryItem as InventoryItemModel
+from ingredient_parser import parse_recipe_ingredients
+from ingredient_vocabulary import sync_ingredient_vocabulary
 from datetime import datetime, timedelta
 import os
 from dotenv import load_dotenv
@@ -8,11 +11,10 @@ from dotenv import load_dotenv
 load_dotenv()
 
 def create_tables():
-    """Create all database tables"""
+    """Bring the schema up to date by running the migrations"""
     DATABASE_URL = os.getenv("DATABASE_URL")
-    engine = create_engine(DATABASE_URL)
-    Base.metadata.create_all(bind=engine)
-    return engine
+    upgrade_database(DATABASE_URL)
+    return create_engine(DATABASE_URL)
 
 def populate_recipes(engine):
     """Populate database with comprehensive recipe data"""
@@ -329,6 +331,7 @@ def populate_recipes(engine):
             existing = db.query(RecipeModel).filter(RecipeModel.id == recipe_data["id"]).first()
             if not existing:
                 recipe = RecipeModel(**recipe_data)
+                recipe.parsed_ingredients = parse_recipe_ingredients(recipe.ingredients, recipe.uses_ingredients)
                 db.add(recipe)
         
         db.commit()
@@ -340,6 +343,41 @@ def populate_recipes(engine):
     finally:
         db.close()
 
+def parse_recipe_measurements(engine):
+    """Fill in structured quantities for recipes stored before parsing existed"""
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = SessionLocal()
+
+    try:
+        recipes = db.query(RecipeModel).filter(RecipeModel.parsed_ingredients.is_(None)).all()
+        for recipe in recipes:
+            recipe.parsed_ingredients = parse_recipe_ingredients(recipe.ingredients, recipe.uses_ingredients)
+
+        db.commit()
+        print(f"Parsed measurements for {len(recipes)} recipes")
+
+    except Exception as e:
+        print(f"Error parsing recipe measurements: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+def populate_ingredient_vocabulary(engine):
+    """Assign canonical ingredient ids to every name used by a recipe"""
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = SessionLocal()
+
+    try:
+        added = sync_ingredient_vocabulary(db)
+        db.commit()
+        print(f"Added {added} ingredients to the vocabulary")
+
+    except Exception as e:
+        print(f"Error building ingredient vocabulary: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
 def populate_sample_inventory(engine):
     """Add some sample inventory items for testing"""
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -402,6 +440,12 @@ if __name__ == "__main__":
     print("Populating recipes...")
     populate_recipes(engine)
     
+    print("Parsing recipe measurements...")
+    parse_recipe_measurements(engine)
+    
+    print("Building ingredient vocabulary...")
+    populate_ingredient_vocabulary(engine)
+    
     print("Populating sample inventory...")
     populate_sample_inventory(engine)
     
@@ -0,0 +1,112 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, update
+from database import upsert
+from models import InventoryItem as InventoryItemModel, InventoryEvent, WasteRollup, DEFAULT_HOUSEHOLD
+from typing import Dict, List
+from datetime import datetime, timedelta
+
+OUTCOME_USED = "used"
+OUTCOME_DISCARDED = "discarded"
+
+def _upsert_rollup(db: Session, household_id: str, day, category: str, outcome: str, quantity: int):
+    """Add one event to its daily rollup row, creating the row on first use"""
+    values = {
+        "household_id": household_id,
+        "day": day,
+        "category": category,
+        "outcome": outcome,
+        "event_count": 1,
+        "total_quantity": quantity,
+    }
+    increments = {
+        "event_count": WasteRollup.event_count + 1,
+        "total_quantity": WasteRollup.total_quantity + quantity,
+    }
+    key = [WasteRollup.household_id, WasteRollup.day, WasteRollup.category, WasteRollup.outcome]
+    if upsert(db, WasteRollup, values, key, set_=increments):
+        return
+
+    result = db.execute(
+        update(WasteRollup)
+        .where(
+            WasteRollup.household_id == household_id,
+            WasteRollup.day == day,
+            WasteRollup.category == category,
+            WasteRollup.outcome == outcome,
+        )
+        .values(**increments)
+    )
+    if result.rowcount == 0:
+        db.add(WasteRollup(**values))
+
+def record_inventory_event(db: Session, item: InventoryItemModel, outcome: str,
+                           household_id: str = DEFAULT_HOUSEHOLD) -> InventoryEvent:
+    """Append a used/discarded event and fold it into the household's daily rollups"""
+    occurred_at = datetime.utcnow()
+    event = InventoryEvent(
+        household_id=household_id,
+        item_id=item.id,
+        name=item.name,
+        category=item.category,
+        quantity=item.quantity,
+        outcome=outcome,
+        occurred_at=occurred_at,
+    )
+    db.add(event)
+    _upsert_rollup(db, household_id, occurred_at.date(), item.category, outcome, item.quantity)
+    return event
+
+def get_waste_stats(db: Session, days: int = 90, household_id: str = DEFAULT_HOUSEHOLD) -> Dict:
+    """Summarize a household's used vs discarded items over the last N days from the rollups.
+
+    Reads at most days * categories * 2 rollup rows, so the cost does not
+    depend on how many raw events have been logged.
+    """
+    since = datetime.utcnow().date() - timedelta(days=days - 1)
+    rows = (
+        db.query(
+            WasteRollup.category,
+            WasteRollup.outcome,
+            func.sum(WasteRollup.event_count),
+            func.sum(WasteRollup.total_quantity),
+        )
+        .filter(WasteRollup.household_id == household_id, WasteRollup.day >= since)
+        .group_by(WasteRollup.category, WasteRollup.outcome)
+        .all()
+    )
+
+    totals = {
+        OUTCOME_USED: {"count": 0, "quantity": 0},
+        OUTCOME_DISCARDED: {"count": 0, "quantity": 0},
+    }
+    categories: Dict[str, Dict] = {}
+    for category, outcome, count, quantity in rows:
+        if outcome not in totals:
+            continue
+        totals[outcome]["count"] += count or 0
+        totals[outcome]["quantity"] += quantity or 0
+        entry = categories.setdefault(category, {
+            "category": category,
+            "used_count": 0,
+            "used_quantity": 0,
+            "discarded_count": 0,
+            "discarded_quantity": 0,
+        })
+        entry[f"{outcome}_count"] += count or 0
+        entry[f"{outcome}_quantity"] += quantity or 0
+
+    used_count = totals[OUTCOME_USED]["count"]
+    discarded_count = totals[OUTCOME_DISCARDED]["count"]
+    finished = used_count + discarded_count
+    by_category: List[Dict] = sorted(categories.values(), key=lambda c: c["discarded_quantity"], reverse=True)
+
+    return {
+        "days": days,
+        "since": since,
+        "used_count": used_count,
+        "used_quantity": totals[OUTCOME_USED]["quantity"],
+        "discarded_count": discarded_count,
+        "discarded_quantity": totals[OUTCOME_DISCARDED]["quantity"],
+        "waste_rate": discarded_count / finished if finished else 0.0,
+        "by_category": by_category,
+    }
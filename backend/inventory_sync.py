@@ -0,0 +1,160 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import update, delete
+from database import upsert
+from models import InventoryItem as InventoryItemModel, InventoryTombstone, SyncCounter, DEFAULT_HOUSEHOLD
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+
+# The single inventory counter every household shared before counters were
+# per household; new household counters continue from its value
+INVENTORY_COUNTER = "inventory"
+
+class VersionConflict(Exception):
+    """The item exists but its change_seq no longer matches the caller's copy"""
+
+def inventory_counter(household_id: str = DEFAULT_HOUSEHOLD) -> str:
+    """Name of the counter row a household's inventory writes bump"""
+    return f"{INVENTORY_COUNTER}:{household_id}"
+
+def _counter_start(db: Session, name: str) -> int:
+    """Value a missing counter starts from.
+
+    Household inventory counters start at the old shared counter, so cursors
+    clients got from it never run ahead of their household's sequence.
+    """
+    if name.startswith(f"{INVENTORY_COUNTER}:"):
+        return db.query(SyncCounter.value).filter(SyncCounter.name == INVENTORY_COUNTER).scalar() or 0
+    return 0
+
+def next_change_seq(db: Session, name: str, count: int = 1) -> int:
+    """Bump and return the change sequence for one writer transaction.
+
+    The counter row stays locked until the caller commits, so sequence order
+    matches commit order and a client cursor can never skip a late commit.
+    Inventory writers pass their household's inventory_counter, so only
+    writers of the same household wait on each other. Batch writers reserve
+    `count` values at once and get back the last one.
+    """
+    value = db.execute(
+        update(SyncCounter)
+        .where(SyncCounter.name == name)
+        .values(value=SyncCounter.value + count)
+        .returning(SyncCounter.value)
+    ).scalar()
+    if value is None:
+        # First write under this name; two of them may race to create the row
+        start = _counter_start(db, name)
+        row = {"name": name, "value": start + count}
+        if not upsert(db, SyncCounter, row, [SyncCounter.name], set_={"value": SyncCounter.value + count}):
+            db.add(SyncCounter(**row))
+            db.flush()
+        value = db.query(SyncCounter.value).filter(SyncCounter.name == name).scalar()
+    return value
+
+def current_change_seq(db: Session, name: str) -> int:
+    """Return the latest committed change sequence without bumping it"""
+    value = db.query(SyncCounter.value).filter(SyncCounter.name == name).scalar()
+    return value if value is not None else _counter_start(db, name)
+
+def record_deletion(db: Session, item_id: str, seq: Optional[int] = None, household_id: str = DEFAULT_HOUSEHOLD) -> int:
+    """Leave a tombstone so delta-syncing clients learn the item is gone"""
+    if seq is None:
+        seq = next_change_seq(db, inventory_counter(household_id))
+    values = {"item_id": item_id, "household_id": household_id, "change_seq": seq, "deleted_at": datetime.utcnow()}
+    if not upsert(db, InventoryTombstone, values, [InventoryTombstone.item_id], ["household_id", "change_seq", "deleted_at"]):
+        db.merge(InventoryTombstone(**values))
+    return seq
+
+def _check_missing_or_conflict(db: Session, item_id: str, expected_seq: Optional[int], household_id: str):
+    """Explain why a guarded write touched no rows; None means the item is gone"""
+    if expected_seq is None:
+        return None
+    current = (
+        db.query(InventoryItemModel.change_seq)
+        .filter(InventoryItemModel.id == item_id, InventoryItemModel.household_id == household_id)
+        .scalar()
+    )
+    if current is not None:
+        raise VersionConflict(current)
+    return None
+
+def update_item(db: Session, item_id: str, changes: Dict, expected_seq: Optional[int] = None,
+                household_id: str = DEFAULT_HOUSEHOLD) -> Optional[InventoryItemModel]:
+    """Apply changes with one UPDATE ... RETURNING and return the new row, or None if missing.
+
+    With expected_seq the write only lands if the stored change_seq still
+    matches, otherwise VersionConflict carries the current value. The counter
+    is bumped first, as in every other writer, so row locks are always taken
+    in the same order.
+    """
+    seq = next_change_seq(db, inventory_counter(household_id))
+    stmt = update(InventoryItemModel).where(InventoryItemModel.id == item_id, InventoryItemModel.household_id == household_id)
+    if expected_seq is not None:
+        stmt = stmt.where(InventoryItemModel.change_seq == expected_seq)
+    stmt = stmt.values(**changes, change_seq=seq).returning(InventoryItemModel)
+    item = db.execute(stmt, execution_options={"synchronize_session": False}).scalar()
+    if item is None:
+        return _check_missing_or_conflict(db, item_id, expected_seq, household_id)
+    return item
+
+def delete_item(db: Session, item_id: str, expected_seq: Optional[int] = None, household_id: str = DEFAULT_HOUSEHOLD):
+    """Delete with one DELETE ... RETURNING and leave a tombstone.
+
+    Returns the deleted row (id, name, category, quantity), enough to log an
+    inventory event, or None if the item did not exist.
+    """
+    seq = next_change_seq(db, inventory_counter(household_id))
+    stmt = delete(InventoryItemModel).where(InventoryItemModel.id == item_id, InventoryItemModel.household_id == household_id)
+    if expected_seq is not None:
+        stmt = stmt.where(InventoryItemModel.change_seq == expected_seq)
+    stmt = stmt.returning(
+        InventoryItemModel.id,
+        InventoryItemModel.name,
+        InventoryItemModel.category,
+        InventoryItemModel.quantity,
+    )
+    row = db.execute(stmt, execution_options={"synchronize_session": False}).first()
+    if row is None:
+        return _check_missing_or_conflict(db, item_id, expected_seq, household_id)
+    record_deletion(db, item_id, seq, household_id)
+    return row
+
+def get_changes_since(db: Session, since: Optional[int], limit: int = 500,
+                      household_id: str = DEFAULT_HOUSEHOLD) -> Tuple[List[InventoryItemModel], List[str], int, bool]:
+    """Return (upserted items, deleted ids, next cursor, has_more) after a cursor.
+
+    Both lookups are range scans on the (household_id, change_seq) indexes, so the cost
+    grows with the number of changes rather than the size of the inventory.
+    Passing no cursor returns a full snapshot and the cursor to resume from.
+    """
+    if since is None:
+        cursor = current_change_seq(db, inventory_counter(household_id))
+        items = db.query(InventoryItemModel).filter(InventoryItemModel.household_id == household_id).all()
+        return items, [], cursor, False
+
+    items = (
+        db.query(InventoryItemModel)
+        .filter(InventoryItemModel.household_id == household_id, InventoryItemModel.change_seq > since)
+        .order_by(InventoryItemModel.change_seq)
+        .limit(limit + 1)
+        .all()
+    )
+    tombstones = (
+        db.query(InventoryTombstone)
+        .filter(InventoryTombstone.household_id == household_id, InventoryTombstone.change_seq > since)
+        .order_by(InventoryTombstone.change_seq)
+        .limit(limit + 1)
+        .all()
+    )
+
+    changes = sorted(
+        [(item.change_seq, item) for item in items] + [(t.change_seq, t) for t in tombstones],
+        key=lambda change: change[0],
+    )
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+
+    upserted = [row for seq, row in changes if isinstance(row, InventoryItemModel)]
+    deleted = [row.item_id for seq, row in changes if isinstance(row, InventoryTombstone)]
+    cursor = changes[-1][0] if changes else since
+    return upserted, deleted, cursor, has_more
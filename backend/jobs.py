@@ -0,0 +1,172 @@
+"""In-process background jobs.
+
+Each job is a row in the jobs table and runs on a small thread pool shared by
+the whole API process. Job functions receive a JobContext to report progress
+and to check for cancellation; progress is kept in memory for live readers
+and written through to the row at most every PROGRESS_WRITE_INTERVAL seconds.
+The per-kind concurrency cap is enforced within this process.
+"""
+
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+from models import Job
+from typing import Any, Callable, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import os
+import threading
+import logging
+import time
+
+JOB_MAX_WORKERS = int(os.getenv("JOB_MAX_WORKERS", "2"))
+PROGRESS_WRITE_INTERVAL = 0.5
+
+logger = logging.getLogger(__name__)
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_SUCCEEDED = "succeeded"
+STATUS_FAILED = "failed"
+STATUS_CANCELLED = "cancelled"
+TERMINAL_STATUSES = {STATUS_SUCCEEDED, STATUS_FAILED, STATUS_CANCELLED}
+
+class JobCancelled(Exception):
+    """Raised inside a job function once cancellation has been requested"""
+
+class JobLimitReached(Exception):
+    """Too many jobs of this kind are already queued or running"""
+
+# kind -> (func(context, db, **params) -> result dict, max concurrent); db is
+# the job's own session, rolled back if the job fails or is cancelled
+_JOB_TYPES: Dict[str, tuple] = {}
+
+def register_job(kind: str, func: Callable[..., Optional[Dict]], max_concurrent: int = 1):
+    _JOB_TYPES[kind] = (func, max_concurrent)
+
+class JobContext:
+    """Handed to a running job for progress reporting and cancellation checks"""
+
+    def __init__(self, runner: "JobRunner", job_id: str, session: Session, cancel_event: threading.Event):
+        self.runner = runner
+        self.job_id = job_id
+        self.session = session
+        self._cancel_event = cancel_event
+        self._written_at = 0.0
+
+    def report(self, force: bool = False, **progress):
+        """Merge progress fields, e.g. report(phase="fetching", fetched=120)"""
+        snapshot = self.runner._update_progress(self.job_id, progress)
+        now = time.monotonic()
+        if force or now - self._written_at >= PROGRESS_WRITE_INTERVAL:
+            self._written_at = now
+            try:
+                self.runner._write(self.session, self.job_id, progress=snapshot)
+            except SQLAlchemyError:
+                # Best effort: SQLite cannot write while the job holds its own
+                # write transaction; live readers still get the in-memory copy
+                self.session.rollback()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def check_cancelled(self):
+        if self._cancel_event.is_set():
+            raise JobCancelled()
+
+class JobRunner:
+    """Bounded worker pool that runs registered job kinds"""
+
+    def __init__(self, max_workers: int = JOB_MAX_WORKERS):
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._active: Dict[str, tuple] = {}
+        self._progress: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, db: Session, kind: str, **params) -> Job:
+        if kind not in _JOB_TYPES:
+            raise KeyError(kind)
+        func, max_concurrent = _JOB_TYPES[kind]
+        with self._lock:
+            if sum(1 for active_kind, _ in self._active.values() if active_kind == kind) >= max_concurrent:
+                raise JobLimitReached(kind)
+            job = Job(kind=kind, status=STATUS_QUEUED, progress={}, cancel_requested=False)
+            db.add(job)
+            db.commit()
+            db.refresh(job)
+            self._active[job.id] = (kind, threading.Event())
+            self._progress[job.id] = {}
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+        self._executor.submit(self._run, job.id, db.get_bind(), func, params)
+        return job
+
+    def cancel(self, db: Session, job_id: str) -> Optional[Job]:
+        """Flag a job for cancellation; it stops at its next check_cancelled()"""
+        job = db.get(Job, job_id)
+        if job is None:
+            return None
+        if job.status not in TERMINAL_STATUSES:
+            job.cancel_requested = True
+            db.commit()
+            db.refresh(job)
+            active = self._active.get(job_id)
+            if active is not None:
+                active[1].set()
+        return job
+
+    def live_progress(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Latest progress of a job running in this process, fresher than the row"""
+        with self._lock:
+            progress = self._progress.get(job_id)
+            return dict(progress) if progress is not None else None
+
+    def _update_progress(self, job_id: str, progress: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            merged = self._progress.setdefault(job_id, {})
+            merged.update(progress)
+            return dict(merged)
+
+    def _write(self, session: Session, job_id: str, **values):
+        session.query(Job).filter(Job.id == job_id).update(values, synchronize_session=False)
+        session.commit()
+
+    def _run(self, job_id: str, bind, func: Callable, params: Dict):
+        cancel_event = self._active[job_id][1]
+        session = Session(bind=bind)
+        work_session = Session(bind=bind)
+        context = JobContext(self, job_id, session, cancel_event)
+        status, result, error = STATUS_FAILED, None, None
+        try:
+            if cancel_event.is_set():
+                raise JobCancelled()
+            self._write(session, job_id, status=STATUS_RUNNING, started_at=datetime.utcnow())
+            result = func(context, work_session, **params)
+            status = STATUS_SUCCEEDED
+        except JobCancelled:
+            work_session.rollback()
+            status = STATUS_CANCELLED
+        except Exception as e:
+            work_session.rollback()
+            error = f"{type(e).__name__}: {e}"
+            logger.exception("Job %s failed: %s", job_id, error)
+        finally:
+            work_session.close()
+            try:
+                self._write(
+                    session, job_id,
+                    status=status, result=result, error=error,
+                    progress=self.live_progress(job_id) or {},
+                    finished_at=datetime.utcnow(),
+                )
+            finally:
+                session.close()
+                with self._lock:
+                    self._active.pop(job_id, None)
+                    self._progress.pop(job_id, None)
+
+job_runner = JobRunner()
+
+def list_jobs(db: Session, limit: int = 50) -> List[Job]:
+    return db.query(Job).order_by(Job.created_at.desc()).limit(limit).all()
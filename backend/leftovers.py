@@ -0,0 +1,118 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import update, delete, or_, and_
+from models import Leftover as LeftoverModel, InventoryItem as InventoryItemModel, DEFAULT_HOUSEHOLD
+from typing import Dict, List, Optional, Tuple
+from shelf_life import as_utc
+from datetime import datetime, timedelta
+import math
+
+# Cooked leftovers keep three to four days in the fridge
+LEFTOVER_SHELF_LIFE_DAYS = 4
+
+STATUS_ACTIVE = "active"
+STATUS_USED = "used"
+STATUS_TRASHED = "trashed"
+
+def new_leftover(data: Dict, now: Optional[datetime] = None) -> LeftoverModel:
+    """Build a leftover row, defaulting the dates the client left out"""
+    now = now or datetime.utcnow()
+    if data.get("purchase_date") is None:
+        data["purchase_date"] = now
+    if data.get("expiration_date") is None:
+        data["expiration_date"] = data["purchase_date"] + timedelta(days=LEFTOVER_SHELF_LIFE_DAYS)
+    return LeftoverModel(**data, status=STATUS_ACTIVE)
+
+def get_active_leftovers(db: Session, due_before: Optional[datetime] = None, not_expired_at: Optional[datetime] = None,
+                         household_id: str = DEFAULT_HOUSEHOLD) -> List[LeftoverModel]:
+    """Active leftovers soonest-expiring first, a range scan on (household_id, status, expiration_date)"""
+    query = db.query(LeftoverModel).filter(LeftoverModel.household_id == household_id, LeftoverModel.status == STATUS_ACTIVE)
+    if not_expired_at is not None:
+        query = query.filter(LeftoverModel.expiration_date >= not_expired_at)
+    if due_before is not None:
+        query = query.filter(LeftoverModel.expiration_date < due_before)
+    return query.order_by(LeftoverModel.expiration_date, LeftoverModel.id).all()
+
+def encode_history_cursor(leftover: LeftoverModel) -> str:
+    return f"{leftover.resolved_at.isoformat()}|{leftover.id}"
+
+def get_leftover_history(db: Session, cursor: Optional[str] = None, limit: int = 50,
+                         household_id: str = DEFAULT_HOUSEHOLD) -> Tuple[List[LeftoverModel], Optional[str]]:
+    """Used and trashed leftovers, most recently resolved first, with keyset pagination.
+
+    Raises ValueError for a malformed cursor.
+    """
+    query = db.query(LeftoverModel).filter(LeftoverModel.household_id == household_id, LeftoverModel.resolved_at.isnot(None))
+    if cursor:
+        timestamp, _, leftover_id = cursor.partition("|")
+        resolved_at = datetime.fromisoformat(timestamp)
+        query = query.filter(or_(
+            LeftoverModel.resolved_at < resolved_at,
+            and_(LeftoverModel.resolved_at == resolved_at, LeftoverModel.id < leftover_id),
+        ))
+    rows = query.order_by(LeftoverModel.resolved_at.desc(), LeftoverModel.id.desc()).limit(limit + 1).all()
+    next_cursor = encode_history_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+def update_leftover(db: Session, leftover_id: str, changes: Dict, household_id: str = DEFAULT_HOUSEHOLD) -> Optional[LeftoverModel]:
+    """Apply field changes with one UPDATE ... RETURNING; None if the leftover is missing"""
+    stmt = (
+        update(LeftoverModel)
+        .where(LeftoverModel.id == leftover_id, LeftoverModel.household_id == household_id)
+        .values(**changes)
+        .returning(LeftoverModel)
+    )
+    return db.execute(stmt, execution_options={"synchronize_session": False}).scalar()
+
+def set_leftover_status(db: Session, leftover_id: str, status: str, changes: Optional[Dict] = None,
+                        household_id: str = DEFAULT_HOUSEHOLD) -> Tuple[Optional[LeftoverModel], bool]:
+    """Move a leftover to a status, applying any other field changes in the same UPDATE.
+
+    Returns (row, whether it was just used up or trashed). Resolving only
+    matches active rows, so repeating a mark does not log a second waste event.
+    """
+    changes = dict(changes or {})
+    if status == STATUS_ACTIVE:
+        return update_leftover(db, leftover_id, {**changes, "status": STATUS_ACTIVE, "resolved_at": None}, household_id), False
+    stmt = (
+        update(LeftoverModel)
+        .where(LeftoverModel.id == leftover_id, LeftoverModel.household_id == household_id, LeftoverModel.status == STATUS_ACTIVE)
+        .values(**changes, status=status, resolved_at=datetime.utcnow())
+        .returning(LeftoverModel)
+    )
+    row = db.execute(stmt, execution_options={"synchronize_session": False}).scalar()
+    if row is not None:
+        return row, True
+    if changes:
+        return update_leftover(db, leftover_id, changes, household_id), False
+    return get_leftover(db, leftover_id, household_id), False
+
+def get_leftover(db: Session, leftover_id: str, household_id: str = DEFAULT_HOUSEHOLD) -> Optional[LeftoverModel]:
+    leftover = db.get(LeftoverModel, leftover_id)
+    return leftover if leftover is not None and leftover.household_id == household_id else None
+
+def delete_leftover(db: Session, leftover_id: str, household_id: str = DEFAULT_HOUSEHOLD) -> bool:
+    stmt = (
+        delete(LeftoverModel)
+        .where(LeftoverModel.id == leftover_id, LeftoverModel.household_id == household_id)
+        .returning(LeftoverModel.id)
+    )
+    return db.execute(stmt, execution_options={"synchronize_session": False}).first() is not None
+
+def leftovers_as_inventory(leftovers: List[LeftoverModel], now: Optional[datetime] = None) -> List[InventoryItemModel]:
+    """Present leftovers to the recommendation engine as (unsaved) inventory items"""
+    now = now or datetime.utcnow()
+    items = []
+    for leftover in leftovers:
+        remaining = (as_utc(leftover.expiration_date) - as_utc(now)).total_seconds() / 86400
+        items.append(InventoryItemModel(
+            id=leftover.id,
+            name=leftover.name,
+            category=leftover.category,
+            quantity=leftover.quantity,
+            ingredient_id=leftover.ingredient_id,
+            purchase_date=leftover.purchase_date,
+            expiration_date=leftover.expiration_date,
+            days_until_expiration=max(0, math.ceil(remaining)),
+            total_shelf_life=max(1, (leftover.expiration_date - leftover.purchase_date).days),
+        ))
+    return items
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""Replay a realistic traffic mix against a local EcoEats API and report latency.
+
+Seeds a throwaway SQLite database (or the DATABASE_URL you pass, e.g. a
+Postgres container), starts `main:app` under uvicorn in a subprocess, then
+fires an open-loop request schedule at a target rate. Latency is measured
+from each request's scheduled start, so a slow server shows up as queueing
+delay instead of silently lowering the offered load.
+
+    python load_test.py --rps 50 --duration 30 --output run.json
+    python load_test.py --rps 50 --duration 30 --compare run.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import httpx
+
+DEFAULT_MIX = "dashboard=60,suggestions=25,mutations=15"
+
+SAMPLE_ITEMS = [
+    ("Milk", "dairy"), ("Eggs", "dairy"), ("Bananas", "fruits"), ("Spinach", "vegetables"),
+    ("Chicken Breast", "poultry"), ("Tomatoes", "vegetables"), ("Bread", "bakery"),
+    ("Cheese", "dairy"), ("Broccoli", "vegetables"), ("Salmon", "seafood"),
+    ("Honey", "condiments"), ("Pasta", "grains"), ("Garlic", "vegetables"), ("Butter", "dairy"),
+]
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        weights[name.strip()] = float(weight)
+    unknown = set(weights) - {"dashboard", "suggestions", "mutations"}
+    if unknown:
+        raise SystemExit(f"Unknown traffic classes in --mix: {', '.join(sorted(unknown))}")
+    return weights
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[index]
+
+def seed_database(database_url: str, extra_items: int):
+    """Create tables, load the bundled recipes and a household-sized inventory"""
+    os.environ["DATABASE_URL"] = database_url
+    import init_db
+    from sqlalchemy.orm import sessionmaker
+    from models import InventoryItem as InventoryItemModel
+    from shelf_life import fill_expiration_dates
+
+    engine = init_db.create_tables()
+    init_db.populate_recipes(engine)
+    init_db.parse_recipe_measurements(engine)
+    init_db.populate_ingredient_vocabulary(engine)
+    init_db.populate_sample_inventory(engine)
+
+    db = sessionmaker(bind=engine)()
+    try:
+        for i in range(extra_items):
+            name, category = SAMPLE_ITEMS[i % len(SAMPLE_ITEMS)]
+            db.add(InventoryItemModel(**fill_expiration_dates({"name": name, "category": category, "quantity": 1 + i % 5})))
+        db.commit()
+    finally:
+        db.close()
+    engine.dispose()
+
+def start_server(database_url: str, port: int) -> subprocess.Popen:
+    env = dict(os.environ, DATABASE_URL=database_url)
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env,
+    )
+
+async def wait_until_ready(client: httpx.AsyncClient, timeout: float = 30.0):
+    """Poll the readiness probe, which answers 503 until the startup warm-up has finished"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            response = await client.get("/api/ready/")
+            if response.status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise SystemExit("API did not become ready in time")
+
+class TrafficMix:
+    """Turns a traffic class into a concrete request, tracking created items"""
+
+    def __init__(self, weights: Dict[str, float], rng: random.Random):
+        self.classes = list(weights)
+        self.weights = [weights[name] for name in self.classes]
+        self.rng = rng
+        self.created_ids: List[str] = []
+
+    def pick(self) -> str:
+        return self.rng.choices(self.classes, self.weights)[0]
+
+    async def run(self, client: httpx.AsyncClient, traffic_class: str):
+        """Send one request; return (route label, response)"""
+        if traffic_class == "dashboard":
+            if self.rng.random() < 0.7:
+                return "GET /api/inventory/", await client.get("/api/inventory/")
+            return "GET /api/recipes/", await client.get("/api/recipes/")
+        if traffic_class == "suggestions":
+            return "GET /api/recipes/suggestions/", await client.get("/api/recipes/suggestions/")
+
+        roll = self.rng.random()
+        if roll < 0.5 or not self.created_ids:
+            name, category = self.rng.choice(SAMPLE_ITEMS)
+            response = await client.post("/api/inventory/", json={"name": name, "category": category, "quantity": self.rng.randint(1, 6)})
+            if response.status_code == 200:
+                self.created_ids.append(response.json()["id"])
+            return "POST /api/inventory/", response
+        item_id = self.created_ids.pop(self.rng.randrange(len(self.created_ids)))
+        if roll < 0.7:
+            self.created_ids.append(item_id)
+            return "PUT /api/inventory/{id}/", await client.put(f"/api/inventory/{item_id}/", json={"quantity": self.rng.randint(1, 6)})
+        if roll < 0.85:
+            return "POST /api/inventory/{id}/mark-used/", await client.post(f"/api/inventory/{item_id}/mark-used/")
+        return "POST /api/inventory/{id}/mark-discarded/", await client.post(f"/api/inventory/{item_id}/mark-discarded/")
+
+async def generate_load(base_url: str, rps: float, duration: float, weights: Dict[str, float],
+                        max_in_flight: int, seed: int) -> Dict:
+    rng = random.Random(seed)
+    mix = TrafficMix(weights, rng)
+    samples: Dict[str, Dict[str, list]] = {}
+    semaphore = asyncio.Semaphore(max_in_flight)
+    limits = httpx.Limits(max_connections=max_in_flight, max_keepalive_connections=max_in_flight)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=30.0, limits=limits) as client:
+        await wait_until_ready(client)
+
+        async def fire(traffic_class: str, scheduled: float):
+            async with semaphore:
+                try:
+                    route, response = await mix.run(client, traffic_class)
+                    ok = response.status_code < 400
+                except httpx.HTTPError:
+                    route, ok = f"{traffic_class} (transport error)", False
+            elapsed_ms = (time.perf_counter() - scheduled) * 1000.0
+            stats = samples.setdefault(route, {"latencies": [], "errors": 0})
+            stats["latencies"].append(elapsed_ms)
+            if not ok:
+                stats["errors"] += 1
+
+        tasks = []
+        started = time.perf_counter()
+        next_send = started
+        while next_send - started < duration:
+            delay = next_send - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(fire(mix.pick(), next_send)))
+            next_send += rng.expovariate(rps)
+        await asyncio.gather(*tasks)
+        wall = time.perf_counter() - started
+
+    routes = {}
+    total = 0
+    for route, stats in sorted(samples.items()):
+        latencies = stats["latencies"]
+        total += len(latencies)
+        routes[route] = {
+            "count": len(latencies),
+            "errors": stats["errors"],
+            "error_rate": stats["errors"] / len(latencies),
+            "throughput_rps": len(latencies) / wall,
+            "latency_ms": {
+                "p50": percentile(latencies, 0.50),
+                "p90": percentile(latencies, 0.90),
+                "p99": percentile(latencies, 0.99),
+                "max": max(latencies),
+                "mean": sum(latencies) / len(latencies),
+            },
+        }
+    return {"wall_seconds": wall, "total_requests": total, "achieved_rps": total / wall, "routes": routes}
+
+def print_report(report: Dict, baseline: Optional[Dict] = None):
+    print(f"\n{report['total_requests']} requests in {report['wall_seconds']:.1f}s ({report['achieved_rps']:.1f} req/s)")
+    print(f"{'route':45} {'count':>6} {'err%':>6} {'p50':>9} {'p99':>9}")
+    for route, stats in report["routes"].items():
+        latency = stats["latency_ms"]
+        line = f"{route:45} {stats['count']:6d} {stats['error_rate'] * 100:6.1f} {latency['p50']:8.1f}ms {latency['p99']:8.1f}ms"
+        previous = (baseline or {}).get("routes", {}).get(route)
+        if previous:
+            line += f"  (p50 {latency['p50'] - previous['latency_ms']['p50']:+.1f}ms, p99 {latency['p99'] - previous['latency_ms']['p99']:+.1f}ms)"
+        print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rps", type=float, default=20.0, help="target request rate")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of load")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"traffic weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--database-url", help="DB to seed and serve from (default: a temporary SQLite file)")
+    parser.add_argument("--base-url", help="hit an already running API instead of starting one")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--inventory-size", type=int, default=50, help="extra inventory items to seed")
+    parser.add_argument("--max-in-flight", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--compare", help="print deltas against an earlier JSON report")
+    args = parser.parse_args()
+
+    weights = parse_mix(args.mix)
+    server = None
+    scratch = None
+    base_url = args.base_url
+    if base_url is None:
+        database_url = args.database_url
+        if database_url is None:
+            scratch = tempfile.TemporaryDirectory()
+            database_url = f"sqlite:///{os.path.join(scratch.name, 'loadtest.db')}"
+        print(f"Seeding {database_url} ...")
+        seed_database(database_url, args.inventory_size)
+        server = start_server(database_url, args.port)
+        base_url = f"http://127.0.0.1:{args.port}"
+
+    try:
+        print(f"Replaying {args.mix} at {args.rps} req/s for {args.duration}s against {base_url}")
+        results = asyncio.run(generate_load(base_url, args.rps, args.duration, weights, args.max_in_flight, args.seed))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=10)
+        if scratch is not None:
+            scratch.cleanup()
+
+    report = {
+        "started_at": datetime.utcnow().isoformat(),
+        "config": {
+            "rps": args.rps,
+            "duration": args.duration,
+            "mix": weights,
+            "inventory_size": args.inventory_size,
+            "max_in_flight": args.max_in_flight,
+            "seed": args.seed,
+            "base_url": base_url,
+        },
+        **results,
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {args.output}")
+
+if __name__ == "__main__":
+    main()
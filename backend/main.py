@@ -1,18 +1,57 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Query, Header, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from sqlalchemy import func
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Union
+import asyncio
+from contextlib import asynccontextmanager
+import hmac
+import json
+import logging
 import os
-from dotenv import load_dotenv
+from datetime import datetime, timedelta
 
-from database import get_db
-from models import Recipe as RecipeModel, InventoryItem as InventoryItemModel
-from schemas import Recipe, RecipeCreate, InventoryItem, InventoryItemCreate, InventoryItemUpdate
+from database import get_db, get_read_db, PRIMARY_UNTIL_HEADER, ROUTE_HEADER
+from models import Recipe as RecipeModel, InventoryItem as InventoryItemModel, Job as JobModel, DEFAULT_HOUSEHOLD
+from schemas import Recipe, RecipeCreate, InventoryItem, InventoryItemCreate, InventoryItemUpdate, InventoryChanges, WasteStats, IngredientSuggestion, IngredientMatch, ShelfLifeRequest, ShelfLifeEstimate, ProfileSummary, JobStatus, FacetedRecipes, SimilarRecipe, NearMissRecipe, PurchaseSuggestion, WhatIfRequest, WhatIfResult, Leftover, LeftoverCreate, LeftoverUpdate, LeftoverHistory, ExpiryAlert
 from recommendation_engine import get_recipe_recommendations
+from inventory_sync import next_change_seq, inventory_counter, get_changes_since, update_item, delete_item, VersionConflict
+from ingredient_parser import parse_recipe_ingredients
+from catalog import get_catalog, add_recipe_to_catalog, CATALOG_COUNTER
+from recipe_search import search_recipes, autocomplete_recipes
+from recipe_facets import filter_recipes, facet_counts, has_facet_filters
+from recipe_similarity import similar_recipes
+from near_miss import near_miss_purchases, MAX_MISSING_LIMIT
+from what_if import score_baskets, hypothetical_item, MAX_BASKETS
+from ingredient_vocabulary import get_vocabulary, canonical_ingredient_id, register_recipe_ingredients, add_to_loaded_vocabulary
+from shelf_life import estimate_shelf_lives, fill_expiration_dates
+from profiling import ProfilingMiddleware, profile_store, verify_signature
+from inventory_events import record_inventory_event, get_waste_stats, OUTCOME_USED, OUTCOME_DISCARDED
+from leftovers import new_leftover, get_active_leftovers, get_leftover_history, get_leftover as find_leftover, update_leftover, set_leftover_status, delete_leftover, STATUS_USED, STATUS_TRASHED
+from household_suggestions import get_fresh_suggestions, invalidate_household, scoring_inventory, expiry_alerts, current_alerts, SUGGESTIONS_PRECOMPUTE_LIMIT
+from query_accounting import QueryAccountingMiddleware, query_metrics
+from jobs import job_runner, list_jobs, JobLimitReached, TERMINAL_STATUSES
+from fetch_themealdb_recipes import CATALOG_INGEST_JOB
+from warmup import start_warmup, warmup_state
+from compression import CompressionMiddleware, PrecompressedCache, negotiate_encoding
+from columnar import ResponseFormat, FORMAT_ROWS, FORMAT_COLUMNAR, dump_rows, dump_rows_json, to_columnar
 
-load_dotenv()
 
-app = FastAPI(title="EcoEats API", description="Smart food waste reduction API", version="1.0.0")
+logger = logging.getLogger(__name__)
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+JOB_EVENTS_POLL_SECONDS = 0.5
+HOUSEHOLD_HEADER = "X-Household-Id"
+SUGGESTIONS_SOURCE_HEADER = "X-Suggestions-Source"
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start_warmup()
+    yield
+
+app = FastAPI(title="EcoEats API", description="Smart food waste reduction API", version="1.0.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -20,102 +59,552 @@ app.add_middleware(
     allow_credentials=False,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=[PRIMARY_UNTIL_HEADER, ROUTE_HEADER, SUGGESTIONS_SOURCE_HEADER],
 )
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(QueryAccountingMiddleware)
+app.add_middleware(CompressionMiddleware)
+
+# Catalog list bodies, serialized and compressed once per catalog version
+catalog_responses = PrecompressedCache()
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Admin endpoints answer 404 unless ADMIN_TOKEN is set and matches"""
+    if not ADMIN_TOKEN or not x_admin_token or not hmac.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=404, detail="Not found")
+
+def get_household_id(x_household_id: Optional[str] = Header(None)) -> str:
+    """Household named by the X-Household-Id header; there are no accounts yet"""
+    household_id = (x_household_id or DEFAULT_HOUSEHOLD).strip()
+    if not household_id or len(household_id) > 64:
+        raise HTTPException(status_code=400, detail=f"{HOUSEHOLD_HEADER} must be 1-64 characters")
+    return household_id
+
+def _household_inventory(db: Session, household_id: str) -> List[InventoryItemModel]:
+    items = db.query(InventoryItemModel).filter(InventoryItemModel.household_id == household_id).all()
+    return scoring_inventory(items, get_active_leftovers(db, household_id=household_id), datetime.utcnow())
+
+def _with_headers(result: Response, response: Response) -> Response:
+    """Carry headers dependencies set (X-DB-Route, ...) onto a Response returned directly"""
+    result.headers.update(response.headers)
+    return result
+
+def _list_response(model, result, response_format: str, response: Response):
+    """The list (or {"recipes": list, ...}) as is, or with the list in columnar form"""
+    if response_format != FORMAT_COLUMNAR:
+        return result
+    if isinstance(result, dict):
+        content = {**result, "recipes": to_columnar(dump_rows(model, result["recipes"]))}
+    else:
+        content = to_columnar(dump_rows(model, result))
+    return _with_headers(JSONResponse(content), response)
 
 @app.get("/")
 async def root():
     return {"message": "EcoEats API is running"}
 
-@app.get("/api/recipes/", response_model=List[Recipe])
-async def get_recipes(db: Session = Depends(get_db)):
-    recipes = db.query(RecipeModel).all()
-    return recipes
+@app.get("/api/ready/")
+async def readiness(response: Response):
+    """Readiness probe: 503 until the startup warm-up has finished"""
+    if not warmup_state.ready:
+        response.status_code = 503
+    return warmup_state.snapshot()
+
+@app.get("/api/recipes/", response_model=Union[List[Recipe], FacetedRecipes])
+async def get_recipes(
+    request: Request,
+    response: Response,
+    dietary_tags: Optional[List[str]] = Query(None),
+    cuisine: Optional[List[str]] = Query(None),
+    max_prep_time: Optional[int] = None,
+    facets: bool = False,
+    response_format: ResponseFormat = Query(FORMAT_ROWS, alias="format"),
+    db: Session = Depends(get_read_db),
+):
+    catalog = get_catalog(db)
+
+    def build() -> bytes:
+        recipes, counts = catalog.recipes, None
+        if facets or has_facet_filters(dietary_tags, cuisine, max_prep_time):
+            recipes, counts = filter_recipes(catalog, dietary_tags, cuisine, max_prep_time)
+        if response_format == FORMAT_ROWS and not facets:
+            return dump_rows_json(Recipe, recipes)
+        payload = dump_rows(Recipe, recipes)
+        if response_format == FORMAT_COLUMNAR:
+            payload = to_columnar(payload)
+        if facets:
+            payload = {"total": len(recipes), "recipes": payload, "facets": counts}
+        return json.dumps(payload, separators=(",", ":")).encode()
+
+    # id() too: a reloaded snapshot may reuse a version number
+    key = (id(catalog), catalog.version, tuple(sorted(dietary_tags or ())), tuple(sorted(cuisine or ())),
+           max_prep_time, facets, response_format)
+    result = catalog_responses.response(key, negotiate_encoding(request.headers.get("accept-encoding")), build)
+    return _with_headers(result, response)
+
+# Writes the shared catalog and every process's in-memory indexes
+@app.post("/api/recipes/", response_model=Recipe, dependencies=[Depends(require_admin)])
+async def create_recipe(recipe: RecipeCreate, db: Session = Depends(get_db)):
+    db_recipe = RecipeModel(**recipe.dict())
+    db_recipe.parsed_ingredients = parse_recipe_ingredients(db_recipe.ingredients, db_recipe.uses_ingredients)
+    # Counter first, as in the bulk ingest, so both take their row locks in the same order
+    source_seq = next_change_seq(db, CATALOG_COUNTER)
+    db.add(db_recipe)
+    ingredients = register_recipe_ingredients(db, db_recipe)
+    db.commit()
+    add_to_loaded_vocabulary(ingredients)
+    db.refresh(db_recipe)
+    add_recipe_to_catalog(db_recipe, source_seq)
+    return db_recipe
+
+@app.get("/api/recipes/search/", response_model=List[Recipe])
+async def search_recipe_catalog(
+    q: str,
+    response: Response,
+    dietary_tags: Optional[List[str]] = Query(None),
+    max_prep_time: Optional[int] = None,
+    limit: int = 20,
+    response_format: ResponseFormat = Query(FORMAT_ROWS, alias="format"),
+    db: Session = Depends(get_read_db),
+):
+    catalog = get_catalog(db)
+    recipes = search_recipes(catalog, q, min(max(limit, 1), 100), dietary_tags, max_prep_time)
+    return _list_response(Recipe, recipes, response_format, response)
+
+@app.get("/api/recipes/autocomplete/", response_model=List[str])
+async def autocomplete_recipe_search(prefix: str, limit: int = 10, db: Session = Depends(get_read_db)):
+    catalog = get_catalog(db)
+    return autocomplete_recipes(catalog, prefix, min(max(limit, 1), 10))
 
-@app.get("/api/recipes/suggestions/", response_model=List[Recipe])
-async def get_recipe_suggestions(db: Session = Depends(get_db)):
+@app.get("/api/recipes/suggestions/", response_model=Union[List[Recipe], FacetedRecipes])
+async def get_recipe_suggestions(
+    response: Response,
+    dietary_tags: Optional[List[str]] = Query(None),
+    cuisine: Optional[List[str]] = Query(None),
+    max_prep_time: Optional[int] = None,
+    facets: bool = False,
+    limit: int = 10,
+    response_format: ResponseFormat = Query(FORMAT_ROWS, alias="format"),
+    db: Session = Depends(get_read_db),
+    household_id: str = Depends(get_household_id),
+):
     try:
-        inventory_items = db.query(InventoryItemModel).all()
-        print(f"Found {len(inventory_items)} inventory items")
-        for item in inventory_items:
-            print(f"  - {item.name} (expires in {item.days_until_expiration} days)")
-        
-        recommendations = get_recipe_recommendations(db, inventory_items)
-        print(f"Generated {len(recommendations)} recommendations")
-        return recommendations
+        limit = min(max(limit, 1), 100)
+        if not facets and not has_facet_filters(dietary_tags, cuisine, max_prep_time) and limit <= SUGGESTIONS_PRECOMPUTE_LIMIT:
+            precomputed = get_fresh_suggestions(db, household_id)
+            if precomputed is not None:
+                response.headers[SUGGESTIONS_SOURCE_HEADER] = "precomputed"
+                by_id = get_catalog(db).by_id
+                recipes = [by_id[recipe_id] for recipe_id in precomputed.recipe_ids if recipe_id in by_id][:limit]
+                return _list_response(Recipe, recipes, response_format, response)
+        response.headers[SUGGESTIONS_SOURCE_HEADER] = "live"
+        inventory_items = _household_inventory(db, household_id)
+        logger.debug("Scoring suggestions for %s inventory items", len(inventory_items))
+
+        # The in-memory catalog, not a fresh SELECT of every recipe
+        catalog = get_catalog(db)
+        candidates = catalog.recipes
+        if has_facet_filters(dietary_tags, cuisine, max_prep_time):
+            candidates, _ = filter_recipes(catalog, dietary_tags, cuisine, max_prep_time)
+        recommendations = get_recipe_recommendations(db, inventory_items, None if facets else limit, candidates)
+        logger.debug("Generated %s recommendations", len(recommendations))
+        if facets:
+            counts = facet_counts(catalog, [recipe.id for recipe in recommendations])
+            faceted = {"total": len(recommendations), "recipes": recommendations[:limit], "facets": counts}
+            return _list_response(Recipe, faceted, response_format, response)
+        return _list_response(Recipe, recommendations, response_format, response)
+    except OperationalError:
+        # get_read_db has to see it to take a failing replica out of rotation
+        raise
     except Exception as e:
-        print(f"Error in get_recipe_suggestions: {e}")
+        logger.exception("Error in get_recipe_suggestions")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/recipes/near-misses/", response_model=List[PurchaseSuggestion])
+async def get_near_miss_purchases(max_missing: int = 1, limit: int = 10, db: Session = Depends(get_read_db),
+                                  household_id: str = Depends(get_household_id)):
+    inventory_items = _household_inventory(db, household_id)
+    purchases = near_miss_purchases(
+        db, get_catalog(db), inventory_items,
+        min(max(max_missing, 1), MAX_MISSING_LIMIT), min(max(limit, 1), 50),
+    )
+    for purchase in purchases:
+        purchase["recipes"] = [
+            NearMissRecipe(**Recipe.model_validate(recipe).model_dump(), missing_ingredients=missing, urgency=urgency)
+            for recipe, missing, urgency in purchase["recipes"]
+        ]
+    return purchases
+
+@app.post("/api/recipes/what-if/", response_model=List[WhatIfResult])
+async def score_what_if_baskets(request: WhatIfRequest, db: Session = Depends(get_read_db),
+                                household_id: str = Depends(get_household_id)):
+    if len(request.baskets) > MAX_BASKETS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BASKETS} baskets per request")
+    shared_items = []
+    if request.include_inventory:
+        shared_items = _household_inventory(db, household_id)
+    baskets = [[hypothetical_item(item.dict()) for item in basket.items] for basket in request.baskets]
+    results = score_baskets(db, get_catalog(db), baskets, shared_items, min(max(request.limit, 1), 100))
+    return [
+        {"label": basket.label, "total": total, "recipes": recipes}
+        for basket, (total, recipes) in zip(request.baskets, results)
+    ]
+
 @app.get("/api/recipes/{recipe_id}/", response_model=Recipe)
-async def get_recipe(recipe_id: str, db: Session = Depends(get_db)):
+async def get_recipe(recipe_id: str, db: Session = Depends(get_read_db)):
     recipe = db.query(RecipeModel).filter(RecipeModel.id == recipe_id).first()
     if not recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
     return recipe
 
+@app.get("/api/recipes/{recipe_id}/similar/", response_model=List[SimilarRecipe])
+async def get_similar_recipes(recipe_id: str, limit: int = 10, use_inventory: bool = False, db: Session = Depends(get_read_db),
+                              household_id: str = Depends(get_household_id)):
+    catalog = get_catalog(db)
+    if recipe_id not in catalog.by_id:
+        raise HTTPException(status_code=404, detail="Recipe not found")
+    inventory_names = None
+    if use_inventory:
+        inventory_names = [name for (name,) in db.query(InventoryItemModel.name).filter(InventoryItemModel.household_id == household_id)]
+    neighbours = similar_recipes(catalog, recipe_id, min(max(limit, 1), 50), inventory_names)
+    return [
+        SimilarRecipe(**Recipe.model_validate(recipe).model_dump(), similarity=similarity, inventory_coverage=coverage)
+        for recipe, similarity, coverage in neighbours
+    ]
+
+@app.get("/api/ingredients/autocomplete/", response_model=List[IngredientSuggestion])
+async def autocomplete_ingredients(q: str, limit: int = 10, db: Session = Depends(get_read_db)):
+    vocabulary = get_vocabulary(db)
+    suggestions = vocabulary.suggest(q, min(max(limit, 1), 25))
+    return [{"id": id, "name": name, "recipe_count": count} for id, name, count in suggestions]
+
+@app.get("/api/ingredients/canonicalize/", response_model=Optional[IngredientMatch])
+async def canonicalize_ingredient(name: str, db: Session = Depends(get_read_db)):
+    match = get_vocabulary(db).canonicalize(name)
+    if not match:
+        return None
+    return {"id": match[0], "name": match[1], "confidence": match[2]}
+
 @app.get("/api/inventory/", response_model=List[InventoryItem])
-async def get_inventory(db: Session = Depends(get_db)):
-    items = db.query(InventoryItemModel).all()
-    return items
+async def get_inventory(response: Response, name: Optional[str] = None,
+                        response_format: ResponseFormat = Query(FORMAT_ROWS, alias="format"),
+                        db: Session = Depends(get_read_db), household_id: str = Depends(get_household_id)):
+    query = db.query(InventoryItemModel).filter(InventoryItemModel.household_id == household_id)
+    if name is not None:
+        # Case-insensitive, served by the (household_id, lower(name)) index
+        query = query.filter(func.lower(InventoryItemModel.name) == name.strip().lower())
+    return _list_response(InventoryItem, query.all(), response_format, response)
+
+@app.get("/api/inventory/changes/", response_model=InventoryChanges)
+async def get_inventory_changes(since: Optional[int] = None, limit: int = 500, db: Session = Depends(get_read_db),
+                                household_id: str = Depends(get_household_id)):
+    upserted, deleted, cursor, has_more = get_changes_since(db, since, min(max(limit, 1), 5000), household_id=household_id)
+    return {"cursor": cursor, "has_more": has_more, "upserted": upserted, "deleted": deleted}
 
 @app.post("/api/inventory/", response_model=InventoryItem)
-async def create_inventory_item(item: InventoryItemCreate, db: Session = Depends(get_db)):
-    db_item = InventoryItemModel(**item.dict())
+async def create_inventory_item(item: InventoryItemCreate, db: Session = Depends(get_db),
+                                household_id: str = Depends(get_household_id)):
+    db_item = InventoryItemModel(**fill_expiration_dates(item.dict()), household_id=household_id)
+    if db_item.ingredient_id is None:
+        db_item.ingredient_id = canonical_ingredient_id(db, db_item.name)
+    db_item.change_seq = next_change_seq(db, inventory_counter(household_id))
     db.add(db_item)
+    invalidate_household(db, household_id)
     db.commit()
     db.refresh(db_item)
     return db_item
 
+@app.post("/api/inventory/batch/", response_model=List[InventoryItem])
+async def create_inventory_items(items: List[InventoryItemCreate], db: Session = Depends(get_db),
+                                 household_id: str = Depends(get_household_id)):
+    if not items:
+        return []
+    last_seq = next_change_seq(db, inventory_counter(household_id), count=len(items))
+    db_items = []
+    for offset, item in enumerate(items):
+        db_item = InventoryItemModel(**fill_expiration_dates(item.dict()), household_id=household_id)
+        if db_item.ingredient_id is None:
+            db_item.ingredient_id = canonical_ingredient_id(db, db_item.name)
+        db_item.change_seq = last_seq - len(items) + 1 + offset
+        db_items.append(db_item)
+    db.add_all(db_items)
+    invalidate_household(db, household_id)
+    db.flush()
+    # The rows are complete after the flush; detached, they skip one refresh SELECT each
+    for db_item in db_items:
+        db.expunge(db_item)
+    db.commit()
+    return db_items
+
+@app.post("/api/shelf-life/estimate/", response_model=List[ShelfLifeEstimate])
+async def estimate_item_shelf_life(items: List[ShelfLifeRequest]):
+    estimates = estimate_shelf_lives([(item.name, item.category) for item in items])
+    return [
+        {"name": item.name, "category": item.category, "shelf_life_days": days, "source": source}
+        for item, (days, source) in zip(items, estimates)
+    ]
+
+@app.get("/api/inventory/alerts/", response_model=List[ExpiryAlert])
+async def get_expiry_alerts(response: Response, db: Session = Depends(get_read_db), household_id: str = Depends(get_household_id)):
+    now = datetime.utcnow()
+    precomputed = get_fresh_suggestions(db, household_id, now)
+    if precomputed is not None:
+        response.headers[SUGGESTIONS_SOURCE_HEADER] = "precomputed"
+        return current_alerts(precomputed.alerts, now)
+    response.headers[SUGGESTIONS_SOURCE_HEADER] = "live"
+    items = (
+        db.query(InventoryItemModel)
+        .filter(InventoryItemModel.household_id == household_id)
+        .order_by(InventoryItemModel.expiration_date)
+        .all()
+    )
+    return expiry_alerts(items, get_active_leftovers(db, household_id=household_id), now)
+
 @app.get("/api/inventory/{item_id}/", response_model=InventoryItem)
-async def get_inventory_item(item_id: str, db: Session = Depends(get_db)):
-    item = db.query(InventoryItemModel).filter(InventoryItemModel.id == item_id).first()
+async def get_inventory_item(item_id: str, db: Session = Depends(get_read_db), household_id: str = Depends(get_household_id)):
+    item = (
+        db.query(InventoryItemModel)
+        .filter(InventoryItemModel.id == item_id, InventoryItemModel.household_id == household_id)
+        .first()
+    )
     if not item:
         raise HTTPException(status_code=404, detail="Inventory item not found")
     return item
 
+def _expected_change_seq(if_match: Optional[str]) -> Optional[int]:
+    """Read the change_seq a client expects from an If-Match header ("12", W/"12")"""
+    if if_match is None:
+        return None
+    value = if_match.strip()
+    if value.startswith("W/"):
+        value = value[2:]
+    value = value.strip('"')
+    if not value.isdigit():
+        raise HTTPException(status_code=400, detail="If-Match must be the item's change_seq")
+    return int(value)
+
+def _delete_or_404(db: Session, item_id: str, if_match: Optional[str], household_id: str):
+    try:
+        row = delete_item(db, item_id, _expected_change_seq(if_match), household_id)
+    except VersionConflict as conflict:
+        raise HTTPException(status_code=409, detail=f"Inventory item changed (change_seq {conflict.args[0]})")
+    if row is None:
+        raise HTTPException(status_code=404, detail="Inventory item not found")
+    invalidate_household(db, household_id)
+    return row
+
 @app.put("/api/inventory/{item_id}/", response_model=InventoryItem)
-async def update_inventory_item(item_id: str, item_update: InventoryItemUpdate, db: Session = Depends(get_db)):
-    db_item = db.query(InventoryItemModel).filter(InventoryItemModel.id == item_id).first()
-    if not db_item:
+async def update_inventory_item(item_id: str, item_update: InventoryItemUpdate, db: Session = Depends(get_db),
+                                if_match: Optional[str] = Header(None), household_id: str = Depends(get_household_id)):
+    changes = item_update.dict(exclude_unset=True)
+    if "name" in changes and "ingredient_id" not in changes:
+        changes["ingredient_id"] = canonical_ingredient_id(db, changes["name"])
+    try:
+        db_item = update_item(db, item_id, changes, _expected_change_seq(if_match), household_id)
+    except VersionConflict as conflict:
+        raise HTTPException(status_code=409, detail=f"Inventory item changed (change_seq {conflict.args[0]})")
+    if db_item is None:
         raise HTTPException(status_code=404, detail="Inventory item not found")
-    
-    for field, value in item_update.dict(exclude_unset=True).items():
-        setattr(db_item, field, value)
-    
+    invalidate_household(db, household_id)
+    # Detached, the RETURNING values survive the commit without a refresh SELECT
+    db.expunge(db_item)
     db.commit()
-    db.refresh(db_item)
     return db_item
 
 @app.delete("/api/inventory/{item_id}/")
-async def delete_inventory_item(item_id: str, db: Session = Depends(get_db)):
-    db_item = db.query(InventoryItemModel).filter(InventoryItemModel.id == item_id).first()
-    if not db_item:
-        raise HTTPException(status_code=404, detail="Inventory item not found")
-    
-    db.delete(db_item)
+async def delete_inventory_item(item_id: str, db: Session = Depends(get_db), if_match: Optional[str] = Header(None),
+                                household_id: str = Depends(get_household_id)):
+    _delete_or_404(db, item_id, if_match, household_id)
     db.commit()
     return {"message": "Item deleted successfully"}
 
 @app.post("/api/inventory/{item_id}/mark-used/")
-async def mark_item_as_used(item_id: str, db: Session = Depends(get_db)):
-    db_item = db.query(InventoryItemModel).filter(InventoryItemModel.id == item_id).first()
-    if not db_item:
-        raise HTTPException(status_code=404, detail="Inventory item not found")
-    
-    db.delete(db_item)
+async def mark_item_as_used(item_id: str, db: Session = Depends(get_db), if_match: Optional[str] = Header(None),
+                            household_id: str = Depends(get_household_id)):
+    row = _delete_or_404(db, item_id, if_match, household_id)
+    record_inventory_event(db, row, OUTCOME_USED, household_id)
     db.commit()
     return {"message": "Item marked as used"}
 
 @app.post("/api/inventory/{item_id}/mark-discarded/")
-async def mark_item_as_discarded(item_id: str, db: Session = Depends(get_db)):
-    db_item = db.query(InventoryItemModel).filter(InventoryItemModel.id == item_id).first()
-    if not db_item:
-        raise HTTPException(status_code=404, detail="Inventory item not found")
-    
-    db.delete(db_item)
+async def mark_item_as_discarded(item_id: str, db: Session = Depends(get_db), if_match: Optional[str] = Header(None),
+                                 household_id: str = Depends(get_household_id)):
+    row = _delete_or_404(db, item_id, if_match, household_id)
+    record_inventory_event(db, row, OUTCOME_DISCARDED, household_id)
     db.commit()
     return {"message": "Item marked as discarded"}
 
+@app.get("/api/leftovers/", response_model=List[Leftover])
+async def get_leftovers(response: Response, due_within_days: Optional[int] = None,
+                        response_format: ResponseFormat = Query(FORMAT_ROWS, alias="format"),
+                        db: Session = Depends(get_read_db), household_id: str = Depends(get_household_id)):
+    due_before = None
+    if due_within_days is not None:
+        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        due_before = today + timedelta(days=max(due_within_days, 0) + 1)
+    leftovers = get_active_leftovers(db, due_before=due_before, household_id=household_id)
+    return _list_response(Leftover, leftovers, response_format, response)
+
+@app.get("/api/leftovers/history/", response_model=LeftoverHistory)
+async def get_leftovers_history(cursor: Optional[str] = None, limit: int = 50, db: Session = Depends(get_read_db),
+                                household_id: str = Depends(get_household_id)):
+    try:
+        items, next_cursor = get_leftover_history(db, cursor, min(max(limit, 1), 200), household_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"items": items, "next_cursor": next_cursor}
+
+@app.post("/api/leftovers/", response_model=Leftover)
+async def create_leftover(leftover: LeftoverCreate, db: Session = Depends(get_db), household_id: str = Depends(get_household_id)):
+    db_leftover = new_leftover({**leftover.dict(), "household_id": household_id})
+    db_leftover.ingredient_id = canonical_ingredient_id(db, db_leftover.name)
+    db.add(db_leftover)
+    invalidate_household(db, household_id)
+    db.commit()
+    db.refresh(db_leftover)
+    return db_leftover
+
+@app.get("/api/leftovers/{leftover_id}/", response_model=Leftover)
+async def get_leftover(leftover_id: str, db: Session = Depends(get_read_db), household_id: str = Depends(get_household_id)):
+    leftover = find_leftover(db, leftover_id, household_id)
+    if not leftover:
+        raise HTTPException(status_code=404, detail="Leftover not found")
+    return leftover
+
+def _set_leftover_status_or_404(db: Session, leftover_id: str, status: str, household_id: str, changes: Optional[dict] = None):
+    leftover, resolved = set_leftover_status(db, leftover_id, status, changes, household_id)
+    if leftover is None:
+        raise HTTPException(status_code=404, detail="Leftover not found")
+    if resolved:
+        record_inventory_event(db, leftover, OUTCOME_USED if status == STATUS_USED else OUTCOME_DISCARDED, household_id)
+    return leftover
+
+@app.put("/api/leftovers/{leftover_id}/", response_model=Leftover)
+async def update_leftover_item(leftover_id: str, leftover_update: LeftoverUpdate, db: Session = Depends(get_db),
+                               household_id: str = Depends(get_household_id)):
+    changes = leftover_update.dict(exclude_unset=True)
+    status = changes.pop("status", None)
+    if "name" in changes:
+        changes["ingredient_id"] = canonical_ingredient_id(db, changes["name"])
+    if status is not None:
+        leftover = _set_leftover_status_or_404(db, leftover_id, status, household_id, changes)
+    else:
+        leftover = update_leftover(db, leftover_id, changes, household_id) if changes else find_leftover(db, leftover_id, household_id)
+        if leftover is None:
+            raise HTTPException(status_code=404, detail="Leftover not found")
+    invalidate_household(db, household_id)
+    db.expunge(leftover)
+    db.commit()
+    return leftover
+
+@app.delete("/api/leftovers/{leftover_id}/")
+async def delete_leftover_item(leftover_id: str, db: Session = Depends(get_db), household_id: str = Depends(get_household_id)):
+    if not delete_leftover(db, leftover_id, household_id):
+        raise HTTPException(status_code=404, detail="Leftover not found")
+    invalidate_household(db, household_id)
+    db.commit()
+    return {"message": "Leftover deleted successfully"}
+
+@app.post("/api/leftovers/{leftover_id}/mark-used/", response_model=Leftover)
+async def mark_leftover_as_used(leftover_id: str, db: Session = Depends(get_db), household_id: str = Depends(get_household_id)):
+    leftover = _set_leftover_status_or_404(db, leftover_id, STATUS_USED, household_id)
+    invalidate_household(db, household_id)
+    db.expunge(leftover)
+    db.commit()
+    return leftover
+
+@app.post("/api/leftovers/{leftover_id}/mark-trashed/", response_model=Leftover)
+async def mark_leftover_as_trashed(leftover_id: str, db: Session = Depends(get_db), household_id: str = Depends(get_household_id)):
+    leftover = _set_leftover_status_or_404(db, leftover_id, STATUS_TRASHED, household_id)
+    invalidate_household(db, household_id)
+    db.expunge(leftover)
+    db.commit()
+    return leftover
+
+@app.get("/api/stats/waste/", response_model=WasteStats)
+async def get_waste_statistics(days: int = 90, db: Session = Depends(get_read_db),
+                               household_id: str = Depends(get_household_id)):
+    if days < 1 or days > 3650:
+        raise HTTPException(status_code=400, detail="days must be between 1 and 3650")
+    return get_waste_stats(db, days, household_id)
+
+@app.get("/api/debug/profiles/", response_model=List[ProfileSummary])
+async def list_profiles(x_profile_request: Optional[str] = Header(None)):
+    if not verify_signature(x_profile_request, "GET", "/api/debug/profiles/"):
+        raise HTTPException(status_code=404, detail="Not found")
+    return profile_store.list()
+
+@app.get("/api/debug/profiles/{profile_id}/{kind}/")
+async def download_profile(profile_id: str, kind: str, x_profile_request: Optional[str] = Header(None)):
+    if not verify_signature(x_profile_request, "GET", f"/api/debug/profiles/{profile_id}/{kind}/"):
+        raise HTTPException(status_code=404, detail="Not found")
+    path = profile_store.path(profile_id, kind)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, filename=os.path.basename(path), media_type="application/octet-stream")
+
+@app.post("/api/admin/catalog/ingest/", response_model=JobStatus, dependencies=[Depends(require_admin)])
+async def start_catalog_ingest(allow_shrink: bool = False, db: Session = Depends(get_db)):
+    try:
+        return job_runner.submit(db, CATALOG_INGEST_JOB, allow_shrink=allow_shrink)
+    except JobLimitReached:
+        raise HTTPException(status_code=409, detail="A catalog ingest is already running")
+
+@app.get("/api/admin/jobs/", response_model=List[JobStatus], dependencies=[Depends(require_admin)])
+async def get_jobs(limit: int = 50, db: Session = Depends(get_db)):
+    return list_jobs(db, max(1, min(limit, 200)))
+
+@app.get("/api/admin/jobs/{job_id}/", response_model=JobStatus, dependencies=[Depends(require_admin)])
+async def get_job(job_id: str, db: Session = Depends(get_db)):
+    job = db.get(JobModel, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    live = job_runner.live_progress(job_id)
+    if live is not None:
+        db.expunge(job)
+        job.progress = live
+    return job
+
+@app.get("/api/admin/jobs/{job_id}/events/", dependencies=[Depends(require_admin)])
+async def stream_job_events(job_id: str, db: Session = Depends(get_db)):
+    """Server-sent events with the job's progress until it finishes"""
+    if db.get(JobModel, job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    bind = db.get_bind()
+
+    async def events():
+        last = None
+        while True:
+            session = Session(bind=bind)
+            try:
+                job = session.get(JobModel, job_id)
+                status = JobStatus.model_validate(job)
+            finally:
+                session.close()
+            live = job_runner.live_progress(job_id)
+            if live is not None:
+                status.progress = live
+            payload = status.model_dump_json()
+            if payload != last:
+                last = payload
+                yield f"data: {payload}\n\n"
+            if status.status in TERMINAL_STATUSES:
+                return
+            await asyncio.sleep(JOB_EVENTS_POLL_SECONDS)
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+@app.post("/api/admin/jobs/{job_id}/cancel/", response_model=JobStatus, dependencies=[Depends(require_admin)])
+async def cancel_job(job_id: str, db: Session = Depends(get_db)):
+    job = job_runner.cancel(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/api/metrics/queries/", dependencies=[Depends(require_admin)])
+async def query_accounting_metrics():
+    return query_metrics.snapshot()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,47 @@
+"""Baseline: the schema Base.metadata.create_all produced before migrations
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-19
+
+Just the two original tables. Databases that predate migrations already have
+exactly this and are stamped at this revision before upgrading.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001_baseline"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        "recipes",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("cuisine_type", sa.String(), nullable=False),
+        sa.Column("prep_time", sa.Integer(), nullable=False),
+        sa.Column("uses_ingredients", sa.JSON(), nullable=False),
+        sa.Column("instructions", sa.JSON(), nullable=False),
+        sa.Column("dietary_tags", sa.JSON(), nullable=False),
+        sa.Column("ingredients", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+    op.create_table(
+        "inventory_items",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("category", sa.String(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("purchase_date", sa.DateTime(), nullable=False),
+        sa.Column("expiration_date", sa.DateTime(), nullable=False),
+        sa.Column("days_until_expiration", sa.Integer(), nullable=False),
+        sa.Column("total_shelf_life", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+
+def downgrade():
+    op.drop_table("inventory_items")
+    op.drop_table("recipes")
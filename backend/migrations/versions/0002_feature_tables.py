@@ -0,0 +1,137 @@
+"""Delta sync, waste events, parsed quantities, ingredient ids, jobs and leftovers
+
+Revision ID: 0002_feature_tables
+Revises: 0001_baseline
+Create Date: 2026-10-19
+
+Everything added to the schema before households, on top of the original two
+tables. Existing rows are backfilled:
+
+- inventory_items.change_seq starts at 0, below every cursor a client can
+  hold, so existing items arrive with the first full snapshot;
+- inventory_items.updated_at copies created_at;
+- recipes.parsed_ingredients is parsed from the ingredient lines (skipped
+  with --sql; init_db fills any recipe still missing it).
+
+The ingredients table starts empty and is built from the recipes on first
+use, as on a fresh install.
+"""
+
+from alembic import context, op
+import sqlalchemy as sa
+
+from ingredient_parser import parse_recipe_ingredients
+
+revision = "0002_feature_tables"
+down_revision = "0001_baseline"
+branch_labels = None
+depends_on = None
+
+def _parse_existing_recipes():
+    bind = op.get_bind()
+    recipes = sa.table(
+        "recipes", sa.column("id"), sa.column("ingredients", sa.JSON()),
+        sa.column("uses_ingredients", sa.JSON()), sa.column("parsed_ingredients", sa.JSON()),
+    )
+    rows = bind.execute(sa.select(recipes.c.id, recipes.c.ingredients, recipes.c.uses_ingredients)).all()
+    for recipe_id, ingredients, uses_ingredients in rows:
+        bind.execute(
+            recipes.update().where(recipes.c.id == recipe_id)
+            .values(parsed_ingredients=parse_recipe_ingredients(ingredients or [], uses_ingredients or []))
+        )
+
+def upgrade():
+    op.add_column("recipes", sa.Column("parsed_ingredients", sa.JSON(), nullable=True))
+    op.add_column("inventory_items", sa.Column("unit", sa.String(), nullable=True))
+    op.add_column("inventory_items", sa.Column("ingredient_id", sa.Integer(), nullable=True))
+    op.add_column("inventory_items", sa.Column("updated_at", sa.DateTime(), nullable=True))
+    op.add_column("inventory_items", sa.Column("change_seq", sa.Integer(), nullable=False, server_default="0"))
+    op.create_index("ix_inventory_items_ingredient_id", "inventory_items", ["ingredient_id"])
+    op.create_index("ix_inventory_items_change_seq", "inventory_items", ["change_seq"])
+
+    op.create_table(
+        "ingredients",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("name", sa.String(), nullable=False, unique=True),
+        sa.Column("recipe_count", sa.Integer(), nullable=False),
+    )
+    op.create_table(
+        "leftovers",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("category", sa.String(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("food_size", sa.String(), nullable=True),
+        sa.Column("estimation_price", sa.Float(), nullable=True),
+        sa.Column("ingredient_id", sa.Integer(), nullable=True),
+        sa.Column("purchase_date", sa.DateTime(), nullable=False),
+        sa.Column("expiration_date", sa.DateTime(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("resolved_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_leftovers_status_expiration", "leftovers", ["status", "expiration_date"])
+    op.create_index("ix_leftovers_resolved", "leftovers", ["resolved_at", "id"])
+    op.create_table(
+        "inventory_tombstones",
+        sa.Column("item_id", sa.String(), primary_key=True),
+        sa.Column("change_seq", sa.Integer(), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_inventory_tombstones_change_seq", "inventory_tombstones", ["change_seq"])
+    op.create_table(
+        "sync_counters",
+        sa.Column("name", sa.String(), primary_key=True),
+        sa.Column("value", sa.Integer(), nullable=False),
+    )
+    op.create_table(
+        "inventory_events",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("item_id", sa.String(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("category", sa.String(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("outcome", sa.String(), nullable=False),
+        sa.Column("occurred_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_inventory_events_occurred_at", "inventory_events", ["occurred_at"])
+    op.create_table(
+        "waste_rollups",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("category", sa.String(), primary_key=True),
+        sa.Column("outcome", sa.String(), primary_key=True),
+        sa.Column("event_count", sa.Integer(), nullable=False),
+        sa.Column("total_quantity", sa.Integer(), nullable=False),
+    )
+    op.create_table(
+        "jobs",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("kind", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("progress", sa.JSON(), nullable=False),
+        sa.Column("result", sa.JSON(), nullable=True),
+        sa.Column("error", sa.String(), nullable=True),
+        sa.Column("cancel_requested", sa.Boolean(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_jobs_kind", "jobs", ["kind"])
+    op.create_index("ix_jobs_status", "jobs", ["status"])
+    op.create_index("ix_jobs_created_at", "jobs", ["created_at"])
+
+    op.execute(sa.text("UPDATE inventory_items SET updated_at = created_at"))
+    if not context.is_offline_mode():
+        _parse_existing_recipes()
+
+def downgrade():
+    for table in ("jobs", "waste_rollups", "inventory_events", "sync_counters", "inventory_tombstones",
+                  "leftovers", "ingredients"):
+        op.drop_table(table)
+    op.drop_index("ix_inventory_items_change_seq", table_name="inventory_items")
+    op.drop_index("ix_inventory_items_ingredient_id", table_name="inventory_items")
+    with op.batch_alter_table("inventory_items") as batch:
+        for column in ("change_seq", "updated_at", "ingredient_id", "unit"):
+            batch.drop_column(column)
+    with op.batch_alter_table("recipes") as batch:
+        batch.drop_column("parsed_ingredients")
@@ -0,0 +1,51 @@
+"""Scope inventory, leftovers and tombstones to a household; precomputed suggestions
+
+Revision ID: 0003_households
+Revises: 0002_feature_tables
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003_households"
+down_revision = "0002_feature_tables"
+branch_labels = None
+depends_on = None
+
+# Existing rows all belong to the one household the app had so far
+DEFAULT_HOUSEHOLD = "default"
+
+def upgrade():
+    for table in ("inventory_items", "leftovers", "inventory_tombstones"):
+        op.add_column(table, sa.Column("household_id", sa.String(), nullable=False, server_default=DEFAULT_HOUSEHOLD))
+
+    op.create_index("ix_inventory_household_seq", "inventory_items", ["household_id", "change_seq"])
+    op.create_index("ix_inventory_household_expiration", "inventory_items", ["household_id", "expiration_date"])
+    op.drop_index("ix_leftovers_status_expiration", table_name="leftovers")
+    op.drop_index("ix_leftovers_resolved", table_name="leftovers")
+    op.create_index("ix_leftovers_household_status_expiration", "leftovers", ["household_id", "status", "expiration_date"])
+    op.create_index("ix_leftovers_household_resolved", "leftovers", ["household_id", "resolved_at", "id"])
+    op.create_index("ix_tombstones_household_seq", "inventory_tombstones", ["household_id", "change_seq"])
+
+    op.create_table(
+        "household_suggestions",
+        sa.Column("household_id", sa.String(), primary_key=True),
+        sa.Column("recipe_ids", sa.JSON(), nullable=False),
+        sa.Column("alerts", sa.JSON(), nullable=False),
+        sa.Column("computed_at", sa.DateTime(), nullable=True),
+        sa.Column("invalidated_at", sa.DateTime(), nullable=True),
+    )
+
+def downgrade():
+    op.drop_table("household_suggestions")
+    op.drop_index("ix_tombstones_household_seq", table_name="inventory_tombstones")
+    op.drop_index("ix_leftovers_household_resolved", table_name="leftovers")
+    op.drop_index("ix_leftovers_household_status_expiration", table_name="leftovers")
+    op.create_index("ix_leftovers_resolved", "leftovers", ["resolved_at", "id"])
+    op.create_index("ix_leftovers_status_expiration", "leftovers", ["status", "expiration_date"])
+    op.drop_index("ix_inventory_household_expiration", table_name="inventory_items")
+    op.drop_index("ix_inventory_household_seq", table_name="inventory_items")
+    for table in ("inventory_tombstones", "leftovers", "inventory_items"):
+        with op.batch_alter_table(table) as batch:
+            batch.drop_column("household_id")
@@ -0,0 +1,50 @@
+"""Indexes for the remaining hot query shapes
+
+Revision ID: 0004_query_indexes
+Revises: 0003_households
+Create Date: 2026-10-19
+
+- inventory_items (household_id, lower(name)): the case-insensitive name
+  lookup of GET /api/inventory/?name=.
+- recipes GIN on uses_ingredients (Postgres only): "which recipes use X"
+  containment queries (uses_ingredients::jsonb ? 'garlic'), which would
+  otherwise read every recipe row.
+- The single-column change_seq indexes are dropped: every change_seq read is
+  now scoped to a household and served by the (household_id, change_seq)
+  indexes, so they only cost writes.
+
+On Postgres the new indexes are built CONCURRENTLY, outside the migration
+transaction, so the hot tables stay writable while they build.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004_query_indexes"
+down_revision = "0003_households"
+branch_labels = None
+depends_on = None
+
+def _is_postgres() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+def _create_index(name: str, table: str, columns, **kwargs):
+    if _is_postgres():
+        with op.get_context().autocommit_block():
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True, **kwargs)
+    else:
+        op.create_index(name, table, columns, **kwargs)
+
+def upgrade():
+    _create_index("ix_inventory_household_lower_name", "inventory_items", ["household_id", sa.text("lower(name)")])
+    if _is_postgres():
+        _create_index("ix_recipes_uses_ingredients", "recipes", [sa.text("(uses_ingredients::jsonb)")], postgresql_using="gin")
+    op.drop_index("ix_inventory_items_change_seq", table_name="inventory_items")
+    op.drop_index("ix_inventory_tombstones_change_seq", table_name="inventory_tombstones")
+
+def downgrade():
+    op.create_index("ix_inventory_tombstones_change_seq", "inventory_tombstones", ["change_seq"])
+    op.create_index("ix_inventory_items_change_seq", "inventory_items", ["change_seq"])
+    if _is_postgres():
+        op.drop_index("ix_recipes_uses_ingredients", table_name="recipes")
+    op.drop_index("ix_inventory_household_lower_name", table_name="inventory_items")
@@ -0,0 +1,44 @@
+"""Clear ingredient ids that were stored from fuzzy name matches
+
+Revision ID: 0005_exact_ingredient_ids
+Revises: 0004_query_indexes
+Create Date: 2026-10-19
+
+Inventory items and leftovers used to get the closest trigram match as their
+ingredient_id ("spaghetti squash" -> spaghetti), which the matchers treat as
+an exact ingredient. Ids whose ingredient name is not the row's canonical
+key are set back to NULL; those rows fall back to name matching.
+"""
+
+from alembic import context, op
+import sqlalchemy as sa
+
+from ingredient_parser import canonical_ingredient_key
+
+revision = "0005_exact_ingredient_ids"
+down_revision = "0004_query_indexes"
+branch_labels = None
+depends_on = None
+
+TABLES = ("inventory_items", "leftovers")
+
+def upgrade():
+    if context.is_offline_mode():
+        return
+    bind = op.get_bind()
+    ingredients = sa.table("ingredients", sa.column("id"), sa.column("name"))
+    for table_name in TABLES:
+        table = sa.table(table_name, sa.column("id"), sa.column("name"), sa.column("ingredient_id"))
+        rows = bind.execute(
+            sa.select(table.c.id, table.c.name, ingredients.c.name)
+            .join(ingredients, ingredients.c.id == table.c.ingredient_id)
+        ).all()
+        stale = [row_id for row_id, name, ingredient in rows if canonical_ingredient_key(name or "") != ingredient]
+        for start in range(0, len(stale), 500):
+            bind.execute(
+                table.update().where(table.c.id.in_(stale[start:start + 500])).values(ingredient_id=None)
+            )
+
+def downgrade():
+    # The fuzzy ids are not worth restoring
+    pass
@@ -0,0 +1,60 @@
+"""Scope waste events and daily rollups to a household
+
+Revision ID: 0006_household_waste
+Revises: 0005_exact_ingredient_ids
+Create Date: 2026-10-19
+
+Existing events and rollups go to the default household, like the inventory
+rows in 0003. The rollup primary key becomes (household_id, day, category,
+outcome), which also serves the per-household stats range read.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006_household_waste"
+down_revision = "0005_exact_ingredient_ids"
+branch_labels = None
+depends_on = None
+
+DEFAULT_HOUSEHOLD = "default"
+
+def _replace_rollup_key(columns):
+    if op.get_bind().dialect.name == "sqlite":
+        # SQLite cannot alter a primary key in place; batch mode copies the table
+        with op.batch_alter_table("waste_rollups", recreate="always") as batch:
+            batch.create_primary_key("waste_rollups_pkey", columns)
+    else:
+        op.drop_constraint("waste_rollups_pkey", "waste_rollups", type_="primary")
+        op.create_primary_key("waste_rollups_pkey", "waste_rollups", columns)
+
+def upgrade():
+    op.add_column("inventory_events", sa.Column("household_id", sa.String(), nullable=False, server_default=DEFAULT_HOUSEHOLD))
+    op.add_column("waste_rollups", sa.Column("household_id", sa.String(), nullable=False, server_default=DEFAULT_HOUSEHOLD))
+    _replace_rollup_key(["household_id", "day", "category", "outcome"])
+
+def downgrade():
+    # Fold the households back together before the key loses household_id
+    bind = op.get_bind()
+    rollups = sa.table(
+        "waste_rollups", sa.column("household_id"), sa.column("day"), sa.column("category"),
+        sa.column("outcome"), sa.column("event_count"), sa.column("total_quantity"),
+    )
+    merged = bind.execute(
+        sa.select(
+            rollups.c.day, rollups.c.category, rollups.c.outcome,
+            sa.func.sum(rollups.c.event_count), sa.func.sum(rollups.c.total_quantity),
+        ).group_by(rollups.c.day, rollups.c.category, rollups.c.outcome)
+    ).all()
+    op.execute(rollups.delete())
+    if merged:
+        op.bulk_insert(rollups, [
+            {"household_id": DEFAULT_HOUSEHOLD, "day": day, "category": category, "outcome": outcome,
+             "event_count": count, "total_quantity": quantity}
+            for day, category, outcome, count, quantity in merged
+        ])
+    _replace_rollup_key(["day", "category", "outcome"])
+    with op.batch_alter_table("waste_rollups") as batch:
+        batch.drop_column("household_id")
+    with op.batch_alter_table("inventory_events") as batch:
+        batch.drop_column("household_id")
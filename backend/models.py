@@ -1,11 +1,18 @@
-from sqlalchemy import Column, String, Integer, DateTime, JSON, Float
+from sqlalchemy import Column, String, Integer, DateTime, Date, JSON, Float, Boolean, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from database import Base
 import uuid
 from datetime import datetime
 
+# Household used when a request does not name one
+DEFAULT_HOUSEHOLD = "default"
+
 class Recipe(Base):
     __tablename__ = "recipes"
+    # Containment lookups ("recipes using garlic") on Postgres; SQLite has no GIN
+    __table_args__ = (
+        Index("ix_recipes_uses_ingredients", text("(uses_ingredients::jsonb)"), postgresql_using="gin").ddl_if(dialect="postgresql"),
+    )
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     name = Column(String, nullable=False)
@@ -15,17 +22,123 @@ class Recipe(Base):
     instructions = Column(JSON, nullable=False)
     dietary_tags = Column(JSON, nullable=False)
     ingredients = Column(JSON, nullable=False)
+    parsed_ingredients = Column(JSON, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+class Ingredient(Base):
+    __tablename__ = "ingredients"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String, nullable=False, unique=True)
+    recipe_count = Column(Integer, nullable=False, default=0)
+
 class InventoryItem(Base):
     __tablename__ = "inventory_items"
+    # Every inventory read is scoped to one household: whole inventory and
+    # delta sync by change_seq, expiry-ordered alerts, lookup by name
+    __table_args__ = (
+        Index("ix_inventory_household_seq", "household_id", "change_seq"),
+        Index("ix_inventory_household_expiration", "household_id", "expiration_date"),
+        Index("ix_inventory_household_lower_name", "household_id", text("lower(name)")),
+    )
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    household_id = Column(String, nullable=False, default=DEFAULT_HOUSEHOLD)
     name = Column(String, nullable=False)
     category = Column(String, nullable=False)
     quantity = Column(Integer, nullable=False)
+    unit = Column(String, nullable=True)
+    ingredient_id = Column(Integer, nullable=True, index=True)
     purchase_date = Column(DateTime, nullable=False)
     expiration_date = Column(DateTime, nullable=False)
     days_until_expiration = Column(Integer, nullable=False)
     total_shelf_life = Column(Integer, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    change_seq = Column(Integer, nullable=False, default=0)
+
+class Leftover(Base):
+    __tablename__ = "leftovers"
+    # Active leftovers are read soonest-expiring first and history newest
+    # resolved first, so both are range scans on these indexes
+    __table_args__ = (
+        Index("ix_leftovers_household_status_expiration", "household_id", "status", "expiration_date"),
+        Index("ix_leftovers_household_resolved", "household_id", "resolved_at", "id"),
+    )
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    household_id = Column(String, nullable=False, default=DEFAULT_HOUSEHOLD)
+    name = Column(String, nullable=False)
+    category = Column(String, nullable=False, default="")
+    quantity = Column(Integer, nullable=False, default=1)
+    food_size = Column(String, nullable=True)
+    estimation_price = Column(Float, nullable=True)
+    ingredient_id = Column(Integer, nullable=True)
+    purchase_date = Column(DateTime, nullable=False)
+    expiration_date = Column(DateTime, nullable=False)
+    status = Column(String, nullable=False, default="active")
+    created_at = Column(DateTime, default=datetime.utcnow)
+    resolved_at = Column(DateTime, nullable=True)
+
+class InventoryTombstone(Base):
+    __tablename__ = "inventory_tombstones"
+    __table_args__ = (
+        Index("ix_tombstones_household_seq", "household_id", "change_seq"),
+    )
+
+    item_id = Column(String, primary_key=True)
+    household_id = Column(String, nullable=False, default=DEFAULT_HOUSEHOLD)
+    change_seq = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime, default=datetime.utcnow)
+
+class SyncCounter(Base):
+    __tablename__ = "sync_counters"
+
+    name = Column(String, primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
+class InventoryEvent(Base):
+    __tablename__ = "inventory_events"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    household_id = Column(String, nullable=False, default=DEFAULT_HOUSEHOLD)
+    item_id = Column(String, nullable=False)
+    name = Column(String, nullable=False)
+    category = Column(String, nullable=False)
+    quantity = Column(Integer, nullable=False)
+    outcome = Column(String, nullable=False)
+    occurred_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+class WasteRollup(Base):
+    __tablename__ = "waste_rollups"
+    # Household first in the key: the stats read is one household's days since a date
+    household_id = Column(String, primary_key=True, default=DEFAULT_HOUSEHOLD)
+    day = Column(Date, primary_key=True)
+    category = Column(String, primary_key=True)
+    outcome = Column(String, primary_key=True)
+    event_count = Column(Integer, nullable=False, default=0)
+    total_quantity = Column(Integer, nullable=False, default=0)
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    kind = Column(String, nullable=False, index=True)
+    status = Column(String, nullable=False, index=True)
+    progress = Column(JSON, nullable=False, default=dict)
+    result = Column(JSON, nullable=True)
+    error = Column(String, nullable=True)
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+class HouseholdSuggestions(Base):
+    __tablename__ = "household_suggestions"
+
+    household_id = Column(String, primary_key=True)
+    recipe_ids = Column(JSON, nullable=False, default=list)
+    alerts = Column(JSON, nullable=False, default=list)
+    # Inventory state the row was computed from; a write after it makes the row stale
+    computed_at = Column(DateTime, nullable=True)
+    invalidated_at = Column(DateTime, nullable=True)
@@ -0,0 +1,102 @@
+from sqlalchemy.orm import Session
+from models import Recipe as RecipeModel, InventoryItem as InventoryItemModel
+from catalog import CatalogSnapshot, register_index
+from recommendation_engine import ingredients_match, has_name_aliases, expiration_urgency
+from ingredient_parser import normalize_ingredient_name, canonical_ingredient_key
+from ingredient_vocabulary import get_vocabulary
+from typing import Dict, List, Set
+from functools import lru_cache
+
+NEAR_MISS_INDEX = "ingredient_postings"
+MAX_MISSING_LIMIT = 3
+RECIPES_PER_PURCHASE = 5
+
+_ingredient_key = lru_cache(maxsize=65536)(canonical_ingredient_key)
+
+class IngredientPostings:
+    """Canonical ingredient key -> ids of the recipes using it, and the reverse"""
+
+    def __init__(self):
+        self.recipe_keys: Dict[str, frozenset] = {}
+        self.postings: Dict[str, Set[str]] = {}
+        # Keys that ingredients_match may satisfy with a differently named item
+        self.alias_keys: Set[str] = set()
+
+    def add_recipe(self, recipe: RecipeModel):
+        for key in self.recipe_keys.pop(recipe.id, ()):
+            self.postings[key].discard(recipe.id)
+        keys = frozenset(_ingredient_key(name) for name in recipe.uses_ingredients or []) - {""}
+        self.recipe_keys[recipe.id] = keys
+        for key in keys:
+            self.postings.setdefault(key, set()).add(recipe.id)
+            if has_name_aliases(key):
+                self.alias_keys.add(key)
+
+def build_ingredient_postings(recipes: List[RecipeModel]) -> IngredientPostings:
+    index = IngredientPostings()
+    for recipe in recipes:
+        index.add_recipe(recipe)
+    return index
+
+register_index(NEAR_MISS_INDEX, build_ingredient_postings, IngredientPostings.add_recipe)
+
+def available_keys(db: Session, index: IngredientPostings, inventory_items: List[InventoryItemModel]) -> Set[str]:
+    """Recipe ingredient keys the inventory covers, alias rules included"""
+    vocabulary = get_vocabulary(db)
+    keys = set()
+    for item in inventory_items:
+        position = vocabulary.position_by_id.get(item.ingredient_id)
+        keys.add(vocabulary.names[position] if position is not None else canonical_ingredient_key(item.name))
+        item_name = normalize_ingredient_name(item.name)
+        keys.update(key for key in index.alias_keys if ingredients_match(key, item_name))
+    keys.discard("")
+    return keys
+
+def near_miss_purchases(db: Session, catalog: CatalogSnapshot, inventory_items: List[InventoryItemModel],
+                        max_missing: int = 1, limit: int = 10) -> List[Dict]:
+    """Rank single purchases by the expiry urgency of the recipes they bring within reach.
+
+    Recipes sharing at least one ingredient with the inventory are found by
+    walking the postings of the owned ingredients and counting hits, so a
+    recipe's missing count is its size minus its hits and only recipes
+    missing 1..max_missing ingredients are looked at. Each such recipe
+    credits its urgency, split evenly, to every ingredient it still lacks.
+    Quantities are not checked.
+    """
+    if not inventory_items:
+        return []
+    index: IngredientPostings = catalog.index(NEAR_MISS_INDEX)
+    owned = available_keys(db, index, inventory_items)
+    hits: Dict[str, int] = {}
+    for key in owned:
+        for recipe_id in index.postings.get(key, ()):
+            hits[recipe_id] = hits.get(recipe_id, 0) + 1
+
+    normalized_items = [(normalize_ingredient_name(item.name), item.days_until_expiration) for item in inventory_items]
+    purchases: Dict[str, Dict] = {}
+    for recipe_id, count in hits.items():
+        keys = index.recipe_keys[recipe_id]
+        if not 0 < len(keys) - count <= max_missing:
+            continue
+        recipe = catalog.by_id.get(recipe_id)
+        if recipe is None:
+            continue
+        missing = sorted(keys - owned)
+        urgency = expiration_urgency(normalized_items, [normalize_ingredient_name(name) for name in recipe.uses_ingredients])
+        for key in missing:
+            purchase = purchases.setdefault(key, {"ingredient": key, "unlocked_recipes": 0, "unlocked_urgency": 0.0, "score": 0.0, "candidates": []})
+            purchase["score"] += urgency / len(missing)
+            if len(missing) == 1:
+                purchase["unlocked_recipes"] += 1
+                purchase["unlocked_urgency"] += urgency
+            purchase["candidates"].append((urgency, -len(missing), recipe, missing))
+
+    vocabulary = get_vocabulary(db)
+    ranked = sorted(purchases.values(), key=lambda p: (p["unlocked_urgency"], p["score"]), reverse=True)[:limit]
+    for purchase in ranked:
+        candidates = sorted(purchase.pop("candidates"), key=lambda c: (c[1], c[0]), reverse=True)
+        purchase["ingredient_id"] = vocabulary.by_name.get(purchase["ingredient"])
+        purchase["recipes"] = [
+            (recipe, missing, urgency) for urgency, _, recipe, missing in candidates[:RECIPES_PER_PURCHASE]
+        ]
+    return ranked
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""Profile the recipe matcher offline against a catalog + inventory dump.
+
+Dumps are plain JSON holding the recipes, the ingredient vocabulary and the
+inventory, so a matching or performance regression seen on one database can
+be replayed anywhere without a running API server:
+
+    python profile_matching.py export dump.json                 # from DATABASE_URL
+    python profile_matching.py profile dump.json --repeat 5
+    python profile_matching.py import dump.json --database-url sqlite:///scratch.db
+
+`profile` loads the dump into a temporary SQLite database and calls the real
+recommendation_engine functions: it reports plain and per-function timings
+(inclusive, with call counts), how close each recipe came to matching, and
+the normalized names on either side that never match anything.
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+from functools import wraps
+from typing import Callable, Dict, List
+
+DUMP_FORMAT = "ecoeats-matcher-dump"
+DUMP_VERSION = 1
+
+# recommendation_engine globals wrapped for timing; calls between them go
+# through the module namespace, so nested calls are counted too
+PROFILED_FUNCTIONS = [
+    "get_vocabulary",
+    "normalize_ingredient_name",
+    "canonical_ingredient_key",
+    "ingredients_match",
+    "calculate_ingredient_match_score",
+    "build_inventory_amounts",
+    "has_sufficient_quantities",
+    "calculate_expiration_urgency_score",
+    "expiration_urgency",
+    "calculate_recipe_complexity_score",
+    "score_recipe",
+]
+
+def _dump_models():
+    from models import Recipe, Ingredient, InventoryItem
+    return {"recipes": Recipe, "ingredients": Ingredient, "inventory": InventoryItem}
+
+def _row_to_dict(row) -> Dict:
+    values = {}
+    for column in row.__table__.columns:
+        value = getattr(row, column.name)
+        values[column.name] = value.isoformat() if isinstance(value, datetime) else value
+    return values
+
+def _row_from_dict(model, values: Dict):
+    from sqlalchemy import DateTime
+    data = {}
+    for column in model.__table__.columns:
+        if column.name not in values:
+            continue
+        value = values[column.name]
+        if isinstance(column.type, DateTime) and isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        data[column.name] = value
+    return model(**data)
+
+def export_dump(session_factory, path: str) -> Dict[str, int]:
+    db = session_factory()
+    try:
+        dump = {"format": DUMP_FORMAT, "version": DUMP_VERSION, "exported_at": datetime.utcnow().isoformat()}
+        for key, model in _dump_models().items():
+            dump[key] = [_row_to_dict(row) for row in db.query(model).order_by(model.id).all()]
+    finally:
+        db.close()
+    with open(path, "w") as f:
+        json.dump(dump, f, indent=1)
+    return {key: len(dump[key]) for key in _dump_models()}
+
+def read_dump(path: str) -> Dict:
+    with open(path) as f:
+        dump = json.load(f)
+    if dump.get("format") != DUMP_FORMAT or dump.get("version") != DUMP_VERSION:
+        raise SystemExit(f"{path} is not a version {DUMP_VERSION} matcher dump")
+    return dump
+
+def import_dump(session_factory, dump: Dict, replace: bool = False) -> Dict[str, int]:
+    """Load a dump's rows; existing recipes, vocabulary and inventory are only dropped with replace"""
+    from catalog import CATALOG_COUNTER
+    from inventory_sync import next_change_seq
+    models = _dump_models()
+    db = session_factory()
+    try:
+        if not replace and any(db.query(model.id).first() is not None for model in models.values()):
+            raise SystemExit("Database already has recipes, ingredients or inventory; pass --replace to overwrite them")
+        for model in models.values():
+            db.query(model).delete(synchronize_session=False)
+        for key, model in models.items():
+            db.add_all(_row_from_dict(model, values) for values in dump.get(key, []))
+        # Running API processes pick up the new catalog on their next check
+        next_change_seq(db, CATALOG_COUNTER)
+        db.commit()
+    finally:
+        db.close()
+    return {key: len(dump.get(key, [])) for key in models}
+
+def instrument(module, names: List[str]) -> Dict[str, List[float]]:
+    """Replace module functions with timing wrappers; returns name -> [calls, seconds]"""
+    stats = {name: [0, 0.0] for name in names}
+
+    def timed(name: str, func: Callable) -> Callable:
+        entry = stats[name]
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                entry[0] += 1
+                entry[1] += time.perf_counter() - started
+        return wrapper
+
+    originals = {name: getattr(module, name) for name in names}
+    for name, func in originals.items():
+        setattr(module, name, timed(name, func))
+    stats["__originals__"] = originals
+    return stats
+
+def restore(module, stats: Dict):
+    for name, func in stats.pop("__originals__").items():
+        setattr(module, name, func)
+
+def match_report(db, recipes, inventory_items, recommended_ids) -> Dict:
+    """How far each recipe is from matching, and the names that never match.
+
+    Ingredients count as present when either the canonical id or the name
+    rules match; recipes covered only by mixing the two are not recommended
+    by the engine and are counted as mixed_rules.
+    """
+    import recommendation_engine as engine
+    from ingredient_vocabulary import get_vocabulary
+    vocabulary = get_vocabulary(db)
+    available_names = [item.name for item in inventory_items]
+    available_ids = {item.ingredient_id or vocabulary.by_name.get(engine.canonical_ingredient_key(item.name)) for item in inventory_items} - {None}
+    inventory_amounts = engine.build_inventory_amounts(inventory_items)
+
+    outcomes = {"matched": 0, "insufficient_quantity": 0, "mixed_rules": 0, "missing_1": 0, "missing_2_plus": 0, "no_ingredients": 0}
+    matched_via = {"canonical_id": 0, "name_rules": 0}
+    blocking: Dict[str, int] = {}
+    for recipe in recipes:
+        if not recipe.uses_ingredients:
+            outcomes["no_ingredients"] += 1
+            continue
+        ids = vocabulary.recipe_ingredient_ids(recipe)
+        missing = []
+        for name, ingredient_id in zip(recipe.uses_ingredients, ids):
+            if ingredient_id is not None and ingredient_id in available_ids:
+                continue
+            if engine.calculate_ingredient_match_score([name], available_names) == 0.0:
+                missing.append(engine.normalize_ingredient_name(name))
+        if recipe.id in recommended_ids:
+            outcomes["matched"] += 1
+            if ids and None not in ids and available_ids.issuperset(ids):
+                matched_via["canonical_id"] += 1
+            else:
+                matched_via["name_rules"] += 1
+        elif missing:
+            outcomes["missing_1" if len(missing) == 1 else "missing_2_plus"] += 1
+            for name in set(missing):
+                blocking[name] = blocking.get(name, 0) + 1
+        elif not engine.has_sufficient_quantities(recipe.parsed_ingredients, inventory_amounts):
+            outcomes["insufficient_quantity"] += 1
+        else:
+            outcomes["mixed_rules"] += 1
+
+    recipe_forms = {engine.normalize_ingredient_name(name) for recipe in recipes for name in recipe.uses_ingredients or []}
+    recipe_ids = {ingredient_id for recipe in recipes for ingredient_id in vocabulary.recipe_ingredient_ids(recipe)} - {None}
+    unused_inventory = []
+    for item in inventory_items:
+        form = engine.normalize_ingredient_name(item.name)
+        ingredient_id = item.ingredient_id or vocabulary.by_name.get(engine.canonical_ingredient_key(item.name))
+        if ingredient_id in recipe_ids:
+            continue
+        if not any(engine.ingredients_match(recipe_form, form) for recipe_form in recipe_forms):
+            unused_inventory.append((item.name, form))
+    return {
+        "outcomes": outcomes,
+        "matched_via": matched_via,
+        "never_matched_recipe_forms": sorted(blocking.items(), key=lambda entry: (-entry[1], entry[0])),
+        "never_matched_inventory_forms": unused_inventory,
+        "empty_recipe_forms": sorted(form for form in recipe_forms if not form),
+    }
+
+def profile_dump(repeat: int, top: int):
+    import recommendation_engine as engine
+    from database import SessionLocal
+    from models import Recipe as RecipeModel, InventoryItem as InventoryItemModel
+    from ingredient_vocabulary import get_vocabulary
+
+    db = SessionLocal()
+    try:
+        inventory_items = db.query(InventoryItemModel).all()
+        recipes = db.query(RecipeModel).all()
+        get_vocabulary(db)
+        recommendations = engine.get_recipe_recommendations(db, inventory_items, None, recipes)
+
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            engine.get_recipe_recommendations(db, inventory_items, None, recipes)
+            timings.append((time.perf_counter() - started) * 1000.0)
+        stats = instrument(engine, PROFILED_FUNCTIONS)
+        try:
+            started = time.perf_counter()
+            engine.get_recipe_recommendations(db, inventory_items, None, recipes)
+            instrumented_ms = (time.perf_counter() - started) * 1000.0
+        finally:
+            restore(engine, stats)
+        report = match_report(db, recipes, inventory_items, {recipe.id for recipe in recommendations})
+    finally:
+        db.close()
+
+    timings.sort()
+    print(f"\n{len(recipes)} recipes, {len(inventory_items)} inventory items, {len(recommendations)} recommended")
+    print(f"get_recipe_recommendations: mean {sum(timings) / len(timings):.2f}ms, p50 {timings[len(timings) // 2]:.2f}ms over {repeat} runs")
+    print(f"\nPer function, one instrumented run ({instrumented_ms:.2f}ms with wrapper overhead; times include nested calls)")
+    print(f"{'function':36} {'calls':>9} {'total':>10} {'per call':>10}")
+    for name, (calls, seconds) in sorted(stats.items(), key=lambda entry: -entry[1][1]):
+        if calls:
+            print(f"{name:36} {calls:9d} {seconds * 1000:8.2f}ms {seconds * 1e6 / calls:8.2f}us")
+
+    print("\nRecipe outcomes")
+    for outcome, count in report["outcomes"].items():
+        print(f"  {outcome:24} {count}")
+    print(f"  matched via canonical ids: {report['matched_via']['canonical_id']}, via name rules: {report['matched_via']['name_rules']}")
+    print(f"\nRecipe ingredient forms no inventory item matches (top {top}, by recipes blocked)")
+    for form, count in report["never_matched_recipe_forms"][:top]:
+        print(f"  {form!r:40} {count}")
+    print("\nInventory items whose normalized name matches no recipe ingredient")
+    for name, form in report["never_matched_inventory_forms"] or [("(none)", "")]:
+        print(f"  {name!r} -> {form!r}" if form else f"  {name}")
+    if report["empty_recipe_forms"]:
+        print(f"\n{len(report['empty_recipe_forms'])} recipe ingredient names normalize to an empty string")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="write recipes, vocabulary and inventory from a database to a dump")
+    export.add_argument("dump")
+    export.add_argument("--database-url", help="default: DATABASE_URL")
+    load = commands.add_parser("import", help="load a dump into a database")
+    load.add_argument("dump")
+    load.add_argument("--database-url", help="default: DATABASE_URL")
+    load.add_argument("--replace", action="store_true", help="delete existing recipes, vocabulary and inventory first")
+    profile = commands.add_parser("profile", help="time the matcher on a dump and report match statistics")
+    profile.add_argument("dump")
+    profile.add_argument("--repeat", type=int, default=3)
+    profile.add_argument("--top", type=int, default=20, help="never-matched recipe forms to list")
+    args = parser.parse_args()
+
+    scratch = None
+    database_url = getattr(args, "database_url", None) or os.getenv("DATABASE_URL")
+    if args.command == "profile":
+        dump = read_dump(args.dump)
+        scratch = tempfile.TemporaryDirectory()
+        database_url = f"sqlite:///{os.path.join(scratch.name, 'matcher.db')}"
+    elif database_url is None:
+        raise SystemExit("Set DATABASE_URL or pass --database-url")
+    os.environ["DATABASE_URL"] = database_url
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from database import upgrade_database
+
+    engine = create_engine(database_url)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    try:
+        if args.command == "export":
+            counts = export_dump(session_factory, args.dump)
+            print(f"Wrote {counts['recipes']} recipes, {counts['ingredients']} ingredients and {counts['inventory']} inventory items to {args.dump}")
+        else:
+            upgrade_database(database_url)
+            if args.command == "import":
+                counts = import_dump(session_factory, read_dump(args.dump), args.replace)
+                print(f"Imported {counts['recipes']} recipes, {counts['ingredients']} ingredients and {counts['inventory']} inventory items")
+            else:
+                import_dump(session_factory, dump)
+                profile_dump(max(args.repeat, 1), args.top)
+    finally:
+        engine.dispose()
+        if scratch is not None:
+            scratch.cleanup()
+
+if __name__ == "__main__":
+    main()
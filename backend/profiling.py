@@ -0,0 +1,205 @@
+"""Opt-in per-request profiling.
+
+Disabled unless PROFILING_SECRET or PROFILING_SAMPLE_RATE is set. A request
+is profiled when it carries a valid signed X-Profile-Request header or is
+picked by the sampling rate. Each profile is written as a pstats file plus a
+collapsed-stack file (flamegraph.pl / speedscope input) into a bounded ring
+buffer directory; the oldest profiles are deleted first.
+
+The header value is "<unix timestamp>:<hex HMAC-SHA256 of 'timestamp:METHOD:path'>"
+keyed with PROFILING_SECRET, e.g. for a suggestions call:
+
+    ts=$(date +%s); sig=$(printf '%s' "$ts:GET:/api/recipes/suggestions/" | openssl dgst -sha256 -hmac "$PROFILING_SECRET" -hex | cut -d' ' -f2)
+    curl -H "X-Profile-Request: $ts:$sig" .../api/recipes/suggestions/
+"""
+
+from typing import Dict, List, Optional
+import cProfile
+import hashlib
+import hmac
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+from starlette.concurrency import run_in_threadpool
+
+PROFILE_HEADER = b"x-profile-request"
+SIGNATURE_MAX_AGE_SECONDS = 300
+PROFILE_KINDS = {"pstats": ".pstats", "collapsed": ".collapsed"}
+PROFILE_ENDPOINTS_PREFIX = "/api/debug/profiles/"
+
+PROFILING_SECRET = os.getenv("PROFILING_SECRET", "")
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0") or 0)
+PROFILING_DIR = os.getenv("PROFILING_DIR") or os.path.join(tempfile.gettempdir(), "ecoeats-profiles")
+PROFILING_MAX_PROFILES = int(os.getenv("PROFILING_MAX_PROFILES", "50"))
+PROFILING_SAMPLE_INTERVAL = float(os.getenv("PROFILING_SAMPLE_INTERVAL", "0.001"))
+
+PROFILING_ENABLED = bool(PROFILING_SECRET) or PROFILING_SAMPLE_RATE > 0
+
+def sign_request(secret: str, method: str, path: str, timestamp: Optional[int] = None) -> str:
+    """Build an X-Profile-Request header value"""
+    timestamp = int(time.time()) if timestamp is None else timestamp
+    digest = hmac.new(secret.encode(), f"{timestamp}:{method.upper()}:{path}".encode(), hashlib.sha256).hexdigest()
+    return f"{timestamp}:{digest}"
+
+def verify_signature(value: Optional[str], method: str, path: str) -> bool:
+    if not PROFILING_SECRET or not value or ":" not in value:
+        return False
+    timestamp, _, digest = value.partition(":")
+    if not timestamp.isdigit() or abs(time.time() - int(timestamp)) > SIGNATURE_MAX_AGE_SECONDS:
+        return False
+    expected = sign_request(PROFILING_SECRET, method, path, int(timestamp))
+    return hmac.compare_digest(expected, value)
+
+class StackSampler(threading.Thread):
+    """Samples one thread's Python stack at a fixed interval into collapsed-stack counts"""
+
+    def __init__(self, thread_id: int, interval: float = PROFILING_SAMPLE_INTERVAL):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts: Dict[str, int] = {}
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                key = ";".join(reversed(stack))
+                self.counts[key] = self.counts.get(key, 0) + 1
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+class ProfileStore:
+    """Ring buffer of profiles on disk, newest last"""
+
+    def __init__(self, directory: str = PROFILING_DIR, max_profiles: int = PROFILING_MAX_PROFILES):
+        self.directory = directory
+        self.max_profiles = max_profiles
+        self._lock = threading.Lock()
+
+    def save(self, profiler: cProfile.Profile, collapsed: Dict[str, int], metadata: Dict) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        profile_id = f"{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}"
+        base = os.path.join(self.directory, profile_id)
+        profiler.dump_stats(base + PROFILE_KINDS["pstats"])
+        with open(base + PROFILE_KINDS["collapsed"], "w") as f:
+            for stack, count in sorted(collapsed.items()):
+                f.write(f"{stack} {count}\n")
+        with open(base + ".json", "w") as f:
+            json.dump(dict(metadata, id=profile_id), f)
+        self._prune()
+        return profile_id
+
+    def _prune(self):
+        with self._lock:
+            profile_ids = self._profile_ids()
+            for profile_id in profile_ids[:-self.max_profiles] if self.max_profiles > 0 else profile_ids:
+                for suffix in (".json", *PROFILE_KINDS.values()):
+                    try:
+                        os.remove(os.path.join(self.directory, profile_id + suffix))
+                    except FileNotFoundError:
+                        pass
+
+    def _profile_ids(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name[:-5] for name in os.listdir(self.directory) if name.endswith(".json"))
+
+    def list(self) -> List[Dict]:
+        profiles = []
+        for profile_id in reversed(self._profile_ids()):
+            try:
+                with open(os.path.join(self.directory, profile_id + ".json")) as f:
+                    profiles.append(json.load(f))
+            except (FileNotFoundError, json.JSONDecodeError):
+                continue
+        return profiles
+
+    def path(self, profile_id: str, kind: str) -> Optional[str]:
+        if kind not in PROFILE_KINDS or profile_id not in self._profile_ids():
+            return None
+        return os.path.join(self.directory, profile_id + PROFILE_KINDS[kind])
+
+profile_store = ProfileStore()
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles selected requests.
+
+    With profiling disabled every request goes straight through after one
+    boolean check. At most one profile is recorded at a time, but it is not
+    isolated: cProfile and the stack sampler watch the whole event-loop
+    thread, so coroutines of other requests that run while the profiled one
+    awaits show up in its profile too. Profile under light concurrent load,
+    or read the collapsed stacks with that in mind. Work a handler pushes to
+    the threadpool is not seen at all.
+    """
+
+    def __init__(self, app, store: ProfileStore = profile_store):
+        self.app = app
+        self.store = store
+        self._busy = threading.Lock()
+
+    def _selected(self, scope) -> Optional[str]:
+        if scope["path"].startswith(PROFILE_ENDPOINTS_PREFIX):
+            return None
+        if PROFILING_SAMPLE_RATE > 0 and random.random() < PROFILING_SAMPLE_RATE:
+            return "sampled"
+        for name, value in scope.get("headers", ()):
+            if name == PROFILE_HEADER:
+                if verify_signature(value.decode("latin-1"), scope["method"], scope["path"]):
+                    return "header"
+                return None
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if not PROFILING_ENABLED or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        trigger = self._selected(scope)
+        if trigger is None or not self._busy.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        status = {}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        profiler = cProfile.Profile()
+        sampler = StackSampler(threading.get_ident())
+        started = time.perf_counter()
+        try:
+            sampler.start()
+            profiler.enable()
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                profiler.disable()
+                sampler.stop()
+            # Writing three files is blocking I/O; keep it off the event loop
+            await run_in_threadpool(self.store.save, profiler, sampler.counts, {
+                "method": scope["method"],
+                "path": scope["path"],
+                "query": scope.get("query_string", b"").decode("latin-1"),
+                "status": status.get("code"),
+                "duration_ms": (time.perf_counter() - started) * 1000.0,
+                "trigger": trigger,
+                "created_at": time.time(),
+            })
+        finally:
+            self._busy.release()
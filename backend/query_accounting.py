@@ -0,0 +1,198 @@
+"""Per-request SQL accounting with N+1 detection.
+
+Engine event listeners count every statement, its DB time and a fingerprint
+(the SQL with literals and IN-lists folded) into the current request's
+QueryStats. QueryAccountingMiddleware sets up that context and rolls each
+request into per-route totals served by /api/metrics/queries/. With
+QUERY_ACCOUNTING_DEBUG=1 every response also carries X-DB-Query-Count,
+X-DB-Time-Ms and X-DB-Repeated-Queries headers.
+
+A statement fingerprint executed N_PLUS_ONE_THRESHOLD or more times in one
+request is reported as a likely N+1 pattern. Tests can pin a budget:
+
+    with query_budget(3):
+        client.put(f"/api/inventory/{item_id}/", json={"quantity": 2})
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+import logging
+import os
+import re
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+QUERY_ACCOUNTING_DEBUG = os.getenv("QUERY_ACCOUNTING_DEBUG", "").lower() in ("1", "true", "yes")
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "3"))
+
+logger = logging.getLogger(__name__)
+
+_IN_LIST_PATTERN = re.compile(r"\(\s*(?:\?|%\(\w+\)s|:\w+|\$\d+|%s)(?:\s*,\s*(?:\?|%\(\w+\)s|:\w+|\$\d+|%s))+\s*\)")
+_NUMBER_PATTERN = re.compile(r"\b\d+\b")
+_STRING_PATTERN = re.compile(r"'(?:[^']|'')*'")
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+def fingerprint(statement: str) -> str:
+    """Normalize a statement so repeats with different parameters compare equal"""
+    text = _STRING_PATTERN.sub("?", statement)
+    text = _NUMBER_PATTERN.sub("?", text)
+    text = _IN_LIST_PATTERN.sub("(?)", text)
+    return _WHITESPACE_PATTERN.sub(" ", text).strip()
+
+class QueryStats:
+    """Statements, DB time and fingerprint counts for one request or block"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, duration: float):
+        key = fingerprint(statement)
+        with self._lock:
+            self.count += 1
+            self.duration += duration
+            self.fingerprints[key] = self.fingerprints.get(key, 0) + 1
+
+    @property
+    def duration_ms(self) -> float:
+        return self.duration * 1000.0
+
+    def repeated(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> Dict[str, int]:
+        """Fingerprints executed at least `threshold` times, most repeated first"""
+        with self._lock:
+            hits = [(key, count) for key, count in self.fingerprints.items() if count >= threshold]
+        return dict(sorted(hits, key=lambda hit: -hit[1]))
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+_captures: List[QueryStats] = []
+_captures_lock = threading.Lock()
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("query_start")
+    if not starts:
+        return
+    duration = time.perf_counter() - starts.pop()
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, duration)
+    if _captures:
+        with _captures_lock:
+            for capture in _captures:
+                capture.record(statement, duration)
+
+@contextmanager
+def count_queries():
+    """Capture every statement run on any thread while the block is active"""
+    stats = QueryStats()
+    with _captures_lock:
+        _captures.append(stats)
+    try:
+        yield stats
+    finally:
+        with _captures_lock:
+            _captures.remove(stats)
+
+@contextmanager
+def query_budget(max_queries: int, allow_repeats: bool = False):
+    """Fail with the offending statements if the block runs more than `max_queries`"""
+    with count_queries() as stats:
+        yield stats
+    problems = []
+    if stats.count > max_queries:
+        problems.append(f"expected at most {max_queries} queries, ran {stats.count}")
+    repeated = {} if allow_repeats else stats.repeated()
+    if repeated:
+        problems.append("possible N+1")
+    if problems:
+        lines = [f"  {count}x {key}" for key, count in sorted(stats.fingerprints.items(), key=lambda hit: -hit[1])]
+        raise AssertionError("; ".join(problems) + ":\n" + "\n".join(lines))
+
+class QueryMetrics:
+    """Per-route request totals for the metrics endpoint"""
+
+    def __init__(self):
+        self.routes: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, route: str, stats: QueryStats, repeated: Dict[str, int]):
+        with self._lock:
+            entry = self.routes.get(route)
+            if entry is None:
+                entry = self.routes[route] = {
+                    "requests": 0, "queries": 0, "db_time_ms": 0.0,
+                    "max_queries": 0, "n_plus_one_requests": 0, "repeated_statements": {},
+                }
+            entry["requests"] += 1
+            entry["queries"] += stats.count
+            entry["db_time_ms"] += stats.duration_ms
+            entry["max_queries"] = max(entry["max_queries"], stats.count)
+            if repeated:
+                entry["n_plus_one_requests"] += 1
+                for key, count in repeated.items():
+                    entry["repeated_statements"][key] = max(count, entry["repeated_statements"].get(key, 0))
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {
+                route: dict(
+                    entry,
+                    repeated_statements=dict(entry["repeated_statements"]),
+                    avg_queries=entry["queries"] / entry["requests"],
+                    avg_db_time_ms=entry["db_time_ms"] / entry["requests"],
+                )
+                for route, entry in sorted(self.routes.items())
+            }
+
+query_metrics = QueryMetrics()
+
+class QueryAccountingMiddleware:
+    """ASGI middleware that scopes QueryStats to each HTTP request.
+
+    Sync handlers and dependencies run in FastAPI's threadpool with a copy of
+    the request context, so their statements land in the same QueryStats.
+    """
+
+    def __init__(self, app, metrics: QueryMetrics = query_metrics, debug: bool = QUERY_ACCOUNTING_DEBUG):
+        self.app = app
+        self.metrics = metrics
+        self.debug = debug
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start" and self.debug:
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-query-count", str(stats.count).encode()))
+                headers.append((b"x-db-time-ms", f"{stats.duration_ms:.2f}".encode()))
+                headers.append((b"x-db-repeated-queries", str(len(stats.repeated())).encode()))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            _current_stats.reset(token)
+            route = scope.get("route")
+            label = f"{scope['method']} {getattr(route, 'path', None) or 'unmatched'}"
+            repeated = stats.repeated()
+            if repeated:
+                worst, times = next(iter(repeated.items()))
+                logger.warning("Possible N+1 in %s: %sx %s", label, times, worst)
+            self.metrics.observe(label, stats, repeated)
@@ -0,0 +1,180 @@
+from models import Recipe as RecipeModel
+from catalog import CatalogSnapshot, register_index
+from typing import Dict, Iterable, List, Optional, Tuple
+
+FACET_INDEX = "recipe_facets"
+
+# Upper bounds (minutes) of the prep-time buckets reported in facet counts
+PREP_TIME_BUCKETS = (15, 30, 60)
+
+def prep_time_bucket(minutes: int) -> str:
+    for bound in PREP_TIME_BUCKETS:
+        if minutes <= bound:
+            return f"<={bound}"
+    return f">{PREP_TIME_BUCKETS[-1]}"
+
+def iter_bits(mask: int) -> Iterable[int]:
+    """Positions of the set bits, lowest first"""
+    bits = format(mask, "b")[::-1]
+    position = bits.find("1")
+    while position != -1:
+        yield position
+        position = bits.find("1", position + 1)
+
+def _facet_values(recipe: RecipeModel) -> Tuple[frozenset, str, int]:
+    return (
+        frozenset(tag.lower() for tag in recipe.dietary_tags or []),
+        (recipe.cuisine_type or "").strip().lower(),
+        recipe.prep_time or 0,
+    )
+
+class RecipeFacetIndex:
+    """Per-facet bitmaps over catalog positions.
+
+    Each dietary tag, cuisine and prep time maps to a Python int whose bit i
+    is set when the recipe at position i has that value, so a combined filter
+    is a few ANDs/ORs and a facet count is a popcount of one AND.
+    """
+
+    def __init__(self):
+        self.recipe_ids: List[Optional[str]] = []
+        self.position_by_recipe: Dict[str, int] = {}
+        self.doc_values: List[Tuple[frozenset, str, int]] = []
+        self.tags: Dict[str, int] = {}
+        self.cuisines: Dict[str, int] = {}
+        self.cuisine_labels: Dict[str, str] = {}
+        self.prep_times: Dict[int, int] = {}
+        self.live = 0
+
+    @staticmethod
+    def _set(bitmaps: Dict, key, bit: int):
+        bitmaps[key] = bitmaps.get(key, 0) | bit
+
+    @staticmethod
+    def _clear(bitmaps: Dict, key, bit: int):
+        value = bitmaps.get(key, 0) & ~bit
+        if value:
+            bitmaps[key] = value
+        else:
+            bitmaps.pop(key, None)
+
+    def add_recipe(self, recipe: RecipeModel):
+        position = self.position_by_recipe.get(recipe.id)
+        if position is None:
+            position = len(self.recipe_ids)
+            self.recipe_ids.append(recipe.id)
+            self.doc_values.append((frozenset(), "", 0))
+            self.position_by_recipe[recipe.id] = position
+        else:
+            self._remove_bits(position)
+        bit = 1 << position
+        values = _facet_values(recipe)
+        self.doc_values[position] = values
+        tags, cuisine, prep_time = values
+        for tag in tags:
+            self._set(self.tags, tag, bit)
+        self._set(self.cuisines, cuisine, bit)
+        self.cuisine_labels.setdefault(cuisine, (recipe.cuisine_type or "").strip())
+        self._set(self.prep_times, prep_time, bit)
+        self.live |= bit
+
+    def _remove_bits(self, position: int):
+        bit = 1 << position
+        tags, cuisine, prep_time = self.doc_values[position]
+        for tag in tags:
+            self._clear(self.tags, tag, bit)
+        self._clear(self.cuisines, cuisine, bit)
+        self._clear(self.prep_times, prep_time, bit)
+        self.live &= ~bit
+
+    def filter(self, dietary_tags: Optional[List[str]] = None, cuisines: Optional[List[str]] = None,
+               max_prep_time: Optional[int] = None) -> int:
+        """Bitmap of recipes having every tag, any of the cuisines and a short enough prep time"""
+        mask = self.live
+        for tag in dietary_tags or []:
+            mask &= self.tags.get(tag.lower(), 0)
+        if cuisines:
+            allowed = 0
+            for cuisine in cuisines:
+                allowed |= self.cuisines.get(cuisine.strip().lower(), 0)
+            mask &= allowed
+        if max_prep_time is not None:
+            allowed = 0
+            for minutes, bitmap in self.prep_times.items():
+                if minutes <= max_prep_time:
+                    allowed |= bitmap
+            mask &= allowed
+        return mask
+
+    def mask_of(self, recipe_ids: Iterable[str]) -> int:
+        mask = 0
+        for recipe_id in recipe_ids:
+            position = self.position_by_recipe.get(recipe_id)
+            if position is not None:
+                mask |= 1 << position
+        return mask
+
+    def ids(self, mask: int) -> List[str]:
+        return [self.recipe_ids[position] for position in iter_bits(mask)]
+
+    def counts(self, mask: int) -> Dict[str, Dict[str, int]]:
+        """Facet value counts within a filtered set, one popcount per value"""
+        prep_buckets: Dict[str, int] = {}
+        for minutes, bitmap in self.prep_times.items():
+            count = (mask & bitmap).bit_count()
+            if count:
+                bucket = prep_time_bucket(minutes)
+                prep_buckets[bucket] = prep_buckets.get(bucket, 0) + count
+        return {
+            "dietary_tags": {tag: n for tag, bitmap in sorted(self.tags.items()) if (n := (mask & bitmap).bit_count())},
+            "cuisine_type": {self.cuisine_labels[cuisine]: n for cuisine, bitmap in sorted(self.cuisines.items()) if (n := (mask & bitmap).bit_count())},
+            "prep_time": prep_buckets,
+        }
+
+def _bitmap(positions: List[int], size: int) -> int:
+    buffer = bytearray((size + 7) // 8)
+    for position in positions:
+        buffer[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(buffer, "little")
+
+def build_facet_index(recipes: List[RecipeModel]) -> RecipeFacetIndex:
+    """Bulk build: collect positions per value first, then make each bitmap once"""
+    index = RecipeFacetIndex()
+    positions: Dict[str, Dict] = {"tags": {}, "cuisines": {}, "prep_times": {}}
+    for recipe in recipes:
+        if recipe.id in index.position_by_recipe:
+            continue
+        position = len(index.recipe_ids)
+        index.recipe_ids.append(recipe.id)
+        index.position_by_recipe[recipe.id] = position
+        values = _facet_values(recipe)
+        index.doc_values.append(values)
+        tags, cuisine, prep_time = values
+        for tag in tags:
+            positions["tags"].setdefault(tag, []).append(position)
+        positions["cuisines"].setdefault(cuisine, []).append(position)
+        index.cuisine_labels.setdefault(cuisine, (recipe.cuisine_type or "").strip())
+        positions["prep_times"].setdefault(prep_time, []).append(position)
+    size = len(index.recipe_ids)
+    for facet, by_value in positions.items():
+        setattr(index, facet, {value: _bitmap(found, size) for value, found in by_value.items()})
+    index.live = (1 << size) - 1
+    return index
+
+register_index(FACET_INDEX, build_facet_index, RecipeFacetIndex.add_recipe)
+
+def has_facet_filters(dietary_tags: Optional[List[str]], cuisines: Optional[List[str]], max_prep_time: Optional[int]) -> bool:
+    return bool(dietary_tags or cuisines or max_prep_time is not None)
+
+def filter_recipes(catalog: CatalogSnapshot, dietary_tags: Optional[List[str]] = None, cuisines: Optional[List[str]] = None,
+                   max_prep_time: Optional[int] = None) -> Tuple[List[RecipeModel], Dict[str, Dict[str, int]]]:
+    """Return the catalog recipes passing the filters, in catalog order, plus their facet counts"""
+    index: RecipeFacetIndex = catalog.index(FACET_INDEX)
+    mask = index.filter(dietary_tags, cuisines, max_prep_time)
+    recipes = [catalog.by_id[recipe_id] for recipe_id in index.ids(mask) if recipe_id in catalog.by_id]
+    return recipes, index.counts(mask)
+
+def facet_counts(catalog: CatalogSnapshot, recipe_ids: Iterable[str]) -> Dict[str, Dict[str, int]]:
+    """Facet counts for an arbitrary set of recipes, e.g. the recommendations"""
+    index: RecipeFacetIndex = catalog.index(FACET_INDEX)
+    return index.counts(index.mask_of(recipe_ids))
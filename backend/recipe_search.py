@@ -0,0 +1,313 @@
+from models import Recipe as RecipeModel
+from catalog import CatalogSnapshot, register_index
+from typing import Dict, List, Optional, Tuple
+import heapq
+import math
+import re
+
+SEARCH_INDEX = "recipe_search"
+
+# BM25 parameters and per-field term weights (BM25F-style)
+K1 = 1.2
+B = 0.75
+FIELD_WEIGHTS = {
+    "name": 3.0,
+    "cuisine_type": 2.0,
+    "ingredients": 1.5,
+    "instructions": 1.0,
+}
+AUTOCOMPLETE_FIELDS = ("name", "cuisine_type", "ingredients")
+SUGGESTIONS_PER_NODE = 10
+PREFIX_EXPANSIONS = 20
+MIN_SUGGESTION_LENGTH = 3
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+def _recipe_fields(recipe: RecipeModel) -> Dict[str, List[str]]:
+    return {
+        "name": tokenize(recipe.name or ""),
+        "cuisine_type": tokenize(recipe.cuisine_type or ""),
+        "ingredients": tokenize(" ".join(recipe.uses_ingredients or []) + " " + " ".join(recipe.ingredients or [])),
+        "instructions": tokenize(" ".join(recipe.instructions or [])),
+    }
+
+class _TrieNode:
+    __slots__ = ("children", "top")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.top: List[Tuple[int, str]] = []
+
+class PrefixTrie:
+    """Character trie whose nodes cache their most frequent completions.
+
+    A lookup walks len(prefix) nodes and returns the cached list, so
+    autocomplete cost does not depend on vocabulary size.
+    """
+
+    def __init__(self):
+        self.root = _TrieNode()
+        self.counts: Dict[str, int] = {}
+
+    def _path(self, term: str, create: bool) -> List[_TrieNode]:
+        node = self.root
+        path = [node]
+        for char in term:
+            child = node.children.get(char)
+            if child is None:
+                if not create:
+                    return []
+                child = node.children[char] = _TrieNode()
+            node = child
+            path.append(node)
+        return path
+
+    def _collect(self, node: _TrieNode, prefix: str, out: List[Tuple[int, str]]):
+        count = self.counts.get(prefix, 0)
+        if count > 0:
+            out.append((count, prefix))
+        for char, child in node.children.items():
+            self._collect(child, prefix + char, out)
+
+    def adjust(self, term: str, delta: int):
+        """Change a term's weight and refresh the cached completions on its path"""
+        count = self.counts.get(term, 0) + delta
+        if count > 0:
+            self.counts[term] = count
+        else:
+            self.counts.pop(term, None)
+            count = 0
+
+        path = self._path(term, create=count > 0)
+        for depth, node in enumerate(path):
+            was_cached = any(entry[1] == term for entry in node.top)
+            if delta < 0 and was_cached and len(node.top) >= SUGGESTIONS_PER_NODE:
+                # A lower weight may let a term outside the cached list back in
+                top = []
+                self._collect(node, term[:depth], top)
+            else:
+                top = [entry for entry in node.top if entry[1] != term]
+                if count > 0:
+                    top.append((count, term))
+            top.sort(key=lambda entry: (-entry[0], entry[1]))
+            node.top = top[:SUGGESTIONS_PER_NODE]
+
+    @classmethod
+    def from_counts(cls, counts: Dict[str, int]) -> "PrefixTrie":
+        """Build the trie in one pass, filling cached completions bottom-up"""
+        trie = cls()
+        trie.counts = {term: count for term, count in counts.items() if count > 0}
+        for term in trie.counts:
+            trie._path(term, create=True)
+
+        def fill(node: _TrieNode, prefix: str):
+            top = [(trie.counts[prefix], prefix)] if prefix in trie.counts else []
+            for char, child in node.children.items():
+                fill(child, prefix + char)
+                top.extend(child.top)
+            top.sort(key=lambda entry: (-entry[0], entry[1]))
+            node.top = top[:SUGGESTIONS_PER_NODE]
+
+        fill(trie.root, "")
+        return trie
+
+    def complete(self, prefix: str, limit: int = SUGGESTIONS_PER_NODE) -> List[str]:
+        path = self._path(prefix, create=False)
+        if not path:
+            return []
+        return [term for count, term in path[-1].top[:limit]]
+
+class RecipeSearchIndex:
+    """Inverted index over the recipe catalog with BM25 ranking"""
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[int, float]] = {}
+        self.doc_ids: List[Optional[str]] = []
+        self.doc_lengths: List[float] = []
+        self.doc_terms: List[Dict[str, float]] = []
+        self.doc_suggestions: List[frozenset] = []
+        self.doc_by_recipe: Dict[str, int] = {}
+        self.dietary_tags: List[frozenset] = []
+        self.prep_times: List[int] = []
+        self.total_length = 0.0
+        self.live_docs = 0
+        self.trie = PrefixTrie()
+        self._invalidate()
+
+    def _invalidate(self):
+        self._norms: Optional[List[float]] = None
+        self._impacts: Dict[str, Tuple[Dict[int, float], List[Tuple[float, int]]]] = {}
+
+    def add_recipe(self, recipe: RecipeModel, update_trie: bool = True):
+        if recipe.id in self.doc_by_recipe:
+            self.remove_recipe(recipe.id)
+        self._invalidate()
+
+        fields = _recipe_fields(recipe)
+        weighted: Dict[str, float] = {}
+        for field, tokens in fields.items():
+            weight = FIELD_WEIGHTS[field]
+            for token in tokens:
+                weighted[token] = weighted.get(token, 0.0) + weight
+        length = sum(weighted.values())
+
+        doc = len(self.doc_ids)
+        self.doc_ids.append(recipe.id)
+        self.doc_lengths.append(length)
+        self.doc_terms.append(weighted)
+        self.dietary_tags.append(frozenset(tag.lower() for tag in recipe.dietary_tags or []))
+        self.prep_times.append(recipe.prep_time)
+        self.doc_by_recipe[recipe.id] = doc
+        self.total_length += length
+        self.live_docs += 1
+
+        for term, tf in weighted.items():
+            self.postings.setdefault(term, {})[doc] = tf
+        suggestions = frozenset(
+            token for field in AUTOCOMPLETE_FIELDS for token in fields[field]
+            if len(token) >= MIN_SUGGESTION_LENGTH and token.isalpha()
+        )
+        self.doc_suggestions.append(suggestions)
+        if update_trie:
+            for term in suggestions:
+                self.trie.adjust(term, 1)
+
+    def remove_recipe(self, recipe_id: str):
+        doc = self.doc_by_recipe.pop(recipe_id, None)
+        if doc is None:
+            return
+        self._invalidate()
+        for term in self.doc_terms[doc]:
+            postings = self.postings.get(term)
+            if postings is not None:
+                postings.pop(doc, None)
+                if not postings:
+                    del self.postings[term]
+        for term in self.doc_suggestions[doc]:
+            self.trie.adjust(term, -1)
+        self.total_length -= self.doc_lengths[doc]
+        self.live_docs -= 1
+        self.doc_ids[doc] = None
+        self.doc_terms[doc] = {}
+        self.doc_suggestions[doc] = frozenset()
+
+    def _doc_norms(self) -> List[float]:
+        if self._norms is None:
+            average_length = self.total_length / self.live_docs
+            self._norms = [K1 * (1.0 - B + B * length / average_length) for length in self.doc_lengths]
+        return self._norms
+
+    def _term_impacts(self, term: str) -> Tuple[Dict[int, float], List[Tuple[float, int]]]:
+        """Return a term's BM25 contribution per recipe, as a map and sorted best first.
+
+        Cached until the next write, since idf and length norms shift with it.
+        """
+        cached = self._impacts.get(term)
+        if cached is None:
+            postings = self.postings.get(term, {})
+            norms = self._doc_norms()
+            df = len(postings)
+            idf = math.log(1.0 + (self.live_docs - df + 0.5) / (df + 0.5))
+            scores = {doc: idf * tf * (K1 + 1.0) / (tf + norms[doc]) for doc, tf in postings.items()}
+            cached = self._impacts[term] = (scores, sorted(((score, doc) for doc, score in scores.items()), reverse=True))
+        return cached
+
+    def _prefix_impacts(self, prefix: str) -> Tuple[Dict[int, float], List[Tuple[float, int]]]:
+        """Impacts of a partially typed term: each recipe scores its best completion"""
+        key = prefix + "*"
+        cached = self._impacts.get(key)
+        if cached is None:
+            expansions = self.trie.complete(prefix, PREFIX_EXPANSIONS)
+            if prefix in self.postings and prefix not in expansions:
+                expansions.append(prefix)
+            scores: Dict[int, float] = {}
+            for term in expansions:
+                for doc, score in self._term_impacts(term)[0].items():
+                    if score > scores.get(doc, 0.0):
+                        scores[doc] = score
+            cached = self._impacts[key] = (scores, sorted(((score, doc) for doc, score in scores.items()), reverse=True))
+        return cached
+
+    def search(self, query: str, limit: int = 20, dietary_tags: Optional[List[str]] = None,
+               max_prep_time: Optional[int] = None, prefix: bool = True) -> List[Tuple[str, float]]:
+        """Return (recipe id, score) pairs for a query, best first.
+
+        The last query term is treated as a prefix so results update while
+        the user is still typing. Impact lists are walked best first and the
+        walk stops once no unseen recipe can beat the current top results
+        (threshold algorithm), so frequent terms do not cost a full scan.
+        """
+        terms = tokenize(query)
+        if not terms or self.live_docs == 0 or limit <= 0:
+            return []
+
+        lists = [self._term_impacts(term) for term in terms[:-1]]
+        lists.append(self._prefix_impacts(terms[-1]) if prefix else self._term_impacts(terms[-1]))
+        required_tags = frozenset(tag.lower() for tag in dietary_tags or [])
+
+        def allowed(doc: int) -> bool:
+            if required_tags and not required_tags <= self.dietary_tags[doc]:
+                return False
+            if max_prep_time is not None and self.prep_times[doc] > max_prep_time:
+                return False
+            return True
+
+        best: List[Tuple[float, int]] = []
+        seen = set()
+        longest = max(len(ranked) for scores, ranked in lists)
+        for depth in range(longest):
+            threshold = 0.0
+            for scores, ranked in lists:
+                if depth >= len(ranked):
+                    continue
+                partial, doc = ranked[depth]
+                threshold += partial
+                if doc in seen:
+                    continue
+                seen.add(doc)
+                if not allowed(doc):
+                    continue
+                entry = (sum(other.get(doc, 0.0) for other, _ in lists), doc)
+                if len(best) < limit:
+                    heapq.heappush(best, entry)
+                elif entry > best[0]:
+                    heapq.heapreplace(best, entry)
+            if len(best) == limit and best[0][0] >= threshold:
+                break
+
+        return [(self.doc_ids[doc], total) for total, doc in sorted(best, reverse=True)]
+
+    def autocomplete(self, prefix: str, limit: int = 10) -> List[str]:
+        terms = tokenize(prefix)
+        if not terms:
+            return []
+        head = " ".join(terms[:-1])
+        completions = self.trie.complete(terms[-1], limit)
+        return [f"{head} {term}" if head else term for term in completions]
+
+def build_search_index(recipes: List[RecipeModel]) -> RecipeSearchIndex:
+    index = RecipeSearchIndex()
+    counts: Dict[str, int] = {}
+    for recipe in recipes:
+        index.add_recipe(recipe, update_trie=False)
+        for term in index.doc_suggestions[-1]:
+            counts[term] = counts.get(term, 0) + 1
+    index.trie = PrefixTrie.from_counts(counts)
+    return index
+
+register_index(SEARCH_INDEX, build_search_index, RecipeSearchIndex.add_recipe)
+
+def search_recipes(catalog: CatalogSnapshot, query: str, limit: int = 20, dietary_tags: Optional[List[str]] = None,
+                   max_prep_time: Optional[int] = None) -> List[RecipeModel]:
+    """Full-text search over the catalog, ranked by BM25"""
+    index: RecipeSearchIndex = catalog.index(SEARCH_INDEX)
+    hits = index.search(query, limit, dietary_tags, max_prep_time)
+    return [catalog.by_id[recipe_id] for recipe_id, score in hits if recipe_id in catalog.by_id]
+
+def autocomplete_recipes(catalog: CatalogSnapshot, prefix: str, limit: int = 10) -> List[str]:
+    """Suggest query completions for a partially typed search"""
+    index: RecipeSearchIndex = catalog.index(SEARCH_INDEX)
+    return index.autocomplete(prefix, limit)
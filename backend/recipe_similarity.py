@@ -0,0 +1,178 @@
+from models import Recipe as RecipeModel
+from catalog import CatalogSnapshot, register_index
+from ingredient_parser import canonical_ingredient_key
+from typing import Dict, List, Optional, Set, Tuple
+from functools import lru_cache
+import bisect
+import heapq
+import math
+
+SIMILARITY_INDEX = "recipe_similarity"
+
+CUISINE_WEIGHT = 0.5
+INVENTORY_BOOST = 0.5
+INVENTORY_CANDIDATES_FACTOR = 3
+# Incremental adds reuse slightly stale IDF values; rebuild once this share of
+# the catalog has been added or replaced since the last full build
+STALE_REBUILD_FRACTION = 0.05
+# Most recipes scored per query; on huge catalogs the rare-ingredient postings
+# visited first fill this long before common ones, trading exactness on
+# near-ties for a bounded query time
+MAX_CANDIDATES = 1000
+
+# Ingredient names repeat heavily across a catalog
+_ingredient_key = lru_cache(maxsize=65536)(canonical_ingredient_key)
+
+def recipe_features(recipe: RecipeModel) -> Dict[str, float]:
+    """Binary term frequencies over canonical ingredients, plus the cuisine"""
+    features = {}
+    for name in recipe.uses_ingredients or []:
+        key = _ingredient_key(name)
+        if key:
+            features[f"ingredient:{key}"] = 1.0
+    cuisine = (recipe.cuisine_type or "").strip().lower()
+    if cuisine:
+        features[f"cuisine:{cuisine}"] = CUISINE_WEIGHT
+    return features
+
+class RecipeSimilarityIndex:
+    """L2-normalized TF-IDF vectors with impact-sorted postings for top-k cosine search"""
+
+    def __init__(self):
+        self.features: Dict[str, Dict[str, float]] = {}
+        self.vectors: Dict[str, Dict[str, float]] = {}
+        self.document_frequency: Dict[str, int] = {}
+        # feature -> [(-weight, recipe id)], strongest first
+        self.postings: Dict[str, List[Tuple[float, str]]] = {}
+        self.stale = 0
+
+    def _idf(self, feature: str) -> float:
+        return math.log((len(self.features) + 1) / (self.document_frequency.get(feature, 0) + 1)) + 1.0
+
+    def _vector(self, features: Dict[str, float]) -> Dict[str, float]:
+        weights = {feature: tf * self._idf(feature) for feature, tf in features.items()}
+        norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+        return {feature: weight / norm for feature, weight in weights.items()} if norm else {}
+
+    def rebuild(self):
+        self.vectors = {recipe_id: self._vector(features) for recipe_id, features in self.features.items()}
+        postings: Dict[str, List[Tuple[float, str]]] = {}
+        for recipe_id, vector in self.vectors.items():
+            for feature, weight in vector.items():
+                postings.setdefault(feature, []).append((-weight, recipe_id))
+        for entries in postings.values():
+            entries.sort()
+        self.postings = postings
+        self.stale = 0
+
+    def _remove(self, recipe_id: str):
+        for feature in self.features.pop(recipe_id, {}):
+            self.document_frequency[feature] -= 1
+            if not self.document_frequency[feature]:
+                del self.document_frequency[feature]
+        for feature, weight in self.vectors.pop(recipe_id, {}).items():
+            entries = self.postings.get(feature, [])
+            position = bisect.bisect_left(entries, (-weight, recipe_id))
+            if position < len(entries) and entries[position] == (-weight, recipe_id):
+                del entries[position]
+
+    def add_recipe(self, recipe: RecipeModel):
+        """Insert or replace one recipe without rebuilding every vector"""
+        self._remove(recipe.id)
+        features = recipe_features(recipe)
+        self.features[recipe.id] = features
+        for feature in features:
+            self.document_frequency[feature] = self.document_frequency.get(feature, 0) + 1
+        vector = self.vectors[recipe.id] = self._vector(features)
+        for feature, weight in vector.items():
+            bisect.insort(self.postings.setdefault(feature, []), (-weight, recipe.id))
+        self.stale += 1
+        if self.stale > STALE_REBUILD_FRACTION * len(self.features):
+            self.rebuild()
+
+    def similar(self, recipe_id: str, limit: int = 10) -> List[Tuple[str, float]]:
+        """Return (recipe id, cosine similarity) of the nearest recipes, best first.
+
+        Features are visited rarest first (largest upper bound on their
+        contribution). A recipe first met in a feature's postings can score
+        at most its weight there plus the bounds of the features still to
+        come, so the walk stops as soon as that cannot beat the current top
+        results and ubiquitous ingredients like salt are rarely scanned.
+        Results are exact unless more than MAX_CANDIDATES recipes get scored.
+        """
+        query = self.vectors.get(recipe_id)
+        if not query or limit <= 0:
+            return []
+        terms = []
+        for feature, weight in query.items():
+            entries = self.postings.get(feature, [])
+            if entries:
+                terms.append((weight * -entries[0][0], weight, entries))
+        terms.sort(key=lambda term: term[0], reverse=True)
+        remaining = [0.0] * (len(terms) + 1)
+        for i in range(len(terms) - 1, -1, -1):
+            remaining[i] = remaining[i + 1] + terms[i][0]
+
+        query_features = query.keys()
+        best: List[Tuple[float, str]] = []
+        seen = {recipe_id}
+        for i, (bound, query_weight, entries) in enumerate(terms):
+            rest = remaining[i + 1]
+            if len(best) == limit and best[0][0] >= bound + rest:
+                break
+            for negative_weight, candidate in entries:
+                if len(best) == limit and best[0][0] >= rest - query_weight * negative_weight:
+                    break
+                if candidate in seen:
+                    continue
+                if len(seen) > MAX_CANDIDATES:
+                    break
+                seen.add(candidate)
+                vector = self.vectors[candidate]
+                score = 0.0
+                for feature in query_features & vector.keys():
+                    score += query[feature] * vector[feature]
+                if len(best) < limit:
+                    heapq.heappush(best, (score, candidate))
+                elif score > best[0][0]:
+                    heapq.heapreplace(best, (score, candidate))
+        return [(candidate, score) for score, candidate in sorted(best, reverse=True)]
+
+def build_similarity_index(recipes: List[RecipeModel]) -> RecipeSimilarityIndex:
+    index = RecipeSimilarityIndex()
+    for recipe in recipes:
+        features = recipe_features(recipe)
+        if recipe.id in index.features:
+            continue
+        index.features[recipe.id] = features
+        for feature in features:
+            index.document_frequency[feature] = index.document_frequency.get(feature, 0) + 1
+    index.rebuild()
+    return index
+
+register_index(SIMILARITY_INDEX, build_similarity_index, RecipeSimilarityIndex.add_recipe)
+
+def inventory_coverage(recipe: RecipeModel, available_keys: Set[str]) -> float:
+    """Share of a recipe's ingredients found in the inventory"""
+    keys = {_ingredient_key(name) for name in recipe.uses_ingredients or []} - {""}
+    return len(keys & available_keys) / len(keys) if keys else 0.0
+
+def similar_recipes(catalog: CatalogSnapshot, recipe_id: str, limit: int = 10,
+                    inventory_names: Optional[List[str]] = None) -> List[Tuple[RecipeModel, float, Optional[float]]]:
+    """Return (recipe, similarity, inventory coverage) for recipes like the given one.
+
+    With inventory names, a wider candidate set is re-ranked so neighbours
+    that can mostly be cooked from what is on hand move up.
+    """
+    index: RecipeSimilarityIndex = catalog.index(SIMILARITY_INDEX)
+    if inventory_names is None:
+        return [(catalog.by_id[other], score, None) for other, score in index.similar(recipe_id, limit) if other in catalog.by_id]
+
+    available_keys = {canonical_ingredient_key(name) for name in inventory_names}
+    candidates = []
+    for other, score in index.similar(recipe_id, limit * INVENTORY_CANDIDATES_FACTOR):
+        recipe = catalog.by_id.get(other)
+        if recipe is not None:
+            candidates.append((recipe, score, inventory_coverage(recipe, available_keys)))
+    candidates.sort(key=lambda entry: entry[1] * (1.0 + INVENTORY_BOOST * entry[2]), reverse=True)
+    return candidates[:limit]
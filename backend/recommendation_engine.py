@@ -1,15 +1,23 @@
 from sqlalchemy.orm import Session
 from models import Recipe as RecipeModel, InventoryItem as InventoryItemModel
-from typing import List, Dict, Tuple
-import re
+from typing import List, Dict, Optional, Tuple
+from functools import lru_cache
+from ingredient_parser import normalize_ingredient_name, canonical_ingredient_key, to_base_quantity, canonical_unit
+from ingredient_vocabulary import get_vocabulary
 
-def normalize_ingredient_name(ingredient: str) -> str:
-    """Normalize ingredient names for better matching"""
-    ingredient = ingredient.lower().strip()
-    ingredient = re.sub(r'\d+\s*(cups?|tbsp|tsp|oz|lbs?|grams?|kg|ml|l)\s*', '', ingredient)
-    ingredient = re.sub(r'\b(a|an|the|of|in|with|and|or)\b', '', ingredient)
-    ingredient = ' '.join(ingredient.split())
-    return ingredient
+def ingredients_match(recipe_ing: str, available_ing: str) -> bool:
+    """Compare two normalized ingredient names using the engine's matching rules"""
+    return (recipe_ing == available_ing or
+            (recipe_ing == "egg" and available_ing == "eggs") or
+            (recipe_ing == "eggs" and available_ing == "egg") or
+            (recipe_ing == "flour" and available_ing == "plain flour") or
+            (recipe_ing == "plain flour" and available_ing == "flour") or
+            (recipe_ing == "oil" and "oil" in available_ing) or
+            ("oil" in recipe_ing and available_ing == "oil"))
+
+def has_name_aliases(recipe_ing: str) -> bool:
+    """Whether ingredients_match can pair this recipe name with a different available name"""
+    return recipe_ing in ("egg", "eggs", "flour", "plain flour") or "oil" in recipe_ing
 
 def calculate_ingredient_match_score(recipe_ingredients: List[str], available_ingredients: List[str]) -> float:
     """Calculate exact ingredient match score - only return 1.0 if ALL ingredients are available"""
@@ -22,13 +30,7 @@ def calculate_ingredient_match_score(recipe_ingredients: List[str], available_in
     for recipe_ing in normalized_recipe:
         found_match = False
         for available_ing in normalized_available:
-            if (recipe_ing == available_ing or
-                (recipe_ing == "egg" and available_ing == "eggs") or
-                (recipe_ing == "eggs" and available_ing == "egg") or
-                (recipe_ing == "flour" and available_ing == "plain flour") or
-                (recipe_ing == "plain flour" and available_ing == "flour") or
-                (recipe_ing == "oil" and "oil" in available_ing) or
-                ("oil" in recipe_ing and available_ing == "oil")):
+            if ingredients_match(recipe_ing, available_ing):
                 found_match = True
                 break
         
@@ -37,32 +39,88 @@ def calculate_ingredient_match_score(recipe_ingredients: List[str], available_in
     
     return 1.0
 
+# Inventory amounts key under which every oil is totalled, for recipes that ask for plain "oil"
+ANY_OIL = "*oil"
+# Folded names ingredients_match pairs besides plurals (egg/eggs folds on its own)
+QUANTITY_ALIASES = {"plain flour": "flour"}
+
+@lru_cache(maxsize=4096)
+def quantity_key(name: str) -> str:
+    """Plural-folded name quantities are totalled under, so 'tomato' and 'tomatoes' add up"""
+    key = canonical_ingredient_key(name)
+    return QUANTITY_ALIASES.get(key, key)
+
+def build_inventory_amounts(inventory_items: List[InventoryItemModel]) -> Dict[str, Dict[str, float]]:
+    """Total the inventory per quantity key and dimension, in base units, once per request.
+
+    Items without a unit are treated as plain counts. Oils are also totalled
+    under ANY_OIL.
+    """
+    amounts: Dict[str, Dict[str, float]] = {}
+    for item in inventory_items:
+        dimension, amount = to_base_quantity(item.quantity, canonical_unit(getattr(item, "unit", None)))
+        key = quantity_key(item.name)
+        for bucket in (key, ANY_OIL) if "oil" in key else (key,):
+            per_dimension = amounts.setdefault(bucket, {})
+            per_dimension[dimension] = per_dimension.get(dimension, 0.0) + amount
+    return amounts
+
+def _quantity_sources(key: str) -> Tuple[str, ...]:
+    """The inventory buckets ingredients_match lets a requirement draw on"""
+    if key == "oil":
+        return (ANY_OIL,)
+    if "oil" in key:
+        return (key, "oil")
+    return (key,)
+
+def has_sufficient_quantities(requirements: List[Dict], inventory_amounts: Dict[str, Dict[str, float]]) -> bool:
+    """Check a recipe's parsed requirements against build_inventory_amounts' totals.
+
+    Each requirement is a dictionary lookup or two. A requirement only fails
+    when the matching inventory is measured in the same dimension and holds
+    less than needed; amounts that cannot be compared (grams needed, items on
+    hand) are given the benefit of the doubt.
+    """
+    for requirement in requirements or []:
+        available = None
+        for source in _quantity_sources(quantity_key(requirement["ingredient"])):
+            amount = inventory_amounts.get(source, {}).get(requirement["dimension"])
+            if amount is not None:
+                available = (available or 0.0) + amount
+        if available is not None and available + 1e-9 < requirement["amount"]:
+            return False
+    return True
+
 def calculate_expiration_urgency_score(inventory_items: List[InventoryItemModel], recipe_ingredients: List[str]) -> float:
     """Calculate urgency score based on expiring ingredients used in recipe"""
+    normalized_items = [(normalize_ingredient_name(item.name), item.days_until_expiration) for item in inventory_items]
+    return expiration_urgency(normalized_items, [normalize_ingredient_name(ingredient) for ingredient in recipe_ingredients])
+
+def expiration_urgency(normalized_items: List[Tuple[str, int]], normalized_ingredients: List[str]) -> float:
+    """Urgency score from already normalized (item name, days until expiration) pairs"""
     urgency_score = 0.0
-    matching_items = []
+    matching_days = []
     
-    for item in inventory_items:
-        for ingredient in recipe_ingredients:
-            if (normalize_ingredient_name(item.name) in normalize_ingredient_name(ingredient) or 
-                normalize_ingredient_name(ingredient) in normalize_ingredient_name(item.name)):
-                matching_items.append(item)
+    for item_name, days_until_expiration in normalized_items:
+        for ingredient in normalized_ingredients:
+            if item_name in ingredient or ingredient in item_name:
+                matching_days.append(days_until_expiration)
                 break
     
-    if not matching_items:
+    if not matching_days:
         return 0.0
     
-    for item in matching_items:
-        if item.days_until_expiration <= 2:
+    for days_until_expiration in matching_days:
+        if days_until_expiration <= 2:
             urgency_score += 3.0  # Critical urgency
-        elif item.days_until_expiration <= 5:
+        elif days_until_expiration <= 5:
             urgency_score += 2.0  # High urgency
-        elif item.days_until_expiration <= 10:
+        elif days_until_expiration <= 10:
             urgency_score += 1.0  # Medium urgency
         else:
             urgency_score += 0.5  # Low urgency
     
-    return urgency_score / len(matching_items)
+    return urgency_score / len(matching_days)
 
 def calculate_recipe_complexity_score(recipe: RecipeModel) -> float:
     """Calculate complexity score - simpler recipes get higher scores"""
@@ -83,28 +141,46 @@ def calculate_recipe_complexity_score(recipe: RecipeModel) -> float:
     
     return base_score
 
-def get_recipe_recommendations(db: Session, inventory_items: List[InventoryItemModel], limit: int = 10) -> List[RecipeModel]:
-    """Get recipe recommendations based on available inventory - only exact matches"""
+def score_recipe(recipe: RecipeModel, urgency_score: float) -> float:
+    """Total ranking score of a recipe the inventory can make"""
+    complexity_score = calculate_recipe_complexity_score(recipe)
+    return (
+        urgency_score * 10.0 +          # Highest priority: use expiring items
+        complexity_score * 1.0          # Secondary: simpler recipes
+    )
+
+def get_recipe_recommendations(db: Session, inventory_items: List[InventoryItemModel], limit: Optional[int] = 10,
+                               candidates: Optional[List[RecipeModel]] = None) -> List[RecipeModel]:
+    """Get recipe recommendations based on available inventory - only exact matches.
+
+    `candidates` narrows the recipes considered (e.g. to a facet filter);
+    by default every recipe is scored. A limit of None returns all matches.
+    """
     if not inventory_items:
         return []  # No recommendations if no inventory
     
     available_ingredients = [item.name for item in inventory_items]
-    all_recipes = db.query(RecipeModel).all()
+    inventory_amounts = build_inventory_amounts(inventory_items)
+    vocabulary = get_vocabulary(db)
+    available_ids = set()
+    for item in inventory_items:
+        ingredient_id = item.ingredient_id or vocabulary.by_name.get(canonical_ingredient_key(item.name))
+        if ingredient_id is not None:
+            available_ids.add(ingredient_id)
+    all_recipes = candidates if candidates is not None else db.query(RecipeModel).all()
     
     exact_match_recipes = []
     
     for recipe in all_recipes:
-        ingredient_match_score = calculate_ingredient_match_score(recipe.uses_ingredients, available_ingredients)
+        recipe_ids = vocabulary.recipe_ingredient_ids(recipe)
+        if recipe_ids and None not in recipe_ids and available_ids.issuperset(recipe_ids):
+            ingredient_match_score = 1.0  # Canonical ids match exactly
+        else:
+            ingredient_match_score = calculate_ingredient_match_score(recipe.uses_ingredients, available_ingredients)
         
-        if ingredient_match_score == 1.0:
+        if ingredient_match_score == 1.0 and has_sufficient_quantities(recipe.parsed_ingredients, inventory_amounts):
             urgency_score = calculate_expiration_urgency_score(inventory_items, recipe.uses_ingredients)
-            complexity_score = calculate_recipe_complexity_score(recipe)
-            
-            total_score = (
-                urgency_score * 10.0 +          # Highest priority: use expiring items
-                complexity_score * 1.0          # Secondary: simpler recipes
-            )
-            
+            total_score = score_recipe(recipe, urgency_score)
             exact_match_recipes.append((recipe, total_score, urgency_score))
     
     exact_match_recipes.sort(key=lambda x: (x[2], x[1]), reverse=True)
@@ -1,6 +1,6 @@
 from pydantic import BaseModel
-from typing import List, Optional
-from datetime import datetime
+from typing import Any, Dict, List, Literal, Optional
+from datetime import datetime, date
 
 class RecipeBase(BaseModel):
     name: str
@@ -25,18 +25,26 @@ class InventoryItemBase(BaseModel):
     name: str
     category: str
     quantity: int
+    unit: Optional[str] = None
+    ingredient_id: Optional[int] = None
     purchase_date: datetime
     expiration_date: datetime
     days_until_expiration: int
     total_shelf_life: int
 
 class InventoryItemCreate(InventoryItemBase):
-    pass
+    # Left empty, these are estimated server-side from the name and category
+    purchase_date: Optional[datetime] = None
+    expiration_date: Optional[datetime] = None
+    days_until_expiration: Optional[int] = None
+    total_shelf_life: Optional[int] = None
 
 class InventoryItemUpdate(BaseModel):
     name: Optional[str] = None
     category: Optional[str] = None
     quantity: Optional[int] = None
+    unit: Optional[str] = None
+    ingredient_id: Optional[int] = None
     purchase_date: Optional[datetime] = None
     expiration_date: Optional[datetime] = None
     days_until_expiration: Optional[int] = None
@@ -45,6 +53,169 @@ class InventoryItemUpdate(BaseModel):
 class InventoryItem(InventoryItemBase):
     id: str
     created_at: datetime
+    updated_at: Optional[datetime] = None
+    change_seq: int = 0
+
+    class Config:
+        from_attributes = True
+
+class SimilarRecipe(Recipe):
+    similarity: float
+    inventory_coverage: Optional[float] = None
+
+class NearMissRecipe(Recipe):
+    missing_ingredients: List[str]
+    urgency: float
+
+class PurchaseSuggestion(BaseModel):
+    ingredient: str
+    ingredient_id: Optional[int] = None
+    unlocked_recipes: int
+    unlocked_urgency: float
+    score: float
+    recipes: List[NearMissRecipe]
+
+class FacetCounts(BaseModel):
+    dietary_tags: Dict[str, int]
+    cuisine_type: Dict[str, int]
+    prep_time: Dict[str, int]
+
+class FacetedRecipes(BaseModel):
+    total: int
+    recipes: List[Recipe]
+    facets: FacetCounts
+
+class WhatIfItem(BaseModel):
+    name: str
+    category: Optional[str] = None
+    quantity: int = 1
+    unit: Optional[str] = None
+    # Left empty, estimated from the name as if bought today
+    days_until_expiration: Optional[int] = None
+
+class WhatIfBasket(BaseModel):
+    label: Optional[str] = None
+    items: List[WhatIfItem]
+
+class WhatIfRequest(BaseModel):
+    baskets: List[WhatIfBasket]
+    include_inventory: bool = True
+    limit: int = 10
+
+class WhatIfResult(BaseModel):
+    label: Optional[str] = None
+    total: int
+    recipes: List[Recipe]
+
+LeftoverStatus = Literal["active", "used", "trashed"]
+
+class LeftoverBase(BaseModel):
+    name: str
+    category: str = ""
+    quantity: int = 1
+    food_size: Optional[str] = None
+    estimation_price: Optional[float] = None
+
+class LeftoverCreate(LeftoverBase):
+    # Left empty, purchase_date is now and expiration_date a few days later
+    purchase_date: Optional[datetime] = None
+    expiration_date: Optional[datetime] = None
+
+class LeftoverUpdate(BaseModel):
+    name: Optional[str] = None
+    category: Optional[str] = None
+    quantity: Optional[int] = None
+    food_size: Optional[str] = None
+    estimation_price: Optional[float] = None
+    purchase_date: Optional[datetime] = None
+    expiration_date: Optional[datetime] = None
+    status: Optional[LeftoverStatus] = None
+
+class Leftover(LeftoverBase):
+    id: str
+    purchase_date: datetime
+    expiration_date: datetime
+    status: LeftoverStatus
+    ingredient_id: Optional[int] = None
+    created_at: datetime
+    resolved_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class LeftoverHistory(BaseModel):
+    items: List[Leftover]
+    next_cursor: Optional[str] = None
+
+class ExpiryAlert(BaseModel):
+    item_id: str
+    name: str
+    source: Literal["inventory", "leftover"]
+    expiration_date: datetime
+    days_until_expiration: int
+
+class IngredientSuggestion(BaseModel):
+    id: int
+    name: str
+    recipe_count: int
+
+class IngredientMatch(BaseModel):
+    id: int
+    name: str
+    confidence: float
+
+class ShelfLifeRequest(BaseModel):
+    name: str
+    category: Optional[str] = None
+
+class ShelfLifeEstimate(ShelfLifeRequest):
+    shelf_life_days: int
+    source: str
+
+class InventoryChanges(BaseModel):
+    cursor: int
+    has_more: bool
+    upserted: List[InventoryItem]
+    deleted: List[str]
+
+class CategoryWasteStats(BaseModel):
+    category: str
+    used_count: int
+    used_quantity: int
+    discarded_count: int
+    discarded_quantity: int
+
+class WasteStats(BaseModel):
+    days: int
+    since: date
+    used_count: int
+    used_quantity: int
+    discarded_count: int
+    discarded_quantity: int
+    waste_rate: float
+    by_category: List[CategoryWasteStats]
+
+class ProfileSummary(BaseModel):
+    id: str
+    method: str
+    path: str
+    query: str
+    status: Optional[int] = None
+    duration_ms: float
+    trigger: str
+    created_at: float
+
+class JobStatus(BaseModel):
+    id: str
+    kind: str
+    status: str
+    progress: Dict[str, Any]
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    cancel_requested: bool
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
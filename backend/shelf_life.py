@@ -0,0 +1,187 @@
+from ingredient_parser import canonical_ingredient_key
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+import math
+
+# Refrigerated / pantry shelf life in days for common groceries, keyed by
+# canonical ingredient name (normalized, plurals folded).
+SHELF_LIFE_DAYS: Dict[str, int] = {
+    # Fruits
+    "apple": 30, "banana": 5, "orange": 21, "lemon": 21, "lime": 21, "grape": 7,
+    "strawberry": 5, "blueberry": 10, "raspberry": 3, "mixed berry": 5, "berry": 5,
+    "avocado": 4, "pear": 7, "peach": 5, "plum": 5, "mango": 6, "pineapple": 5,
+    "watermelon": 7, "cherry": 7, "kiwi": 14,
+    # Vegetables
+    "broccoli": 5, "carrot": 21, "bell pepper": 10, "pepper": 10, "tomato": 7,
+    "onion": 30, "red onion": 30, "garlic": 60, "potato": 30, "sweet potato": 30,
+    "lettuce": 7, "romaine lettuce": 7, "spinach": 5, "kale": 7, "cucumber": 7,
+    "zucchini": 5, "celery": 14, "mushroom": 5, "cabbage": 30, "cauliflower": 7,
+    "green bean": 7, "corn": 3, "asparagus": 4, "ginger": 21, "fresh basil": 5,
+    "basil": 5, "parsley": 7, "cilantro": 7, "coriander": 7, "scallion": 7,
+    "spring onion": 7,
+    # Dairy & eggs
+    "milk": 7, "egg": 28, "butter": 60, "cheese": 21, "cheddar cheese": 28,
+    "parmesan cheese": 60, "parmesan": 60, "mozzarella": 7, "fresh mozzarella": 5,
+    "feta cheese": 14, "ricotta": 7, "shredded cheese": 14, "cream": 10,
+    "double cream": 10, "heavy cream": 10, "sour cream": 14, "yogurt": 14,
+    "greek yogurt": 14, "cream cheese": 14,
+    # Meat, poultry, seafood
+    "chicken": 2, "chicken breast": 2, "chicken thigh": 2, "cooked chicken": 4,
+    "beef": 3, "ground beef": 2, "minced beef": 2, "beef sirloin": 4, "steak": 4,
+    "pork": 3, "bacon": 7, "sausage": 2, "ham": 5, "lamb": 3, "turkey": 2,
+    "salmon": 2, "salmon fillet": 2, "tuna": 2, "shrimp": 2, "prawn": 2, "fish": 2,
+    # Bakery and grains
+    "bread": 5, "tortilla": 7, "bagel": 5, "croissant": 2, "crouton": 30,
+    "rice": 730, "pasta": 730, "spaghetti": 730, "egg noodle": 365, "noodle": 365,
+    "lasagna noodle": 365, "rolled oat": 365, "oat": 365, "quinoa": 730,
+    "flour": 365, "plain flour": 365, "granola": 180,
+    # Pantry
+    "sugar": 730, "honey": 730, "salt": 1825, "baking powder": 365,
+    "soy sauce": 730, "olive oil": 540, "oil": 365, "vegetable oil": 365,
+    "balsamic vinegar": 1095, "vinegar": 1095, "mayonnaise": 60,
+    "caesar dressing": 60, "curry powder": 730, "cinnamon": 1095,
+    "coconut milk": 730, "chickpea": 730, "chicken broth": 730, "chicken stock": 730,
+    "tomato puree": 730, "canned tomato": 730,
+}
+
+# Fallback shelf life per category, matching lib/food-categories.ts values
+# (labels such as "Dairy & Eggs" are folded onto the same keys).
+CATEGORY_SHELF_LIFE_DAYS: Dict[str, int] = {
+    "fruits": 7,
+    "vegetables": 7,
+    "dairy": 10,
+    "meat": 3,
+    "poultry": 2,
+    "seafood": 2,
+    "grains": 365,
+    "bakery": 5,
+    "canned": 730,
+    "frozen": 180,
+    "snacks": 90,
+    "beverages": 30,
+    "condiments": 180,
+    "spices": 730,
+    "oils": 365,
+    "pantry": 365,
+    "other": 14,
+}
+
+CATEGORY_ALIASES: Dict[str, str] = {
+    "fruit": "fruits",
+    "vegetable": "vegetables",
+    "produce": "vegetables",
+    "dairy & eggs": "dairy",
+    "dairy and eggs": "dairy",
+    "eggs": "dairy",
+    "grains & cereals": "grains",
+    "canned goods": "canned",
+    "frozen foods": "frozen",
+    "condiments & sauces": "condiments",
+    "herbs & spices": "spices",
+    "oils & vinegars": "oils",
+}
+
+# How these are stored matters more than what is in them: canned tuna keeps
+# for years, not the two days of fresh tuna. Their category shelf life is a
+# floor for any estimate made from the name.
+STORAGE_CATEGORIES = frozenset({"frozen", "canned", "spices", "condiments", "oils"})
+# Words in a name that imply one of those categories whatever the item's own category
+STORAGE_WORDS: Dict[str, str] = {"frozen": "frozen", "canned": "canned", "tinned": "canned"}
+
+DEFAULT_SHELF_LIFE_DAYS = CATEGORY_SHELF_LIFE_DAYS["other"]
+
+SOURCE_EXACT = "exact"
+SOURCE_TOKEN = "token"
+SOURCE_CATEGORY = "category"
+SOURCE_DEFAULT = "default"
+
+def _build_token_index() -> Dict[str, int]:
+    """Map single words to shelf life so 'organic baby spinach' still resolves.
+
+    When several entries share a word the shortest shelf life wins, erring on
+    the side of eating food early rather than late.
+    """
+    index: Dict[str, int] = {}
+    for name, days in SHELF_LIFE_DAYS.items():
+        for token in name.split():
+            index[token] = min(days, index.get(token, days))
+    for name, days in SHELF_LIFE_DAYS.items():
+        if " " not in name:
+            index[name] = days
+    return index
+
+TOKEN_SHELF_LIFE_DAYS = _build_token_index()
+
+def _category_key(category: Optional[str]) -> str:
+    key = (category or "").strip().lower()
+    return CATEGORY_ALIASES.get(key, key)
+
+def _storage_floor(words: List[str], category_key: str) -> Optional[int]:
+    """Minimum shelf life implied by a storage category or a word like "frozen" in the name"""
+    storage = {STORAGE_WORDS[word] for word in words if word in STORAGE_WORDS}
+    if category_key in STORAGE_CATEGORIES:
+        storage.add(category_key)
+    return max((CATEGORY_SHELF_LIFE_DAYS[key] for key in storage), default=None)
+
+def _estimate_from_name(words: List[str]) -> Optional[Tuple[int, str]]:
+    for start in range(len(words)):
+        days = SHELF_LIFE_DAYS.get(" ".join(words[start:]))
+        if days is not None:
+            return days, SOURCE_EXACT if start == 0 else SOURCE_TOKEN
+    for word in reversed(words):
+        days = TOKEN_SHELF_LIFE_DAYS.get(word)
+        if days is not None:
+            return days, SOURCE_TOKEN
+    return None
+
+@lru_cache(maxsize=16384)
+def estimate_shelf_life(name: str, category: Optional[str] = None) -> Tuple[int, str]:
+    """Return (shelf life in days, source) for an item name and category.
+
+    Looks up the canonical name, then its trailing phrases ("frozen chicken
+    breast" -> "chicken breast"), then single words from the head noun
+    backwards, then the category, and finally a conservative default. Frozen,
+    canned, spice, condiment and oil items never get less than their
+    category's shelf life, so "canned tuna" is not given fresh tuna's 2 days.
+    """
+    words = canonical_ingredient_key(name).split()
+    category_key = _category_key(category)
+    estimate = _estimate_from_name(words)
+    floor = _storage_floor(words, category_key)
+    if floor is not None and (estimate is None or estimate[0] < floor):
+        return floor, SOURCE_CATEGORY
+    if estimate is not None:
+        return estimate
+    days = CATEGORY_SHELF_LIFE_DAYS.get(category_key)
+    if days is not None:
+        return days, SOURCE_CATEGORY
+    return DEFAULT_SHELF_LIFE_DAYS, SOURCE_DEFAULT
+
+def estimate_shelf_lives(items: List[Tuple[str, Optional[str]]]) -> List[Tuple[int, str]]:
+    """Estimate a whole grocery haul of (name, category) pairs"""
+    return [estimate_shelf_life(name, category) for name, category in items]
+
+def as_utc(value: datetime) -> datetime:
+    """Treat naive datetimes as UTC, which is how the API stores them"""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+def fill_expiration_dates(data: Dict, now: Optional[datetime] = None) -> Dict:
+    """Fill in whichever of the date fields an inventory payload left empty"""
+    if now is None:
+        now = datetime.utcnow()
+    purchase_date = data.get("purchase_date")
+    if purchase_date is None:
+        purchase_date = data["purchase_date"] = now
+
+    expiration_date = data.get("expiration_date")
+    if expiration_date is None:
+        days, source = estimate_shelf_life(data["name"], data.get("category"))
+        expiration_date = data["expiration_date"] = purchase_date + timedelta(days=days)
+
+    if data.get("total_shelf_life") is None:
+        data["total_shelf_life"] = max(1, (as_utc(expiration_date) - as_utc(purchase_date)).days)
+    if data.get("days_until_expiration") is None:
+        remaining = (as_utc(expiration_date) - as_utc(now)).total_seconds() / 86400
+        data["days_until_expiration"] = max(0, math.ceil(remaining))
+    return data
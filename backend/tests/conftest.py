@@ -0,0 +1,63 @@
+"""Shared fixtures: each test gets its own copy of a migrated, seeded SQLite database."""
+
+import os
+import shutil
+
+# Read at import by database.py and main.py, so set before anything imports them
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ["WARMUP_ON_STARTUP"] = "0"
+os.environ["ADMIN_TOKEN"] = "test-admin-token"
+
+import pytest
+
+ADMIN_HEADERS = {"X-Admin-Token": os.environ["ADMIN_TOKEN"]}
+
+@pytest.fixture(scope="session")
+def seeded_database(tmp_path_factory) -> str:
+    """Path of a database with the bundled recipes, vocabulary and sample inventory"""
+    from load_test import seed_database
+    path = str(tmp_path_factory.mktemp("seed") / "seed.db")
+    seed_database(f"sqlite:///{path}", 0)
+    return path
+
+@pytest.fixture
+def database_url(seeded_database, tmp_path, monkeypatch) -> str:
+    """Point the app at a private copy of the seeded database, with empty process caches"""
+    import catalog
+    import database
+    import ingredient_vocabulary
+    import main
+
+    path = str(tmp_path / "test.db")
+    shutil.copyfile(seeded_database, path)
+    url = f"sqlite:///{path}"
+    monkeypatch.setenv("DATABASE_URL", url)
+    monkeypatch.setattr(database, "DATABASE_URL", url)
+    monkeypatch.setattr(database, "_engine", None)
+    monkeypatch.setattr(catalog, "_catalog", None)
+    monkeypatch.setattr(ingredient_vocabulary, "_vocabulary", None)
+    main.catalog_responses._entries.clear()
+    yield url
+    database.dispose_engine()
+
+@pytest.fixture
+def db(database_url):
+    from database import SessionLocal
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+@pytest.fixture
+def client(database_url):
+    from fastapi.testclient import TestClient
+    import main
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+@pytest.fixture
+def household_client(client):
+    """The client acting for a fresh household with an empty inventory"""
+    client.headers["X-Household-Id"] = "test-household"
+    return client
@@ -0,0 +1,111 @@
+import time
+
+import pytest
+
+import fetch_themealdb_recipes
+from catalog import CATALOG_COUNTER
+from conftest import ADMIN_HEADERS
+from database import SessionLocal
+from fetch_themealdb_recipes import IngestError, ingest_themealdb_recipes
+from inventory_sync import current_change_seq
+from models import Recipe as RecipeModel
+
+class FakeResponse:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self.body = body
+
+    def json(self):
+        if self.body is None:
+            raise ValueError("not JSON")
+        return self.body
+
+def _meal(letter, i=0):
+    return {"idMeal": f"{letter}{i}", "strMeal": f"{letter.upper()}{i} stew", "strArea": "British",
+            "strCategory": "Beef", "strInstructions": "Brown.\nSimmer.", "strIngredient1": "Beef", "strMeasure1": "500g"}
+
+@pytest.fixture
+def themealdb(monkeypatch):
+    """Serve search.php?f=<letter> from a dict of letter -> FakeResponse (default: two meals)"""
+    responses = {}
+
+    def http_get(url):
+        letter = url.rsplit("=", 1)[1]
+        return responses.get(letter) or FakeResponse(200, {"meals": [_meal(letter), _meal(letter, 1)]})
+
+    monkeypatch.setattr(fetch_themealdb_recipes, "_http_get", http_get)
+    monkeypatch.setattr(fetch_themealdb_recipes.time, "sleep", lambda seconds: None)
+    return responses
+
+def _catalog_state(db):
+    db.expire_all()
+    return db.query(RecipeModel).count(), current_change_seq(db, CATALOG_COUNTER)
+
+def test_full_fetch_replaces_the_catalog(db, themealdb):
+    themealdb["x"] = FakeResponse(200, {"meals": None})
+    _, seq = _catalog_state(db)
+    result = ingest_themealdb_recipes(db)
+    assert result["written"] == 50
+    assert _catalog_state(db) == (50, seq + 1)
+
+@pytest.mark.parametrize("response", [FakeResponse(503), FakeResponse(200), FakeResponse(301, {"meals": []})])
+def test_a_failed_request_keeps_the_catalog(db, themealdb, response):
+    themealdb["m"] = response
+    before = _catalog_state(db)
+    with pytest.raises(IngestError):
+        ingest_themealdb_recipes(db)
+    db.rollback()
+    assert _catalog_state(db) == before
+
+def test_an_empty_result_keeps_the_catalog(db, themealdb):
+    for letter in "abcdefghijklmnopqrstuvwxyz":
+        themealdb[letter] = FakeResponse(200, {"meals": None})
+    before = _catalog_state(db)
+    with pytest.raises(IngestError, match="no recipes"):
+        ingest_themealdb_recipes(db, allow_shrink=True)
+    db.rollback()
+    assert _catalog_state(db) == before
+
+def test_a_much_smaller_catalog_needs_allow_shrink(db, themealdb):
+    for letter in "abcdefghijklmnopqrstuvwxyz"[1:]:
+        themealdb[letter] = FakeResponse(200, {"meals": None})
+    before = _catalog_state(db)
+    with pytest.raises(IngestError, match="Only 2 recipes fetched for a catalog of 20"):
+        ingest_themealdb_recipes(db)
+    db.rollback()
+    assert _catalog_state(db) == before
+    ingest_themealdb_recipes(db, allow_shrink=True)
+    assert _catalog_state(db)[0] == 2
+
+def _wait_for_job(client, job_id):
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        job = client.get(f"/api/admin/jobs/{job_id}/", headers=ADMIN_HEADERS).json()
+        if job["status"] in ("succeeded", "failed", "cancelled"):
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} did not finish")
+
+def test_ingest_commits_itself(db, themealdb, monkeypatch):
+    monkeypatch.setattr(fetch_themealdb_recipes, "sync_ingredient_vocabulary", lambda session: 0)
+    written = ingest_themealdb_recipes(db)["written"]
+    other = SessionLocal()
+    try:
+        assert other.query(RecipeModel).count() == written == 52
+    finally:
+        other.close()
+
+def test_ingest_job_fails_without_touching_the_catalog(client, themealdb, caplog):
+    themealdb["c"] = FakeResponse(500)
+    before = [recipe["id"] for recipe in client.get("/api/recipes/").json()]
+    job = client.post("/api/admin/catalog/ingest/", headers=ADMIN_HEADERS).json()
+    job = _wait_for_job(client, job["id"])
+    assert job["status"] == "failed"
+    assert "IngestError: TheMealDB returned 500" in job["error"]
+    failures = [record for record in caplog.records if record.name == "jobs"]
+    assert [record.levelname for record in failures] == ["ERROR"] and failures[0].exc_info is not None
+    assert job["error"] in failures[0].getMessage()
+    assert [recipe["id"] for recipe in client.get("/api/recipes/").json()] == before
+
+def test_ingest_job_requires_admin(client):
+    assert client.post("/api/admin/catalog/ingest/").status_code == 404
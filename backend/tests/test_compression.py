@@ -0,0 +1,132 @@
+import gzip
+import json
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+import compression
+from columnar import to_columnar
+from compression import CompressionMiddleware, PrecompressedCache, negotiate_encoding
+from conftest import ADMIN_HEADERS
+
+BIG = {"items": ["tomato"] * 200}
+
+@pytest.fixture
+def without_brotli(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, None),
+    ("", None),
+    ("identity", None),
+    ("gzip", "gzip"),
+    ("br, gzip", "gzip"),
+    ("gzip;q=0", None),
+    ("*", "gzip"),
+    ("*, gzip;q=0", None),
+    ("deflate, gzip;q=0.5", "gzip"),
+    ("gzip;q=nonsense", None),
+])
+def test_negotiates_gzip_without_brotli(without_brotli, accept, expected):
+    assert negotiate_encoding(accept) == expected
+
+def test_prefers_brotli_when_installed():
+    pytest.importorskip("brotli")
+    assert negotiate_encoding("gzip, br") == "br"
+    assert negotiate_encoding("br;q=0.5, gzip") == "gzip"
+
+def _client(minimum_size=1024):
+    async def big(request):
+        return JSONResponse(BIG)
+
+    async def small(request):
+        return JSONResponse({"ok": True})
+
+    async def encoded(request):
+        return Response(gzip.compress(json.dumps(BIG).encode()), media_type="application/json",
+                        headers={"Content-Encoding": "gzip"})
+
+    async def stream(request):
+        async def events():
+            yield "data: " + "x" * 2000 + "\n\n"
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    app = Starlette(routes=[Route("/big", big), Route("/small", small), Route("/encoded", encoded), Route("/stream", stream)])
+    app.add_middleware(CompressionMiddleware, minimum_size=minimum_size)
+    return TestClient(app)
+
+def test_compresses_only_bodies_over_the_threshold(without_brotli):
+    client = _client()
+    big = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert big.headers["Content-Encoding"] == "gzip"
+    assert int(big.headers["Content-Length"]) < len(json.dumps(BIG))
+    assert big.json() == BIG
+    assert "Accept-Encoding" in big.headers["Vary"]
+
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in small.headers
+    assert "Accept-Encoding" in small.headers["Vary"]
+    assert "Content-Encoding" not in client.get("/big", headers={"Accept-Encoding": "identity"}).headers
+
+def test_passes_through_encoded_bodies_and_event_streams(without_brotli):
+    client = _client(minimum_size=0)
+    encoded = client.get("/encoded", headers={"Accept-Encoding": "gzip"})
+    assert encoded.headers["Content-Encoding"] == "gzip"
+    assert encoded.json() == BIG  # decoded once, so it was not compressed twice
+
+    stream = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in stream.headers
+    assert stream.text.startswith("data: ")
+
+def test_columnar_round_trip():
+    rows = [{"name": "Soup", "prep_time": 10}, {"name": "Salad", "prep_time": 5}]
+    columnar = to_columnar(rows)
+    assert columnar == {"count": 2, "columns": {"name": ["Soup", "Salad"], "prep_time": [10, 5]}}
+    assert [dict(zip(columnar["columns"], values)) for values in zip(*columnar["columns"].values())] == rows
+    assert to_columnar([]) == {"count": 0, "columns": {}}
+
+def test_columnar_recipes_match_rows(client):
+    rows = client.get("/api/recipes/").json()
+    columnar = client.get("/api/recipes/?format=columnar").json()
+    assert columnar["count"] == len(rows)
+    assert columnar["columns"]["name"] == [row["name"] for row in rows]
+
+def test_precompressed_cache_builds_and_compresses_once(without_brotli):
+    cache = PrecompressedCache(max_entries=1)
+    builds = []
+
+    def build():
+        builds.append(1)
+        return json.dumps(BIG).encode()
+
+    first = cache.response("catalog", "gzip", build)
+    second = cache.response("catalog", "gzip", build)
+    assert first.body == second.body and first.headers["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(first.body)) == BIG
+    assert "Content-Encoding" not in cache.response("catalog", None, build).headers
+    assert len(builds) == 1
+
+    cache.response("other", "gzip", build)
+    cache.response("catalog", "gzip", build)
+    assert len(builds) == 3  # the LRU evicted "catalog"
+
+def test_catalog_responses_are_cached_until_a_recipe_is_added(client, without_brotli):
+    import main
+    headers = {"Accept-Encoding": "gzip"}
+    before = client.get("/api/recipes/", headers=headers)
+    assert before.headers["Content-Encoding"] == "gzip"
+    assert client.get("/api/recipes/", headers=headers).content == before.content
+    assert len(main.catalog_responses._entries) == 1
+
+    recipe = {
+        "name": "Smoked Paprika Lentils", "cuisine_type": "Spanish", "prep_time": 30,
+        "uses_ingredients": ["lentils", "paprika"], "ingredients": ["1 cup lentils", "1 tsp paprika"],
+        "instructions": ["Simmer."], "dietary_tags": ["vegan"],
+    }
+    assert client.post("/api/recipes/", json=recipe, headers=ADMIN_HEADERS).status_code == 200
+    after = client.get("/api/recipes/", headers=headers).json()
+    assert len(after) == len(before.json()) + 1
+    assert "Smoked Paprika Lentils" in [row["name"] for row in after]
@@ -0,0 +1,104 @@
+from datetime import datetime
+
+from sqlalchemy import create_engine, inspect, text
+
+from catalog import get_catalog
+import household_suggestions
+from database import SessionLocal, upgrade_database
+from household_suggestions import invalidate_household, refresh_household_suggestions
+from models import InventoryItem as InventoryItemModel
+from shelf_life import fill_expiration_dates
+
+def _client_for(client, household_id):
+    client.headers["X-Household-Id"] = household_id
+    return client
+
+def _add(client, name, category, quantity):
+    return client.post("/api/inventory/", json={"name": name, "category": category, "quantity": quantity}).json()
+
+def _precompute(db, household_ids):
+    refresh_household_suggestions(db, get_catalog(db), household_ids)
+    db.commit()
+
+def _suggestions_source(client, household_id):
+    response = _client_for(client, household_id).get("/api/recipes/suggestions/")
+    assert response.status_code == 200
+    return response.headers["X-Suggestions-Source"]
+
+def test_waste_stats_only_count_the_requesting_household(client):
+    milk = _add(_client_for(client, "alpha"), "Milk", "dairy", 2)
+    client.post(f"/api/inventory/{milk['id']}/mark-discarded/")
+    eggs = _add(_client_for(client, "beta"), "Eggs", "dairy", 6)
+    bread = _add(client, "Bread", "grains", 1)
+    client.post(f"/api/inventory/{eggs['id']}/mark-used/")
+    client.post(f"/api/inventory/{bread['id']}/mark-discarded/")
+
+    alpha = _client_for(client, "alpha").get("/api/stats/waste/?days=7").json()
+    assert (alpha["used_count"], alpha["discarded_count"], alpha["discarded_quantity"]) == (0, 1, 2)
+    beta = _client_for(client, "beta").get("/api/stats/waste/?days=7").json()
+    assert (beta["used_count"], beta["used_quantity"], beta["discarded_count"]) == (1, 6, 1)
+    assert sorted(c["category"] for c in beta["by_category"]) == ["dairy", "grains"]
+    empty = _client_for(client, "gamma").get("/api/stats/waste/?days=7").json()
+    assert (empty["used_count"], empty["discarded_count"]) == (0, 0)
+
+def test_resolved_leftovers_count_for_their_household(client):
+    leftover = _client_for(client, "alpha").post("/api/leftovers/", json={"name": "Chili", "category": "leftovers", "quantity": 3}).json()
+    assert client.post(f"/api/leftovers/{leftover['id']}/mark-trashed/").status_code == 200
+
+    assert _client_for(client, "alpha").get("/api/stats/waste/?days=7").json()["discarded_count"] == 1
+    assert _client_for(client, "beta").get("/api/stats/waste/?days=7").json()["discarded_count"] == 0
+
+def test_a_write_invalidates_only_its_households_precomputed_suggestions(client, db):
+    _add(_client_for(client, "alpha"), "Eggs", "dairy", 6)
+    _add(_client_for(client, "beta"), "Milk", "dairy", 1)
+    _precompute(db, ["alpha", "beta"])
+    assert _suggestions_source(client, "alpha") == "precomputed"
+    assert _suggestions_source(client, "beta") == "precomputed"
+
+    _add(_client_for(client, "alpha"), "Flour", "grains", 500)
+    assert _suggestions_source(client, "alpha") == "live"
+    assert _suggestions_source(client, "beta") == "precomputed"
+
+    _precompute(db, ["alpha"])
+    assert _suggestions_source(client, "alpha") == "precomputed"
+
+def test_a_write_committed_during_the_batch_read_keeps_the_household_stale(client, db, monkeypatch):
+    _add(_client_for(client, "alpha"), "Eggs", "dairy", 6)
+    # Stamped now, before the batch starts, but committed only after the batch has read the inventory
+    writer = SessionLocal()
+    flour = fill_expiration_dates({"name": "Flour", "category": "grains", "quantity": 500})
+    writer.add(InventoryItemModel(**flour, household_id="alpha"))
+    invalidate_household(writer, "alpha")
+    writer.flush()
+    read_inventory = household_suggestions.load_households
+
+    def load_then_commit_the_write(session, household_ids):
+        loaded = read_inventory(session, household_ids)
+        writer.commit()
+        return loaded
+
+    monkeypatch.setattr(household_suggestions, "load_households", load_then_commit_the_write)
+    try:
+        _precompute(db, ["alpha"])
+    finally:
+        writer.close()
+    assert _suggestions_source(client, "alpha") == "live"
+
+def test_migration_keeps_existing_rollups_under_the_default_household(tmp_path):
+    url = f"sqlite:///{tmp_path / 'rollups.db'}"
+    upgrade_database(url, "0005_exact_ingredient_ids")
+    engine = create_engine(url)
+    with engine.begin() as connection:
+        connection.execute(text(
+            "INSERT INTO waste_rollups (day, category, outcome, event_count, total_quantity) "
+            "VALUES ('2026-10-01', 'dairy', 'discarded', 2, 5)"
+        ))
+    upgrade_database(url)
+    assert inspect(engine).get_pk_constraint("waste_rollups")["constrained_columns"] == ["household_id", "day", "category", "outcome"]
+    with engine.begin() as connection:
+        assert connection.execute(text("SELECT household_id, event_count FROM waste_rollups")).all() == [("default", 2)]
+        connection.execute(text(
+            "INSERT INTO waste_rollups (household_id, day, category, outcome, event_count, total_quantity) "
+            "VALUES ('alpha', '2026-10-01', 'dairy', 'discarded', 1, 1)"
+        ))
+    engine.dispose()
@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from database import upgrade_database
+from ingredient_vocabulary import canonical_ingredient_id, get_vocabulary
+from models import Ingredient as IngredientModel, InventoryItem as InventoryItemModel
+
+NEAR_MISSES = ["Spaghetti squash", "tomato paste", "olive", "cream cheese"]
+
+@pytest.mark.parametrize("name", NEAR_MISSES)
+def test_near_miss_names_get_no_id(db, name):
+    assert get_vocabulary(db).canonicalize(name)[2] < 1.0
+    assert canonical_ingredient_id(db, name) is None
+
+@pytest.mark.parametrize("name, key", [("Eggs", "egg"), ("Tomatoes", "tomato"), ("  olive OIL ", "olive oil")])
+def test_exact_keys_get_their_id(db, name, key):
+    assert canonical_ingredient_id(db, name) == get_vocabulary(db).by_name[key]
+
+def test_canonicalize_endpoint_still_returns_fuzzy_matches(client):
+    match = client.get("/api/ingredients/canonicalize/?name=tomato paste").json()
+    assert match["name"] == "tomato" and match["confidence"] < 1.0
+
+def test_inventory_items_store_only_exact_ids(household_client):
+    squash = household_client.post("/api/inventory/", json={"name": "Spaghetti squash", "category": "vegetables", "quantity": 1})
+    eggs = household_client.post("/api/inventory/", json={"name": "Eggs", "category": "dairy", "quantity": 6})
+    assert squash.json()["ingredient_id"] is None
+    assert eggs.json()["ingredient_id"] is not None
+
+@pytest.mark.parametrize("pasta, expected", [("Spaghetti squash", False), ("Spaghetti", True)])
+def test_only_real_spaghetti_makes_carbonara(household_client, pasta, expected):
+    for name, category in [(pasta, "vegetables"), ("Eggs", "dairy"), ("Bacon", "meat"),
+                           ("Parmesan", "dairy"), ("Garlic", "vegetables")]:
+        household_client.post("/api/inventory/", json={"name": name, "category": category, "quantity": 1000})
+    names = [recipe["name"] for recipe in household_client.get("/api/recipes/suggestions/?limit=100").json()]
+    assert ("Spaghetti Carbonara" in names) is expected
+
+def test_migration_clears_stored_fuzzy_ids(tmp_path):
+    url = f"sqlite:///{tmp_path / 'fuzzy.db'}"
+    upgrade_database(url, "0004_query_indexes")
+    engine = create_engine(url)
+    now = datetime.utcnow()
+    with Session(engine) as session:
+        session.add_all([IngredientModel(id=1, name="spaghetti", recipe_count=1), IngredientModel(id=2, name="egg", recipe_count=1)])
+        for item_id, name, ingredient_id in [("squash", "Spaghetti squash", 1), ("eggs", "Eggs", 2)]:
+            session.add(InventoryItemModel(
+                id=item_id, name=name, category="other", quantity=1, ingredient_id=ingredient_id, purchase_date=now,
+                expiration_date=now + timedelta(days=5), days_until_expiration=5, total_shelf_life=5,
+            ))
+        session.commit()
+    upgrade_database(url)
+    with Session(engine) as session:
+        assert session.get(InventoryItemModel, "squash").ingredient_id is None
+        assert session.get(InventoryItemModel, "eggs").ingredient_id == 2
+    engine.dispose()
@@ -0,0 +1,76 @@
+from inventory_sync import INVENTORY_COUNTER, get_changes_since, inventory_counter, record_deletion
+from models import InventoryTombstone, SyncCounter
+
+def _add(client, name, quantity=1):
+    response = client.post("/api/inventory/", json={"name": name, "category": "vegetables", "quantity": quantity})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def test_snapshot_then_changes_since_cursor(household_client):
+    first = _add(household_client, "Carrots")
+    snapshot = household_client.get("/api/inventory/changes/").json()
+    assert [item["id"] for item in snapshot["upserted"]] == [first["id"]]
+    assert snapshot["deleted"] == [] and not snapshot["has_more"]
+
+    second = _add(household_client, "Spinach")
+    household_client.delete(f"/api/inventory/{first['id']}/")
+    changes = household_client.get(f"/api/inventory/changes/?since={snapshot['cursor']}").json()
+    assert [item["id"] for item in changes["upserted"]] == [second["id"]]
+    assert changes["deleted"] == [first["id"]]
+    assert changes["cursor"] > snapshot["cursor"]
+
+    unchanged = household_client.get(f"/api/inventory/changes/?since={changes['cursor']}").json()
+    assert unchanged == {"cursor": changes["cursor"], "has_more": False, "upserted": [], "deleted": []}
+
+def test_merges_items_and_tombstones_in_sequence_order_across_pages(household_client):
+    start = household_client.get("/api/inventory/changes/").json()["cursor"]
+    a = _add(household_client, "Apples")
+    b = _add(household_client, "Bananas")
+    household_client.delete(f"/api/inventory/{a['id']}/")
+    c = _add(household_client, "Cherries")
+
+    seen_upserted, seen_deleted, cursor, pages = [], [], start, 0
+    while True:
+        page = household_client.get(f"/api/inventory/changes/?since={cursor}&limit=1").json()
+        pages += 1
+        seen_upserted += [item["id"] for item in page["upserted"]]
+        seen_deleted += page["deleted"]
+        cursor = page["cursor"]
+        if not page["has_more"]:
+            break
+    assert seen_upserted == [b["id"], c["id"]]
+    assert seen_deleted == [a["id"]]
+    assert pages == 3
+
+def test_changes_are_scoped_to_the_household(client, db):
+    client.post("/api/inventory/", json={"name": "Milk", "category": "dairy", "quantity": 1},
+                headers={"X-Household-Id": "other"})
+    upserted, deleted, _, _ = get_changes_since(db, 0, household_id="test-household")
+    assert upserted == [] and deleted == []
+
+def test_deleting_an_id_again_moves_its_tombstone_forward(db):
+    record_deletion(db, "reused-id", 5, "alpha")
+    record_deletion(db, "reused-id", 9, "beta")
+    db.commit()
+    tombstone = db.get(InventoryTombstone, "reused-id")
+    assert (tombstone.household_id, tombstone.change_seq) == ("beta", 9)
+
+def test_each_household_bumps_its_own_counter(client, db):
+    alpha = {"X-Household-Id": "alpha"}
+    beta = {"X-Household-Id": "beta"}
+    client.post("/api/inventory/", json={"name": "Milk", "category": "dairy", "quantity": 1}, headers=alpha)
+    client.post("/api/inventory/", json={"name": "Eggs", "category": "dairy", "quantity": 6}, headers=alpha)
+    client.post("/api/inventory/", json={"name": "Rice", "category": "grains", "quantity": 1}, headers=beta)
+
+    counters = dict(db.query(SyncCounter.name, SyncCounter.value))
+    assert counters[inventory_counter("alpha")] - counters[inventory_counter("beta")] == 1
+    assert client.get("/api/inventory/changes/", headers=beta).json()["cursor"] == counters[inventory_counter("beta")]
+
+def test_new_household_counters_continue_from_the_shared_counter(client, db):
+    db.merge(SyncCounter(name=INVENTORY_COUNTER, value=40))
+    db.commit()
+    headers = {"X-Household-Id": "fresh"}
+    assert client.get("/api/inventory/changes/", headers=headers).json()["cursor"] == 40
+    item = client.post("/api/inventory/", json={"name": "Milk", "category": "dairy", "quantity": 1}, headers=headers).json()
+    assert item["change_seq"] == 41
+    assert client.get("/api/inventory/changes/?since=40", headers=headers).json()["upserted"][0]["id"] == item["id"]
@@ -0,0 +1,61 @@
+import pytest
+
+from inventory_sync import update_item, delete_item, VersionConflict
+
+@pytest.fixture
+def item(household_client):
+    return household_client.post("/api/inventory/", json={"name": "Milk", "category": "dairy", "quantity": 2}).json()
+
+@pytest.mark.parametrize("if_match", ["{seq}", '"{seq}"', 'W/"{seq}"'])
+def test_update_with_current_change_seq(household_client, item, if_match):
+    response = household_client.put(f"/api/inventory/{item['id']}/", json={"quantity": 1},
+                                    headers={"If-Match": if_match.format(seq=item["change_seq"])})
+    assert response.status_code == 200
+    assert response.json()["quantity"] == 1
+    assert response.json()["change_seq"] > item["change_seq"]
+
+def test_stale_update_conflicts_and_changes_nothing(household_client, item):
+    household_client.put(f"/api/inventory/{item['id']}/", json={"quantity": 5})
+    stale = household_client.put(f"/api/inventory/{item['id']}/", json={"quantity": 1},
+                                 headers={"If-Match": str(item["change_seq"])})
+    assert stale.status_code == 409
+    current = household_client.get(f"/api/inventory/{item['id']}/").json()
+    assert current["quantity"] == 5
+    assert f"change_seq {current['change_seq']}" in stale.json()["detail"]
+
+def test_stale_delete_conflicts_and_keeps_the_item(household_client, item):
+    household_client.put(f"/api/inventory/{item['id']}/", json={"quantity": 5})
+    for path in ("", "mark-used/", "mark-discarded/"):
+        method = household_client.delete if not path else household_client.post
+        response = method(f"/api/inventory/{item['id']}/{path}", headers={"If-Match": str(item["change_seq"])})
+        assert response.status_code == 409
+    assert household_client.get(f"/api/inventory/{item['id']}/").status_code == 200
+    assert household_client.get("/api/stats/waste/").json()["used_count"] == 0
+
+def test_unguarded_writes_still_apply(household_client, item):
+    assert household_client.put(f"/api/inventory/{item['id']}/", json={"quantity": 3}).json()["quantity"] == 3
+    assert household_client.delete(f"/api/inventory/{item['id']}/").status_code == 200
+    assert household_client.get(f"/api/inventory/{item['id']}/").status_code == 404
+
+def test_missing_item_is_404_not_409(household_client):
+    assert household_client.put("/api/inventory/nope/", json={"quantity": 1}, headers={"If-Match": "1"}).status_code == 404
+    assert household_client.delete("/api/inventory/nope/", headers={"If-Match": "1"}).status_code == 404
+
+def test_malformed_if_match_is_rejected(household_client, item):
+    response = household_client.put(f"/api/inventory/{item['id']}/", json={"quantity": 1}, headers={"If-Match": "*"})
+    assert response.status_code == 400
+
+def test_other_households_items_are_invisible(household_client, item):
+    other = {"X-Household-Id": "someone-else"}
+    assert household_client.put(f"/api/inventory/{item['id']}/", json={"quantity": 9}, headers=other).status_code == 404
+    assert household_client.delete(f"/api/inventory/{item['id']}/", headers=other).status_code == 404
+
+def test_version_conflict_carries_the_current_seq(db):
+    from models import InventoryItem as InventoryItemModel
+    row = db.query(InventoryItemModel).first()
+    with pytest.raises(VersionConflict) as conflict:
+        update_item(db, row.id, {"quantity": 1}, row.change_seq + 100, row.household_id)
+    assert conflict.value.args[0] == row.change_seq
+    db.rollback()
+    with pytest.raises(VersionConflict):
+        delete_item(db, row.id, row.change_seq + 100, row.household_id)
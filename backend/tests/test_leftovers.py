@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+
+from leftovers import get_leftover_history, new_leftover, STATUS_TRASHED, STATUS_USED, LEFTOVER_SHELF_LIFE_DAYS
+
+HOUSEHOLD = "leftover-tests"
+
+def _resolved(db, count, resolved_at):
+    """Leftovers resolved in bulk, several sharing a timestamp to exercise the id tiebreak"""
+    rows = []
+    for i in range(count):
+        row = new_leftover({"name": f"Leftover {i}", "household_id": HOUSEHOLD})
+        row.status = STATUS_USED if i % 2 else STATUS_TRASHED
+        row.resolved_at = resolved_at - timedelta(minutes=i // 3)
+        rows.append(row)
+    db.add_all(rows)
+    db.commit()
+    return rows
+
+def test_history_pages_cover_every_row_once_in_order(db):
+    rows = _resolved(db, 11, datetime(2026, 5, 1, 12, 0))
+    expected = [row.id for row in sorted(rows, key=lambda row: (row.resolved_at, row.id), reverse=True)]
+    seen, cursor = [], None
+    while True:
+        page, cursor = get_leftover_history(db, cursor, limit=4, household_id=HOUSEHOLD)
+        seen += [row.id for row in page]
+        if cursor is None:
+            break
+    assert seen == expected
+
+def test_history_exact_page_size_has_no_next_cursor(db):
+    _resolved(db, 4, datetime(2026, 5, 1))
+    page, cursor = get_leftover_history(db, None, limit=4, household_id=HOUSEHOLD)
+    assert len(page) == 4 and cursor is None
+
+def test_history_endpoint_and_invalid_cursor(household_client):
+    first = household_client.post("/api/leftovers/", json={"name": "Rice"}).json()
+    second = household_client.post("/api/leftovers/", json={"name": "Soup"}).json()
+    household_client.post(f"/api/leftovers/{first['id']}/mark-used/")
+    household_client.post(f"/api/leftovers/{second['id']}/mark-trashed/")
+
+    page = household_client.get("/api/leftovers/history/?limit=1").json()
+    assert [item["id"] for item in page["items"]] == [second["id"]]
+    rest = household_client.get(f"/api/leftovers/history/?limit=1&cursor={page['next_cursor']}").json()
+    assert [item["id"] for item in rest["items"]] == [first["id"]] and rest["next_cursor"] is None
+    assert household_client.get("/api/leftovers/history/?cursor=not-a-date").status_code == 400
+
+def test_active_leftovers_soonest_first_and_due_filter(household_client):
+    now = datetime.utcnow()
+    later = household_client.post("/api/leftovers/", json={"name": "Curry", "expiration_date": (now + timedelta(days=3)).isoformat()}).json()
+    sooner = household_client.post("/api/leftovers/", json={"name": "Pasta", "expiration_date": (now + timedelta(hours=12)).isoformat()}).json()
+    default = household_client.post("/api/leftovers/", json={"name": "Stew"}).json()
+    assert [item["id"] for item in household_client.get("/api/leftovers/").json()] == [sooner["id"], later["id"], default["id"]]
+    assert [item["id"] for item in household_client.get("/api/leftovers/?due_within_days=1").json()] == [sooner["id"]]
+    expires = datetime.fromisoformat(default["expiration_date"]) - datetime.fromisoformat(default["purchase_date"])
+    assert expires == timedelta(days=LEFTOVER_SHELF_LIFE_DAYS)
+
+def test_resolving_twice_keeps_the_first_resolution(household_client):
+    leftover = household_client.post("/api/leftovers/", json={"name": "Rice"}).json()
+    used = household_client.post(f"/api/leftovers/{leftover['id']}/mark-used/").json()
+    again = household_client.post(f"/api/leftovers/{leftover['id']}/mark-trashed/").json()
+    assert again["status"] == STATUS_USED and again["resolved_at"] == used["resolved_at"]
+    assert household_client.get("/api/leftovers/").json() == []
@@ -0,0 +1,96 @@
+"""Adopting a database created by the pre-migration create_all, as alembic.ini documents."""
+
+import os
+from datetime import datetime
+
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import Column, DateTime, Integer, JSON, MetaData, String, Table, create_engine, inspect
+from sqlalchemy.orm import Session
+
+import models  # noqa: F401  (registers every table on Base.metadata)
+from database import Base, upgrade_database
+from ingredient_parser import parse_recipe_ingredients
+from inventory_sync import get_changes_since
+
+# The two tables Base.metadata.create_all made before migrations existed
+PRE_MIGRATION = MetaData()
+Table(
+    "recipes", PRE_MIGRATION,
+    Column("id", String, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("cuisine_type", String, nullable=False),
+    Column("prep_time", Integer, nullable=False),
+    Column("uses_ingredients", JSON, nullable=False),
+    Column("instructions", JSON, nullable=False),
+    Column("dietary_tags", JSON, nullable=False),
+    Column("ingredients", JSON, nullable=False),
+    Column("created_at", DateTime),
+)
+Table(
+    "inventory_items", PRE_MIGRATION,
+    Column("id", String, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("category", String, nullable=False),
+    Column("quantity", Integer, nullable=False),
+    Column("purchase_date", DateTime, nullable=False),
+    Column("expiration_date", DateTime, nullable=False),
+    Column("days_until_expiration", Integer, nullable=False),
+    Column("total_shelf_life", Integer, nullable=False),
+    Column("created_at", DateTime),
+)
+
+def _alembic_config(url: str) -> Config:
+    config = Config(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini"))
+    config.attributes["database_url"] = url
+    config.attributes["configure_logger"] = False
+    return config
+
+@pytest.fixture
+def pre_migration_database(tmp_path):
+    url = f"sqlite:///{tmp_path / 'pre_migration.db'}"
+    engine = create_engine(url)
+    PRE_MIGRATION.create_all(engine)
+    created = datetime(2026, 1, 2, 3, 4, 5)
+    with engine.begin() as connection:
+        connection.execute(PRE_MIGRATION.tables["recipes"].insert().values(
+            id="1", name="Omelette", cuisine_type="French", prep_time=10, uses_ingredients=["eggs", "butter"],
+            instructions=["Whisk.", "Cook."], dietary_tags=["vegetarian"], ingredients=["3 eggs", "1 tbsp butter"],
+            created_at=created,
+        ))
+        connection.execute(PRE_MIGRATION.tables["inventory_items"].insert().values(
+            id="milk", name="Milk", category="dairy", quantity=1, purchase_date=created, expiration_date=created,
+            days_until_expiration=0, total_shelf_life=7, created_at=created,
+        ))
+    yield url, engine, created
+    engine.dispose()
+
+def test_stamped_pre_migration_database_upgrades_to_head(pre_migration_database):
+    url, engine, created = pre_migration_database
+    command.stamp(_alembic_config(url), "0001_baseline")
+    upgrade_database(url)
+
+    with engine.connect() as connection:
+        assert compare_metadata(MigrationContext.configure(connection), Base.metadata) == []
+    with Session(engine) as session:
+        recipe = session.get(models.Recipe, "1")
+        assert recipe.parsed_ingredients == parse_recipe_ingredients(recipe.ingredients, recipe.uses_ingredients)
+        assert [requirement["ingredient"] for requirement in recipe.parsed_ingredients] == ["eggs", "butter"]
+        item = session.get(models.InventoryItem, "milk")
+        assert (item.household_id, item.change_seq, item.updated_at) == ("default", 0, created)
+        upserted, deleted, _, _ = get_changes_since(session, None)
+        assert [row.id for row in upserted] == ["milk"] and deleted == []
+
+def test_downgrades_back_to_the_pre_migration_schema(pre_migration_database):
+    url, engine, _ = pre_migration_database
+    command.stamp(_alembic_config(url), "0001_baseline")
+    upgrade_database(url)
+    command.downgrade(_alembic_config(url), "0001_baseline")
+    tables = set(inspect(engine).get_table_names()) - {"alembic_version"}
+    assert tables == {"recipes", "inventory_items"}
+    assert {column["name"] for column in inspect(engine).get_columns("inventory_items")} == {
+        column.name for column in PRE_MIGRATION.tables["inventory_items"].columns
+    }
@@ -0,0 +1,66 @@
+import threading
+import time
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+import profiling
+from profiling import ProfileStore, ProfilingMiddleware, sign_request, verify_signature
+
+SECRET = "profiling-test-secret"
+
+@pytest.fixture
+def profiled_app(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILING_SECRET", SECRET)
+    monkeypatch.setattr(profiling, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(profiling, "PROFILING_SAMPLE_RATE", 0.0)
+    threads = {}
+
+    async def endpoint(request):
+        threads["handler"] = threading.get_ident()
+        return JSONResponse({"ok": True})
+
+    store = ProfileStore(str(tmp_path), max_profiles=2)
+    original_save = store.save
+
+    def save(*args, **kwargs):
+        threads["save"] = threading.get_ident()
+        return original_save(*args, **kwargs)
+
+    store.save = save
+    app = Starlette(routes=[Route("/work/", endpoint)])
+    app.add_middleware(ProfilingMiddleware, store=store)
+    return TestClient(app), store, threads
+
+def test_signed_requests_are_profiled_off_the_event_loop(profiled_app):
+    client, store, threads = profiled_app
+    response = client.get("/work/", headers={"X-Profile-Request": sign_request(SECRET, "GET", "/work/")})
+    assert response.json() == {"ok": True}
+    [profile] = store.list()
+    assert profile["path"] == "/work/" and profile["status"] == 200 and profile["trigger"] == "header"
+    assert store.path(profile["id"], "pstats") is not None
+    assert threads["save"] != threads["handler"]
+
+def test_unsigned_or_forged_requests_are_not_profiled(profiled_app):
+    client, store, _ = profiled_app
+    client.get("/work/")
+    client.get("/work/", headers={"X-Profile-Request": sign_request("wrong", "GET", "/work/")})
+    client.get("/work/", headers={"X-Profile-Request": sign_request(SECRET, "GET", "/other/")})
+    assert store.list() == []
+
+def test_store_keeps_only_the_newest_profiles(profiled_app):
+    client, store, _ = profiled_app
+    for _ in range(3):
+        client.get("/work/", headers={"X-Profile-Request": sign_request(SECRET, "GET", "/work/")})
+        time.sleep(0.002)
+    assert len(store.list()) == 2
+
+def test_stale_signatures_are_rejected(monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILING_SECRET", SECRET)
+    fresh = sign_request(SECRET, "GET", "/work/")
+    stale = sign_request(SECRET, "GET", "/work/", int(time.time()) - profiling.SIGNATURE_MAX_AGE_SECONDS - 10)
+    assert verify_signature(fresh, "GET", "/work/")
+    assert not verify_signature(stale, "GET", "/work/")
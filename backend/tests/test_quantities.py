@@ -0,0 +1,34 @@
+from types import SimpleNamespace
+
+import pytest
+
+from recommendation_engine import build_inventory_amounts, has_sufficient_quantities
+
+def _items(*entries):
+    return [SimpleNamespace(name=name, quantity=quantity, unit=unit) for name, quantity, unit in entries]
+
+def _needs(ingredient, amount, dimension="count"):
+    return [{"ingredient": ingredient, "dimension": dimension, "amount": amount}]
+
+def test_singular_and_plural_items_add_up():
+    amounts = build_inventory_amounts(_items(("Tomato", 1, None), ("Tomatoes", 2, None)))
+    assert has_sufficient_quantities(_needs("tomatoes", 3), amounts)
+    assert not has_sufficient_quantities(_needs("tomato", 4), amounts)
+
+@pytest.mark.parametrize("inventory, ingredient, amount, expected", [
+    ([("Eggs", 6, None)], "egg", 6, True),
+    ([("Plain flour", 200, "g")], "flour", 300, False),
+    ([("Flour", 500, "g")], "plain flour", 300, True),
+    ([("Olive oil", 100, "ml"), ("Sunflower oil", 100, "ml")], "oil", 150, True),
+    ([("Olive oil", 100, "ml"), ("Oil", 100, "ml")], "olive oil", 150, True),
+    ([("Olive oil", 100, "ml"), ("Sunflower oil", 100, "ml")], "olive oil", 150, False),
+])
+def test_aliases_draw_on_the_same_items_as_name_matching(inventory, ingredient, amount, expected):
+    dimension = "count" if inventory[0][2] is None else ("mass" if inventory[0][2] == "g" else "volume")
+    assert has_sufficient_quantities(_needs(ingredient, amount, dimension), build_inventory_amounts(_items(*inventory))) is expected
+
+def test_incomparable_or_missing_amounts_pass():
+    amounts = build_inventory_amounts(_items(("Rice", 2, None)))
+    assert has_sufficient_quantities(_needs("rice", 500, "mass"), amounts)
+    assert has_sufficient_quantities(_needs("saffron", 1), amounts)
+    assert has_sufficient_quantities(None, amounts)
@@ -0,0 +1,102 @@
+"""Statement budgets for the hot endpoints; a new query or an N+1 fails here."""
+
+import logging
+
+import pytest
+from sqlalchemy import create_engine, text
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from conftest import ADMIN_HEADERS
+from query_accounting import QueryAccountingMiddleware, QueryMetrics, N_PLUS_ONE_THRESHOLD, query_budget
+
+ITEMS = ["Milk", "Eggs", "Butter", "Cheese", "Spinach", "Carrots", "Rice", "Chicken breast"]
+
+@pytest.fixture
+def stocked_client(household_client):
+    """A household with a few items, and the catalog and vocabulary already loaded"""
+    household_client.items = [
+        household_client.post("/api/inventory/", json={"name": name, "category": "other", "quantity": 2}).json()
+        for name in ITEMS
+    ]
+    household_client.post("/api/leftovers/", json={"name": "Soup"})
+    household_client.get("/api/recipes/suggestions/")
+    return household_client
+
+def test_inventory_list(stocked_client):
+    with query_budget(1):
+        assert len(stocked_client.get("/api/inventory/").json()) == len(ITEMS)
+
+def test_live_suggestions(stocked_client):
+    with query_budget(3):
+        response = stocked_client.get("/api/recipes/suggestions/?facets=true")
+    assert response.status_code == 200
+
+def test_suggestion_queries_do_not_grow_with_inventory(stocked_client):
+    for i in range(20):
+        stocked_client.post("/api/inventory/", json={"name": f"Extra item {i}", "category": "other", "quantity": 1})
+    with query_budget(3):
+        stocked_client.get("/api/recipes/suggestions/?facets=true")
+
+def test_create_item(stocked_client):
+    with query_budget(4):
+        stocked_client.post("/api/inventory/", json={"name": "Yogurt", "category": "dairy", "quantity": 1})
+
+def test_batch_create_does_not_query_per_item(stocked_client):
+    batch = [{"name": name, "category": "other", "quantity": 1} for name in ITEMS]
+    with query_budget(3):
+        response = stocked_client.post("/api/inventory/batch/", json=batch)
+    assert [item["name"] for item in response.json()] == ITEMS
+    assert all(item["created_at"] for item in response.json())
+
+@pytest.mark.parametrize("guarded", [False, True])
+def test_update_item(stocked_client, guarded):
+    item = stocked_client.items[0]
+    headers = {"If-Match": str(item["change_seq"])} if guarded else {}
+    with query_budget(3):
+        response = stocked_client.put(f"/api/inventory/{item['id']}/", json={"quantity": 1}, headers=headers)
+    assert response.status_code == 200
+
+def test_delete_item(stocked_client):
+    with query_budget(4):
+        assert stocked_client.delete(f"/api/inventory/{stocked_client.items[0]['id']}/").status_code == 200
+
+def test_mark_used(stocked_client):
+    with query_budget(6):
+        assert stocked_client.post(f"/api/inventory/{stocked_client.items[0]['id']}/mark-used/").status_code == 200
+
+def test_delta_sync(stocked_client):
+    with query_budget(2):
+        stocked_client.get("/api/inventory/changes/?since=0")
+
+def test_budget_reports_the_statements(stocked_client):
+    with pytest.raises(AssertionError, match=r"expected at most 0 queries, ran 1:\n  1x SELECT"):
+        with query_budget(0):
+            stocked_client.get("/api/inventory/")
+
+def test_metrics_endpoint_requires_admin(client):
+    client.get("/api/inventory/")
+    assert client.get("/api/metrics/queries/").status_code == 404
+    metrics = client.get("/api/metrics/queries/", headers=ADMIN_HEADERS).json()
+    assert metrics["GET /api/inventory/"]["requests"] >= 1
+
+def test_repeated_statements_are_logged_not_printed(caplog, capsys):
+    engine = create_engine("sqlite://")
+
+    def repeated(request):
+        with engine.connect() as connection:
+            for value in range(N_PLUS_ONE_THRESHOLD):
+                connection.execute(text(f"SELECT {value}"))
+        return PlainTextResponse("ok")
+
+    metrics = QueryMetrics()
+    app = Starlette(routes=[Route("/repeated", repeated)])
+    app.add_middleware(QueryAccountingMiddleware, metrics=metrics)
+    with caplog.at_level(logging.WARNING, logger="query_accounting"):
+        TestClient(app).get("/repeated")
+    assert [record.getMessage() for record in caplog.records] == [f"Possible N+1 in GET /repeated: {N_PLUS_ONE_THRESHOLD}x SELECT ?"]
+    assert capsys.readouterr().out == ""
+    assert metrics.snapshot()["GET /repeated"]["n_plus_one_requests"] == 1
+    engine.dispose()
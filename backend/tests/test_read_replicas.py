@@ -0,0 +1,27 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+import database
+
+@pytest.fixture
+def broken_replica(tmp_path, monkeypatch):
+    """A replica that answers the health check but has no tables, so every real read fails"""
+    url = f"sqlite:///{tmp_path / 'replica.db'}"
+    engine = create_engine(url)
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    engine.dispose()
+    router = database.ReadRouter([url])
+    monkeypatch.setattr(database, "read_router", router)
+    yield router.replicas[0]
+    router.replicas[0].engine.dispose()
+
+def test_suggestions_take_a_failing_replica_out_of_rotation(household_client, broken_replica):
+    with pytest.raises(OperationalError):
+        household_client.get("/api/recipes/suggestions/")
+    assert not broken_replica.healthy
+
+    response = household_client.get("/api/recipes/suggestions/")
+    assert response.status_code == 200
+    assert response.headers["X-DB-Route"] == "primary"
@@ -0,0 +1,80 @@
+import random
+
+import pytest
+
+from models import Recipe as RecipeModel
+from recipe_facets import RecipeFacetIndex, build_facet_index, iter_bits, prep_time_bucket
+
+TAGS = ["vegan", "vegetarian", "gluten-free", "dairy-free"]
+CUISINES = ["Italian", "Indian", "Mexican", "Japanese"]
+
+def _random_recipes(count, seed=5):
+    rng = random.Random(seed)
+    return [
+        RecipeModel(id=str(i), name=f"Dish {i}", dietary_tags=rng.sample(TAGS, rng.randint(0, 3)),
+                    cuisine_type=rng.choice(CUISINES), prep_time=rng.choice([5, 15, 20, 30, 45, 60, 90]))
+        for i in range(count)
+    ]
+
+def _matches(recipe, tags, cuisines, max_prep_time):
+    recipe_tags = {tag.lower() for tag in recipe.dietary_tags}
+    return (all(tag.lower() in recipe_tags for tag in tags or [])
+            and (not cuisines or recipe.cuisine_type.lower() in {c.lower() for c in cuisines})
+            and (max_prep_time is None or recipe.prep_time <= max_prep_time))
+
+FILTERS = [
+    ([], [], None),
+    (["vegan"], [], None),
+    (["Vegan", "gluten-free"], ["italian", "Mexican"], 30),
+    ([], ["Japanese"], 15),
+    (["unknown-tag"], [], None),
+]
+
+@pytest.mark.parametrize("tags, cuisines, max_prep_time", FILTERS)
+def test_filter_and_counts_match_a_linear_scan(tags, cuisines, max_prep_time):
+    recipes = _random_recipes(300)
+    index = build_facet_index(recipes)
+    mask = index.filter(tags, cuisines, max_prep_time)
+    expected = [r for r in recipes if _matches(r, tags, cuisines, max_prep_time)]
+    assert index.ids(mask) == [r.id for r in expected]
+
+    counts = index.counts(mask)
+    for tag in TAGS:
+        assert counts["dietary_tags"].get(tag, 0) == sum(tag in r.dietary_tags for r in expected)
+    for cuisine in CUISINES:
+        assert counts["cuisine_type"].get(cuisine, 0) == sum(r.cuisine_type == cuisine for r in expected)
+    assert sum(counts["prep_time"].values()) == len(expected)
+
+def test_incremental_adds_match_the_bulk_build():
+    recipes = _random_recipes(100)
+    incremental = RecipeFacetIndex()
+    for recipe in recipes:
+        incremental.add_recipe(recipe)
+    bulk = build_facet_index(recipes)
+    for tags, cuisines, max_prep_time in FILTERS:
+        mask = bulk.filter(tags, cuisines, max_prep_time)
+        assert incremental.filter(tags, cuisines, max_prep_time) == mask
+        assert incremental.counts(mask) == bulk.counts(mask)
+
+def test_replacing_a_recipe_moves_its_bits():
+    recipes = _random_recipes(10)
+    index = build_facet_index(recipes)
+    index.add_recipe(RecipeModel(id="3", name="Dish 3", dietary_tags=["keto"], cuisine_type="Greek", prep_time=200))
+    assert index.ids(index.filter(["keto"])) == ["3"]
+    assert index.ids(index.filter(cuisines=["greek"])) == ["3"]
+    assert "3" not in index.ids(index.filter(max_prep_time=120))
+    assert len(index.ids(index.live)) == 10
+
+def test_iter_bits_and_buckets():
+    assert list(iter_bits(0)) == []
+    assert list(iter_bits(0b101001)) == [0, 3, 5]
+    assert list(iter_bits(1 << 1000)) == [1000]
+    assert [prep_time_bucket(m) for m in (5, 15, 16, 60, 61)] == ["<=15", "<=15", "<=30", "<=60", ">60"]
+
+def test_faceted_recipe_endpoint(client):
+    everything = client.get("/api/recipes/").json()
+    faceted = client.get("/api/recipes/?facets=true&dietary_tags=vegetarian&max_prep_time=20").json()
+    expected = [r["id"] for r in everything if "vegetarian" in r["dietary_tags"] and r["prep_time"] <= 20]
+    assert [r["id"] for r in faceted["recipes"]] == expected
+    assert faceted["total"] == len(expected)
+    assert faceted["facets"]["dietary_tags"]["vegetarian"] == len(expected)
@@ -0,0 +1,116 @@
+import random
+import time
+
+import catalog
+from conftest import ADMIN_HEADERS
+from ingredient_vocabulary import get_vocabulary
+from inventory_sync import current_change_seq
+from models import Recipe as RecipeModel
+from recipe_search import PrefixTrie, build_search_index, SUGGESTIONS_PER_NODE
+
+def _recipe(id, name, uses, cuisine="Italian", tags=(), prep_time=20):
+    return RecipeModel(id=id, name=name, cuisine_type=cuisine, uses_ingredients=list(uses), ingredients=list(uses),
+                       instructions=["Cook."], dietary_tags=list(tags), prep_time=prep_time)
+
+RECIPES = [
+    _recipe("1", "Chicken Curry", ["chicken", "rice", "curry paste"], "Indian", prep_time=40),
+    _recipe("2", "Chickpea Salad", ["chickpeas", "cucumber", "lemon"], "Mediterranean", ["vegan"], 10),
+    _recipe("3", "Tomato Pasta", ["pasta", "tomatoes", "basil"], "Italian", ["vegetarian"], 20),
+    _recipe("4", "Chicken Pasta", ["chicken", "pasta", "cream"], "Italian", prep_time=30),
+]
+
+def _brute_force(index, terms):
+    scores = {}
+    for term in terms:
+        for doc, score in index._term_impacts(term)[0].items():
+            scores[doc] = scores.get(doc, 0.0) + score
+    return sorted(((index.doc_ids[doc], score) for doc, score in scores.items()), key=lambda pair: -pair[1])
+
+def test_early_terminating_search_matches_exhaustive_ranking():
+    rng = random.Random(3)
+    words = ["chicken", "rice", "pasta", "tomatoes", "basil", "lemon", "cream", "beans", "garlic", "onion"]
+    recipes = [_recipe(str(i), f"Dish {i}", rng.sample(words, 3)) for i in range(200)]
+    index = build_search_index(recipes)
+    for query in (["chicken"], ["pasta", "basil"], ["garlic", "onion", "rice"]):
+        expected = _brute_force(index, query)[:5]
+        results = index.search(" ".join(query), limit=5, prefix=False)
+        assert [round(score, 9) for _, score in results] == [round(score, 9) for _, score in expected]
+
+def test_name_matches_outrank_ingredient_matches():
+    index = build_search_index(RECIPES + [_recipe("5", "Lemon Tart", ["flour", "lemon", "sugar"], "French")])
+    assert [recipe_id for recipe_id, _ in index.search("lemon", prefix=False)] == ["5", "2"]
+
+def test_last_term_is_a_prefix():
+    index = build_search_index(RECIPES)
+    assert {recipe_id for recipe_id, _ in index.search("chick")} == {"1", "2", "4"}
+    assert index.search("chick", prefix=False) == []
+
+def test_filters_apply_to_search():
+    index = build_search_index(RECIPES)
+    assert [recipe_id for recipe_id, _ in index.search("chick", dietary_tags=["Vegan"])] == ["2"]
+    assert {recipe_id for recipe_id, _ in index.search("pasta", max_prep_time=25)} == {"3"}
+
+def test_replacing_a_recipe_drops_its_old_terms():
+    index = build_search_index(RECIPES)
+    index.add_recipe(_recipe("3", "Pesto Gnocchi", ["gnocchi", "pesto"]))
+    assert "3" not in {recipe_id for recipe_id, _ in index.search("tomatoes", prefix=False)}
+    assert index.search("gnocchi", prefix=False)[0][0] == "3"
+    assert "gnocchi" in index.autocomplete("gno")
+
+def test_autocomplete_ranks_by_frequency_and_keeps_the_typed_head():
+    index = build_search_index(RECIPES)
+    assert index.autocomplete("chi")[:2] == ["chicken", "chickpea"]
+    assert index.autocomplete("spicy chi")[0] == "spicy chicken"
+    assert index.autocomplete("") == []
+
+def test_incremental_trie_matches_one_pass_build():
+    rng = random.Random(11)
+    terms = [f"ta{chr(97 + i)}{chr(97 + j)}" for i in range(6) for j in range(6)]
+    counts = {}
+    trie = PrefixTrie()
+    for _ in range(600):
+        term = rng.choice(terms)
+        delta = -1 if counts.get(term, 0) > 0 and rng.random() < 0.4 else 1
+        counts[term] = counts.get(term, 0) + delta
+        trie.adjust(term, delta)
+    rebuilt = PrefixTrie.from_counts(counts)
+    for prefix in ("", "t", "ta", "tab", "taf"):
+        assert trie.complete(prefix) == rebuilt.complete(prefix)
+        assert len(trie.complete(prefix)) <= SUGGESTIONS_PER_NODE
+
+def test_search_endpoints(client):
+    assert client.get("/api/recipes/search/?q=pasta").json()[0]["name"] == "Tomato Basil Pasta"
+    assert "pasta" in client.get("/api/recipes/autocomplete/?prefix=pas").json()
+
+NEW_RECIPE = {
+    "name": "Smoked Paprika Lentils", "cuisine_type": "Spanish", "prep_time": 30,
+    "uses_ingredients": ["lentils", "paprika"], "ingredients": ["1 cup lentils", "1 tsp paprika"],
+    "instructions": ["Simmer."], "dietary_tags": ["vegan"],
+}
+
+def test_creating_a_recipe_requires_admin_and_updates_search(client):
+    recipe = NEW_RECIPE
+    assert client.post("/api/recipes/", json=recipe).status_code == 404
+    assert client.post("/api/recipes/", json=recipe, headers={"X-Admin-Token": "wrong"}).status_code == 404
+    created = client.post("/api/recipes/", json=recipe, headers=ADMIN_HEADERS)
+    assert created.status_code == 200, created.text
+    assert [r["id"] for r in client.get("/api/recipes/search/?q=lentils").json()] == [created.json()["id"]]
+
+def test_other_processes_reload_after_a_recipe_is_created(client, db, monkeypatch):
+    local = catalog.get_catalog(db)
+    other_process = catalog.load_catalog(db)
+    created = client.post("/api/recipes/", json=NEW_RECIPE, headers=ADMIN_HEADERS).json()
+
+    seq = current_change_seq(db, catalog.CATALOG_COUNTER)
+    assert local.source_seq == seq and created["id"] in local.by_id
+    assert other_process.source_seq < seq and created["id"] not in other_process.by_id
+    assert get_vocabulary(db).by_name.get("lentil") is not None
+
+    monkeypatch.setattr(catalog, "_catalog", other_process)
+    monkeypatch.setattr(catalog, "CATALOG_CHECK_INTERVAL", 0)
+    catalog.get_catalog(db)
+    deadline = time.monotonic() + 5
+    while catalog._catalog is other_process and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert created["id"] in catalog._catalog.by_id
+    assert [r["id"] for r in client.get("/api/recipes/search/?q=lentils").json()] == [created["id"]]
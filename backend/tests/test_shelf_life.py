@@ -0,0 +1,47 @@
+from datetime import datetime
+
+import pytest
+
+from shelf_life import estimate_shelf_life, fill_expiration_dates, SOURCE_CATEGORY, SOURCE_DEFAULT, SOURCE_EXACT, SOURCE_TOKEN
+
+@pytest.mark.parametrize("name, category, days", [
+    ("Canned tuna", "Canned Goods", 730),
+    ("Canned tuna", None, 730),
+    ("Frozen chicken breasts", "Frozen Foods", 180),
+    ("Frozen chicken breasts", "meat", 180),
+    ("Black pepper", "Spices", 730),
+    ("Tomato ketchup", "Condiments", 180),
+])
+def test_storage_categories_override_name_matches(name, category, days):
+    assert estimate_shelf_life(name, category) == (days, SOURCE_CATEGORY)
+
+@pytest.mark.parametrize("name, category, days, source", [
+    ("Olive oil", "Oils", 540, SOURCE_EXACT),
+    ("Cinnamon", "Herbs & Spices", 1095, SOURCE_EXACT),
+    ("Chicken breasts", "meat", 2, SOURCE_EXACT),
+    ("Organic baby spinach", "vegetables", 5, SOURCE_TOKEN),
+    ("Bell pepper", "vegetables", 10, SOURCE_EXACT),
+    ("Dragon fruit", "Fruits", 7, SOURCE_CATEGORY),
+    ("Widget", None, 14, SOURCE_DEFAULT),
+])
+def test_name_matches_and_fallbacks(name, category, days, source):
+    assert estimate_shelf_life(name, category) == (days, source)
+
+def test_fill_expiration_dates_uses_the_estimate():
+    now = datetime(2026, 1, 1)
+    data = fill_expiration_dates({"name": "Canned tuna", "category": "canned"}, now)
+    assert (data["expiration_date"] - now).days == 730
+    assert data["total_shelf_life"] == 730 and data["days_until_expiration"] == 730
+
+def test_explicit_expiration_date_is_kept():
+    now = datetime(2026, 1, 1)
+    data = fill_expiration_dates({"name": "Milk", "expiration_date": datetime(2026, 1, 4)}, now)
+    assert data["days_until_expiration"] == 3 and data["total_shelf_life"] == 3
+
+def test_inventory_dates_are_filled_server_side(household_client):
+    item = household_client.post("/api/inventory/", json={"name": "Frozen peas", "category": "vegetables", "quantity": 1}).json()
+    assert item["total_shelf_life"] == 180
+
+def test_estimate_endpoint(client):
+    estimates = client.post("/api/shelf-life/estimate/", json=[{"name": "Black pepper", "category": "Spices"}]).json()
+    assert estimates == [{"name": "Black pepper", "category": "Spices", "shelf_life_days": 730, "source": SOURCE_CATEGORY}]
@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta
+
+from inventory_events import get_waste_stats, OUTCOME_DISCARDED
+from models import WasteRollup
+
+def _add(client, name, category, quantity):
+    return client.post("/api/inventory/", json={"name": name, "category": category, "quantity": quantity}).json()
+
+def test_mark_used_and_discarded_roll_up_by_category(household_client):
+    milk = _add(household_client, "Milk", "dairy", 2)
+    yogurt = _add(household_client, "Yogurt", "dairy", 3)
+    spinach = _add(household_client, "Spinach", "vegetables", 1)
+    household_client.post(f"/api/inventory/{milk['id']}/mark-used/")
+    household_client.post(f"/api/inventory/{yogurt['id']}/mark-discarded/")
+    household_client.post(f"/api/inventory/{spinach['id']}/mark-discarded/")
+
+    stats = household_client.get("/api/stats/waste/?days=7").json()
+    assert (stats["used_count"], stats["used_quantity"]) == (1, 2)
+    assert (stats["discarded_count"], stats["discarded_quantity"]) == (2, 4)
+    assert stats["waste_rate"] == 2 / 3
+    assert [c["category"] for c in stats["by_category"]] == ["dairy", "vegetables"]
+    assert stats["by_category"][0] == {
+        "category": "dairy", "used_count": 1, "used_quantity": 2, "discarded_count": 1, "discarded_quantity": 3,
+    }
+
+def test_rollups_outside_the_window_are_ignored(db):
+    old_day = datetime.utcnow().date() - timedelta(days=30)
+    db.add(WasteRollup(day=old_day, category="dairy", outcome=OUTCOME_DISCARDED, event_count=5, total_quantity=9))
+    db.commit()
+    assert get_waste_stats(db, 7)["discarded_count"] == 0
+    assert get_waste_stats(db, 31)["discarded_count"] == 5
+
+def test_rejects_out_of_range_days(client):
+    assert client.get("/api/stats/waste/?days=0").status_code == 400
+
+def test_live_suggestions_do_not_write_to_stdout(household_client, capsys):
+    _add(household_client, "Eggs", "dairy", 6)
+    capsys.readouterr()
+    response = household_client.get("/api/recipes/suggestions/")
+    assert response.status_code == 200
+    assert response.headers["X-Suggestions-Source"] == "live"
+    assert capsys.readouterr().out == ""
+
+def test_repeat_outcomes_increment_one_rollup_row(household_client, db):
+    for name, quantity in [("Milk", 2), ("Cream", 1)]:
+        item = _add(household_client, name, "dairy", quantity)
+        household_client.post(f"/api/inventory/{item['id']}/mark-discarded/")
+    rows = db.query(WasteRollup).filter(WasteRollup.household_id == "test-household").all()
+    assert [(row.category, row.event_count, row.total_quantity) for row in rows] == [("dairy", 2, 3)]
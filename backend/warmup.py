@@ -0,0 +1,103 @@
+"""Startup warm-up: pay the cold costs before the worker reports ready.
+
+A fresh process has no DB connection, no catalog, no derived indexes and
+empty matching caches, so without this the first suggestions request pays
+for all of them. The phases below run in a background thread at startup;
+/api/ready/ answers 503 until they finish. Requests that arrive earlier
+still work: they wait on the same catalog and index locks instead of
+building a second copy.
+"""
+
+from typing import Dict, List, Optional
+import os
+import threading
+import time
+
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "1").lower() not in ("0", "false", "no")
+
+STATUS_PENDING = "pending"
+STATUS_RUNNING = "running"
+STATUS_READY = "ready"
+STATUS_FAILED = "failed"
+
+class WarmupState:
+    """Progress of the warm-up, as reported by the readiness endpoint"""
+
+    def __init__(self):
+        self.status = STATUS_PENDING
+        self.phases: List[Dict] = []
+        self.error: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.seconds: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.status == STATUS_READY
+
+    def snapshot(self) -> Dict:
+        return {"status": self.status, "seconds": self.seconds, "phases": list(self.phases), "error": self.error}
+
+warmup_state = WarmupState()
+
+def _connect(context: Dict):
+    from sqlalchemy import text
+    from database import SessionLocal
+    context["db"] = SessionLocal()
+    context["db"].execute(text("SELECT 1"))
+
+def _load_catalog(context: Dict):
+    from catalog import get_catalog
+    context["catalog"] = get_catalog(context["db"])
+
+def _build_indexes(context: Dict):
+    context["catalog"].build_indexes()
+
+def _precompile_matching(context: Dict):
+    """Resolve every recipe's canonical ingredient ids, the engine's exact-match fast path"""
+    from ingredient_vocabulary import get_vocabulary
+    vocabulary = get_vocabulary(context["db"])
+    for recipe in context["catalog"].recipes:
+        vocabulary.recipe_ingredient_ids(recipe)
+
+def _sample_suggestions(context: Dict):
+    """One throwaway recommendation so the engine's queries are compiled and cached"""
+    from recommendation_engine import get_recipe_recommendations
+    from what_if import hypothetical_item
+    items = [hypothetical_item({"name": "eggs", "category": "dairy", "quantity": 1})]
+    get_recipe_recommendations(context["db"], items, 1, context["catalog"].recipes)
+
+WARMUP_PHASES = [
+    ("connect", _connect),
+    ("catalog", _load_catalog),
+    ("indexes", _build_indexes),
+    ("matching", _precompile_matching),
+    ("suggestions", _sample_suggestions),
+]
+
+def run_warmup(state: WarmupState = warmup_state) -> WarmupState:
+    state.status = STATUS_RUNNING
+    state.started_at = time.perf_counter()
+    context: Dict = {}
+    try:
+        for name, phase in WARMUP_PHASES:
+            started = time.perf_counter()
+            phase(context)
+            state.phases.append({"phase": name, "ms": round((time.perf_counter() - started) * 1000, 1)})
+        state.status = STATUS_READY
+    except Exception as e:
+        state.error = f"{type(e).__name__}: {e}"
+        state.status = STATUS_FAILED
+    finally:
+        if "db" in context:
+            context["db"].close()
+        state.seconds = round(time.perf_counter() - state.started_at, 3)
+    return state
+
+def start_warmup(state: WarmupState = warmup_state) -> Optional[threading.Thread]:
+    """Warm up in the background, or mark the process ready at once if disabled"""
+    if not WARMUP_ON_STARTUP:
+        state.status = STATUS_READY
+        return None
+    thread = threading.Thread(target=run_warmup, args=(state,), name="warmup", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,125 @@
+from sqlalchemy.orm import Session
+from models import Recipe as RecipeModel, InventoryItem as InventoryItemModel
+from catalog import CatalogSnapshot, register_index
+from recipe_facets import iter_bits
+from recommendation_engine import ingredients_match, has_name_aliases, build_inventory_amounts, has_sufficient_quantities, expiration_urgency, score_recipe
+from ingredient_parser import normalize_ingredient_name, canonical_ingredient_key
+from ingredient_vocabulary import get_vocabulary
+from shelf_life import fill_expiration_dates
+from typing import Dict, List, Optional, Tuple
+
+WHAT_IF_INDEX = "what_if"
+MAX_BASKETS = 500
+
+class RecipeRequirementIndex:
+    """Each recipe's normalized ingredient names, the inputs of the engine's name matching"""
+
+    def __init__(self):
+        self.requirements: Dict[str, Tuple[RecipeModel, Tuple[str, ...]]] = {}
+        # Recipe names that ingredients_match may pair with a different name
+        self.alias_names = set()
+
+    def add_recipe(self, recipe: RecipeModel):
+        names = tuple(dict.fromkeys(normalize_ingredient_name(name) for name in recipe.uses_ingredients or []))
+        self.requirements[recipe.id] = (recipe, names)
+        self.alias_names.update(name for name in names if has_name_aliases(name))
+
+def build_requirement_index(recipes: List[RecipeModel]) -> RecipeRequirementIndex:
+    index = RecipeRequirementIndex()
+    for recipe in recipes:
+        index.add_recipe(recipe)
+    return index
+
+register_index(WHAT_IF_INDEX, build_requirement_index, RecipeRequirementIndex.add_recipe)
+
+def hypothetical_item(data: Dict) -> InventoryItemModel:
+    """An unsaved inventory item for a basket entry, dates estimated like a new purchase"""
+    return InventoryItemModel(**fill_expiration_dates(data))
+
+def _holder_bitmaps(db: Session, index: RecipeRequirementIndex, shared_items: List[InventoryItemModel],
+                    baskets: List[List[InventoryItemModel]]) -> Tuple[Dict[int, int], Dict[str, int]]:
+    """Basket-by-ingredient matrix stored column-wise: per ingredient, a bitmap of the baskets having it.
+
+    Shared items (the real inventory) set every basket's bit. Name columns
+    are keyed by recipe ingredient names, so alias rules such as "oil"
+    matching "olive oil" are resolved once per distinct item name.
+    """
+    vocabulary = get_vocabulary(db)
+    everyone = (1 << len(baskets)) - 1
+    owned = [(item, everyone) for item in shared_items]
+    owned += [(item, 1 << position) for position, items in enumerate(baskets) for item in items]
+
+    by_id: Dict[int, int] = {}
+    by_item_name: Dict[str, int] = {}
+    for item, bits in owned:
+        ingredient_id = item.ingredient_id or vocabulary.by_name.get(canonical_ingredient_key(item.name))
+        if ingredient_id is not None:
+            by_id[ingredient_id] = by_id.get(ingredient_id, 0) | bits
+        name = normalize_ingredient_name(item.name)
+        by_item_name[name] = by_item_name.get(name, 0) | bits
+
+    by_recipe_name: Dict[str, int] = {}
+    for item_name, bits in by_item_name.items():
+        for recipe_name in {item_name} | {alias for alias in index.alias_names if ingredients_match(alias, item_name)}:
+            by_recipe_name[recipe_name] = by_recipe_name.get(recipe_name, 0) | bits
+    return by_id, by_recipe_name
+
+def score_baskets(db: Session, catalog: CatalogSnapshot, baskets: List[List[InventoryItemModel]],
+                  shared_items: Optional[List[InventoryItemModel]] = None,
+                  limit: int = 10) -> List[Tuple[int, List[RecipeModel]]]:
+    """Rank the recipes each hypothetical inventory could make, in one pass over the catalog.
+
+    Returns (number of makeable recipes, best `limit` recipes) per basket,
+    with the same matching, quantity checks and ranking as
+    get_recipe_recommendations. Coverage of all baskets is worked out per
+    recipe with a few integer ANDs, so only (basket, recipe) pairs that
+    actually match are scored individually.
+    """
+    if not baskets:
+        return []
+    shared_items = shared_items or []
+    index: RecipeRequirementIndex = catalog.index(WHAT_IF_INDEX)
+    vocabulary = get_vocabulary(db)
+    by_id, by_name = _holder_bitmaps(db, index, shared_items, baskets)
+    nonempty = 0
+    for position, items in enumerate(baskets):
+        if shared_items or items:
+            nonempty |= 1 << position
+
+    inventories = [shared_items + items for items in baskets]
+    shared_names = [(normalize_ingredient_name(item.name), item.days_until_expiration) for item in shared_items]
+    normalized_items = [shared_names + [(normalize_ingredient_name(item.name), item.days_until_expiration) for item in items]
+                        for items in baskets]
+    amounts: Dict[int, Dict] = {}
+    matches: List[List[Tuple[RecipeModel, float, float]]] = [[] for _ in baskets]
+    for recipe, names in index.requirements.values():
+        if not names:
+            continue
+        covered = 0
+        ingredient_ids = vocabulary.recipe_ingredient_ids(recipe)
+        if ingredient_ids and None not in ingredient_ids:
+            covered = nonempty
+            for ingredient_id in ingredient_ids:
+                covered &= by_id.get(ingredient_id, 0)
+                if not covered:
+                    break
+        if covered != nonempty:
+            by_names = nonempty & ~covered
+            for name in names:
+                by_names &= by_name.get(name, 0)
+                if not by_names:
+                    break
+            covered |= by_names
+        for position in iter_bits(covered):
+            if position not in amounts:
+                amounts[position] = build_inventory_amounts(inventories[position])
+            if has_sufficient_quantities(recipe.parsed_ingredients, amounts[position]):
+                urgency_score = expiration_urgency(normalized_items[position], names)
+                total_score = score_recipe(recipe, urgency_score)
+                matches[position].append((recipe, total_score, urgency_score))
+
+    results = []
+    for found in matches:
+        found.sort(key=lambda x: (x[2], x[1]), reverse=True)
+        results.append((len(found), [recipe for recipe, total_score, urgency_score in found[:limit]]))
+    return results
@@ -7,14 +7,56 @@ export const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || "https://ecoeats-
 export const API_ENDPOINTS = {
   // Inventory endpoints
   inventory: "/api/inventory/",
+  inventoryByName: (name: string) => `/api/inventory/?name=${encodeURIComponent(name)}`,
+  inventoryChanges: (since?: number) =>
+    since === undefined ? "/api/inventory/changes/" : `/api/inventory/changes/?since=${since}`,
+  inventoryBatch: "/api/inventory/batch/",
+  inventoryAlerts: "/api/inventory/alerts/",
   inventoryDetail: (id: string) => `/api/inventory/${id}/`,
   inventoryMarkUsed: (id: string) => `/api/inventory/${id}/mark-used/`,
   inventoryMarkDiscarded: (id: string) => `/api/inventory/${id}/mark-discarded/`,
 
+  // Leftover endpoints
+  leftovers: (dueWithinDays?: number) =>
+    dueWithinDays === undefined ? "/api/leftovers/" : `/api/leftovers/?due_within_days=${dueWithinDays}`,
+  leftoverHistory: (cursor?: string) =>
+    cursor === undefined ? "/api/leftovers/history/" : `/api/leftovers/history/?cursor=${encodeURIComponent(cursor)}`,
+  leftoverDetail: (id: string) => `/api/leftovers/${id}/`,
+  leftoverMarkUsed: (id: string) => `/api/leftovers/${id}/mark-used/`,
+  leftoverMarkTrashed: (id: string) => `/api/leftovers/${id}/mark-trashed/`,
+
   // Recipe endpoints
   recipes: "/api/recipes/",
+  recipesColumnar: "/api/recipes/?format=columnar",
   recipeDetail: (id: string) => `/api/recipes/${id}/`,
+  recipeSimilar: (id: string, useInventory = false) => `/api/recipes/${id}/similar/?use_inventory=${useInventory}`,
   recipeSuggestions: "/api/recipes/suggestions/",
+  recipeWhatIf: "/api/recipes/what-if/",
+  recipeNearMisses: (maxMissing = 1) => `/api/recipes/near-misses/?max_missing=${maxMissing}`,
+  recipeSearch: (query: string) => `/api/recipes/search/?q=${encodeURIComponent(query)}`,
+  recipeAutocomplete: (prefix: string) => `/api/recipes/autocomplete/?prefix=${encodeURIComponent(prefix)}`,
+
+  // Ingredient endpoints
+  ingredientAutocomplete: (query: string) => `/api/ingredients/autocomplete/?q=${encodeURIComponent(query)}`,
+  ingredientCanonicalize: (name: string) => `/api/ingredients/canonicalize/?name=${encodeURIComponent(name)}`,
+
+  // Shelf-life endpoints
+  shelfLifeEstimate: "/api/shelf-life/estimate/",
+
+  // Stats endpoints
+  wasteStats: (days = 90) => `/api/stats/waste/?days=${days}`,
+}
+
+// Set by write responses; echoed so reads right after a write skip lagging replicas
+const PRIMARY_UNTIL_HEADER = "X-Primary-Until"
+let primaryUntil: string | null = null
+
+// Household whose inventory and leftovers requests act on; the backend uses "default" when unset
+const HOUSEHOLD_HEADER = "X-Household-Id"
+let householdId: string | null = process.env.NEXT_PUBLIC_HOUSEHOLD_ID || null
+
+export function setHousehold(id: string | null) {
+  householdId = id
 }
 
 // Generic API request function
@@ -23,6 +65,8 @@ export async function apiRequest<T>(endpoint: string, options: RequestInit = {})
 
   const defaultHeaders: HeadersInit = {
     "Content-Type": "application/json",
+    ...(primaryUntil ? { [PRIMARY_UNTIL_HEADER]: primaryUntil } : {}),
+    ...(householdId ? { [HOUSEHOLD_HEADER]: householdId } : {}),
   }
 
   const config: RequestInit = {
@@ -34,6 +78,7 @@ export async function apiRequest<T>(endpoint: string, options: RequestInit = {})
   }
 
   const response = await fetch(url, config)
+  primaryUntil = response.headers.get(PRIMARY_UNTIL_HEADER) ?? primaryUntil
 
   if (!response.ok) {
     throw new Error(`API request failed: ${response.status} ${response.statusText}`)
@@ -42,15 +87,36 @@ export async function apiRequest<T>(endpoint: string, options: RequestInit = {})
   return response.json()
 }
 
+// ?format=columnar lists: {count, columns: {key: values}}, turned back into objects
+export interface ColumnarPayload {
+  count: number
+  columns: Record<string, unknown[]>
+}
+
+export function decodeColumnar<T>(payload: ColumnarPayload): T[] {
+  const keys = Object.keys(payload.columns)
+  return Array.from({ length: payload.count }, (_, i) =>
+    Object.fromEntries(keys.map((key) => [key, payload.columns[key][i]])) as T,
+  )
+}
+
 // Specific API functions for different resources
 export const inventoryAPI = {
   getAll: () => apiRequest(API_ENDPOINTS.inventory),
+  findByName: (name: string) => apiRequest(API_ENDPOINTS.inventoryByName(name)),
+  getChanges: (since?: number) => apiRequest(API_ENDPOINTS.inventoryChanges(since)),
+  getAlerts: () => apiRequest(API_ENDPOINTS.inventoryAlerts),
   getById: (id: string) => apiRequest(API_ENDPOINTS.inventoryDetail(id)),
   create: (data: any) =>
     apiRequest(API_ENDPOINTS.inventory, {
       method: "POST",
       body: JSON.stringify(data),
     }),
+  createBatch: (items: any[]) =>
+    apiRequest(API_ENDPOINTS.inventoryBatch, {
+      method: "POST",
+      body: JSON.stringify(items),
+    }),
   update: (id: string, data: any) =>
     apiRequest(API_ENDPOINTS.inventoryDetail(id), {
       method: "PUT",
@@ -70,8 +136,61 @@ export const inventoryAPI = {
     }),
 }
 
+export const leftoverAPI = {
+  getActive: (dueWithinDays?: number) => apiRequest(API_ENDPOINTS.leftovers(dueWithinDays)),
+  getHistory: (cursor?: string) => apiRequest(API_ENDPOINTS.leftoverHistory(cursor)),
+  create: (data: any) =>
+    apiRequest(API_ENDPOINTS.leftovers(), {
+      method: "POST",
+      body: JSON.stringify(data),
+    }),
+  update: (id: string, data: any) =>
+    apiRequest(API_ENDPOINTS.leftoverDetail(id), {
+      method: "PUT",
+      body: JSON.stringify(data),
+    }),
+  delete: (id: string) =>
+    apiRequest(API_ENDPOINTS.leftoverDetail(id), {
+      method: "DELETE",
+    }),
+  markUsed: (id: string) =>
+    apiRequest(API_ENDPOINTS.leftoverMarkUsed(id), {
+      method: "POST",
+    }),
+  markTrashed: (id: string) =>
+    apiRequest(API_ENDPOINTS.leftoverMarkTrashed(id), {
+      method: "POST",
+    }),
+}
+
 export const recipeAPI = {
-  getAll: () => apiRequest(API_ENDPOINTS.recipes),
+  getAll: async () => decodeColumnar(await apiRequest<ColumnarPayload>(API_ENDPOINTS.recipesColumnar)),
   getById: (id: string) => apiRequest(API_ENDPOINTS.recipeDetail(id)),
+  getSimilar: (id: string, useInventory = false) => apiRequest(API_ENDPOINTS.recipeSimilar(id, useInventory)),
   getSuggestions: () => apiRequest(API_ENDPOINTS.recipeSuggestions),
+  getNearMisses: (maxMissing?: number) => apiRequest(API_ENDPOINTS.recipeNearMisses(maxMissing)),
+  whatIf: (baskets: { label?: string; items: { name: string; quantity?: number; unit?: string }[] }[], includeInventory = true) =>
+    apiRequest(API_ENDPOINTS.recipeWhatIf, {
+      method: "POST",
+      body: JSON.stringify({ baskets, include_inventory: includeInventory }),
+    }),
+  search: (query: string) => apiRequest(API_ENDPOINTS.recipeSearch(query)),
+  autocomplete: (prefix: string) => apiRequest(API_ENDPOINTS.recipeAutocomplete(prefix)),
+}
+
+export const ingredientAPI = {
+  autocomplete: (query: string) => apiRequest(API_ENDPOINTS.ingredientAutocomplete(query)),
+  canonicalize: (name: string) => apiRequest(API_ENDPOINTS.ingredientCanonicalize(name)),
+}
+
+export const shelfLifeAPI = {
+  estimate: (items: { name: string; category?: string }[]) =>
+    apiRequest(API_ENDPOINTS.shelfLifeEstimate, {
+      method: "POST",
+      body: JSON.stringify(items),
+    }),
+}
+
+export const statsAPI = {
+  getWaste: (days?: number) => apiRequest(API_ENDPOINTS.wasteStats(days)),
 }